@@ -0,0 +1,41 @@
+"""
+选号策略回测吞吐量（策略数 × 期数 / 秒）
+
+用法:
+    python -m benchmarks.bench_backtest
+    python -m benchmarks.bench_backtest --draws 100000 --strategies 16 --workers 1,4
+"""
+
+import argparse
+import time
+
+from benchmarks.synthetic import synthetic_store
+from service.backtest import STRATEGY_NAMES, Backtester, make_strategy
+
+
+def run(draws: int, strategies: int, workers_list):
+    backtester = Backtester(synthetic_store(draws))
+    windows = [None, 10, 30, 50, 100, 200, 500, 1000]
+    pool = [make_strategy(name, window) for window in windows for name in STRATEGY_NAMES]
+    selected = (pool * (strategies // len(pool) + 1))[:strategies]
+
+    print(f"开奖 {draws} 期（回测 {backtester.steps} 期），策略 {strategies} 个")
+    print(f"{'进程数':>6} {'耗时':>10} {'策略×期/秒':>14}")
+    for workers in workers_list:
+        start = time.perf_counter()
+        backtester.run_many(selected, workers=workers)
+        elapsed = time.perf_counter() - start
+        print(f"{workers:>6} {elapsed:>9.2f}s {strategies * backtester.steps / elapsed:>14,.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="选号策略回测吞吐量")
+    parser.add_argument("--draws", type=int, default=3300, help="合成期数")
+    parser.add_argument("--strategies", type=int, default=32, help="策略数")
+    parser.add_argument("--workers", default="1,4", help="进程数，逗号分隔")
+    args = parser.parse_args()
+    run(args.draws, args.strategies, [int(w) for w in args.workers.split(",")])
+
+
+if __name__ == "__main__":
+    main()
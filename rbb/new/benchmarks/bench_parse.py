@@ -0,0 +1,59 @@
+"""
+开奖页面解析基准：html5lib DOM 解析与流式解析的吞吐量和内存峰值
+
+用法:
+    python -m benchmarks.bench_parse
+    python -m benchmarks.bench_parse --rows 3000,10000
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from benchmarks.synthetic import render_history_html, synthetic_store
+from common.data_fetcher import DataFetcher, iter_history_rows
+
+CHUNK_SIZE = 64 * 1024
+
+
+def _measure(func):
+    """返回 (结果, 耗时秒, 内存峰值字节)；计时与内存跟踪分两次运行，避免 tracemalloc 影响耗时"""
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def run(sizes):
+    print(f"{'期数':>8} {'解析方式':>10} {'行/秒':>12} {'内存峰值':>12}")
+    for size in sizes:
+        raw = render_history_html(synthetic_store(size)).encode("utf-8")
+        html = raw.decode("utf-8")
+        cases = {
+            "html5lib": lambda: DataFetcher("")._parse_html(html),
+            # 模拟 response.iter_content()：逐块输入，逐行产出后即丢弃
+            "stream": lambda: sum(
+                1 for _ in iter_history_rows(raw[i:i + CHUNK_SIZE] for i in range(0, len(raw), CHUNK_SIZE))
+            ),
+        }
+        for name, func in cases.items():
+            result, elapsed, peak = _measure(func)
+            rows = result if isinstance(result, int) else len(result)
+            assert rows == size
+            print(f"{size:>8} {name:>10} {rows / elapsed:>12,.0f} {peak / 1024 / 1024:>10.1f}MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="开奖页面解析吞吐量与内存峰值")
+    parser.add_argument("--rows", default="3000,10000", help="合成期数，逗号分隔")
+    args = parser.parse_args()
+    run([int(s) for s in args.rows.split(",")])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+多注号码 × 全部开奖的矩阵核对耗时
+
+用法:
+    python -m benchmarks.bench_prize_matrix
+    python -m benchmarks.bench_prize_matrix --tickets 10000 --draws 3000
+"""
+
+import argparse
+import time
+
+from benchmarks.synthetic import random_tickets, synthetic_store
+from service.prize_checker import PrizeChecker
+
+
+def run(tickets: int, draws: int, repeat: int):
+    store = synthetic_store(draws)
+    numbers = random_tickets(tickets)
+    checker = PrizeChecker()
+    checker.check_matrix(numbers[:10], store)  # 预热
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = checker.check_matrix(numbers, store)
+    elapsed = (time.perf_counter() - start) / repeat
+
+    print(f"号码 {tickets} 注 × 开奖 {draws} 期")
+    print(f"矩阵核对耗时: {elapsed * 1000:.1f}ms（每对 {elapsed / (tickets * draws) * 1e9:.2f}ns）")
+    won = (result.codes > 0).sum()
+    print(f"中奖次数: {won}，中奖率 {won / result.codes.size:.2%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="多注号码矩阵核对耗时")
+    parser.add_argument("--tickets", type=int, default=10000, help="号码注数")
+    parser.add_argument("--draws", type=int, default=3300, help="开奖期数")
+    parser.add_argument("--repeat", type=int, default=3, help="重复次数")
+    args = parser.parse_args()
+    run(args.tickets, args.draws, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+按期号范围查询：二分查找与逐行扫描对比
+
+二分查找耗时随数据量近似不变（O(log n)），逐行扫描随数据量线性增长。
+
+用法:
+    python -m benchmarks.bench_query
+    python -m benchmarks.bench_query --sizes 10000,1000000 --queries 1000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import synthetic_store
+from service.query_service import QueryService
+
+
+def _per_query(func, bounds) -> float:
+    """返回平均每次查询耗时（微秒）"""
+    start = time.perf_counter()
+    for lo, hi in bounds:
+        func(lo, hi)
+    return (time.perf_counter() - start) / len(bounds) * 1e6
+
+
+def _scan(store, lo, hi):
+    return store[(store.times >= lo) & (store.times <= hi)]
+
+
+def run(sizes, queries: int, span: int):
+    print(f"{'期数':>10} {'二分查找':>12} {'最近N期':>10} {'前后N期':>10} {'逐行扫描':>12} {'加速比':>10}")
+    for size in sizes:
+        store = synthetic_store(size)
+        service = QueryService(store)
+        rng = np.random.default_rng(0)
+        starts = rng.integers(1, max(size - span, 2), size=queries).tolist()
+        bounds = [(s, s + span) for s in starts]
+
+        bisect = _per_query(service.range_store, bounds)
+        latest = _per_query(lambda lo, hi: service.latest(span), bounds)
+        around = _per_query(lambda lo, hi: (service.before(lo, span), service.after(lo, span)), bounds)
+        scan_bounds = bounds[:max(1, min(queries, 20_000_000 // size))]
+        scan = _per_query(lambda lo, hi: _scan(store, lo, hi), scan_bounds)
+        print(
+            f"{size:>10} {bisect:>10.2f}us {latest:>8.2f}us {around:>8.2f}us "
+            f"{scan:>10.1f}us {scan / bisect:>9.0f}x"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="按期号范围查询：二分查找与逐行扫描对比")
+    parser.add_argument("--sizes", default="10000,100000,1000000,10000000", help="合成期数，逗号分隔")
+    parser.add_argument("--queries", type=int, default=2000, help="每种规模的查询次数")
+    parser.add_argument("--span", type=int, default=100, help="每次查询的期号跨度")
+    args = parser.parse_args()
+    run([int(s) for s in args.sizes.split(",")], args.queries, args.span)
+
+
+if __name__ == "__main__":
+    main()
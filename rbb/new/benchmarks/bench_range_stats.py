@@ -0,0 +1,54 @@
+"""
+任意期号范围频率统计耗时（前缀和相减与重新统计对比）
+
+用法:
+    python -m benchmarks.bench_range_stats
+    python -m benchmarks.bench_range_stats --sizes 3000,1000000 --repeat 200
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import synthetic_store
+from data.range_index import RangeIndex
+
+
+def run(sizes, repeat: int):
+    print(f"{'期数':>10} {'构建索引':>10} {'前缀和/次':>12} {'重新统计/次':>12}")
+    rng = np.random.default_rng(0)
+    for size in sizes:
+        store = synthetic_store(size)
+        bounds = np.sort(rng.integers(1, size + 1, size=(repeat, 2)), axis=1)
+
+        start = time.perf_counter()
+        index = RangeIndex(store)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for a, b in bounds:
+            index.between(a, b)
+        prefix = (time.perf_counter() - start) / repeat
+
+        start = time.perf_counter()
+        for a, b in bounds:
+            # 合成数据期号从 size 递减到 1，第 i 行期号为 size - i
+            window = store[size - b:size - a + 1]
+            window.red_counts()
+            window.blue_counts()
+        recount = (time.perf_counter() - start) / repeat
+
+        print(f"{size:>10} {build * 1000:>8.1f}ms {prefix * 1e6:>10.1f}us {recount * 1e6:>10.1f}us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="任意期号范围频率统计耗时")
+    parser.add_argument("--sizes", default="3000,100000,1000000", help="合成期数，逗号分隔")
+    parser.add_argument("--repeat", type=int, default=100, help="每种规模的查询次数")
+    args = parser.parse_args()
+    run([int(s) for s in args.sizes.split(",")], args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+开奖记录内存占用与批量核对吞吐量：原 dataclass 记录与 __slots__ 紧凑记录对比
+
+用法:
+    python -m benchmarks.bench_record
+    python -m benchmarks.bench_record --count 100000
+"""
+
+import argparse
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Dict, List
+
+from benchmarks.synthetic import synthetic_store
+from common.prize_checker import PrizeChecker as BasePrizeChecker
+from data.models import LotteryRecord
+from service.prize_checker import PrizeChecker
+
+USER_NUMBERS = {"red": ["01", "03", "16", "18", "29", "33"], "blue": "06"}
+
+
+@dataclass
+class LegacyLotteryRecord:
+    """改造前的开奖记录（字符串列表 + 每次核对生成字典）"""
+
+    times: str
+    red_balls: List[str]
+    blue_ball: str
+    date: str
+
+    def to_dict(self) -> Dict:
+        return {
+            "times": self.times,
+            "red_balls": self.red_balls,
+            "blue_ball": self.blue_ball,
+            "date": self.date,
+            **{f"rb{i + 1}": ball for i, ball in enumerate(self.red_balls)},
+            "bb": self.blue_ball,
+            "dates": self.date,
+        }
+
+
+def _lines(count: int) -> List[str]:
+    """合成数据的 CSV 行文本"""
+    return [",".join(record.to_row()) for record in synthetic_store(count).to_records()]
+
+
+def _parse(cls, line: str):
+    fields = line.split(",")
+    return cls(fields[0], fields[1:7], fields[7], fields[8])
+
+
+def _memory_per_record(cls, lines) -> float:
+    """从 CSV 行文本创建记录后仍被占用的内存（平均每条）"""
+    tracemalloc.start()
+    records = [_parse(cls, line) for line in lines]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del records
+    return size / len(lines)
+
+
+def _throughput(func, count: int, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return count / best
+
+
+def run(count: int):
+    lines = _lines(count)
+    legacy_mem = _memory_per_record(LegacyLotteryRecord, lines)
+    compact_mem = _memory_per_record(LotteryRecord, lines)
+    print(f"每条记录内存: 改造前 {legacy_mem:.0f} B, 改造后 {compact_mem:.0f} B")
+
+    legacy = [_parse(LegacyLotteryRecord, line) for line in lines]
+    compact = [_parse(LotteryRecord, line) for line in lines]
+    base_checker, checker = BasePrizeChecker(), PrizeChecker()
+    before = _throughput(lambda: base_checker.batch_check(USER_NUMBERS, [r.to_dict() for r in legacy]), count)
+    after = _throughput(lambda: checker.batch_check(USER_NUMBERS, compact), count)
+    print(f"批量核对吞吐量: 改造前 {before:,.0f} 条/秒, 改造后 {after:,.0f} 条/秒 ({after / before:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="开奖记录内存占用与批量核对吞吐量")
+    parser.add_argument("--count", type=int, default=100_000, help="记录条数")
+    args = parser.parse_args()
+    run(args.count)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+相似号码 Top-k 查询耗时
+
+用法:
+    python -m benchmarks.bench_similar
+    python -m benchmarks.bench_similar --sizes 3000,1000000 --k 50
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import synthetic_store
+from service.query_service import QueryService
+
+
+def run(sizes, k: int, repeat: int):
+    print(f"{'期数':>10} {'每次查询':>12} {'每期耗时':>10}")
+    rng = np.random.default_rng(0)
+    for size in sizes:
+        service = QueryService(synthetic_store(size))
+        tickets = [
+            ([f"{n:02d}" for n in rng.choice(np.arange(1, 34), 6, replace=False)], f"{rng.integers(1, 17):02d}")
+            for _ in range(repeat)
+        ]
+        service.similar(*tickets[0], k=k)  # 预热：缓存红球掩码
+
+        start = time.perf_counter()
+        for reds, blue in tickets:
+            service.similar(reds, blue, k=k)
+        elapsed = (time.perf_counter() - start) / repeat
+        print(f"{size:>10} {elapsed * 1000:>10.3f}ms {elapsed / size * 1e9:>8.2f}ns")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="相似号码 Top-k 查询耗时")
+    parser.add_argument("--sizes", default="3000,100000,1000000,10000000", help="合成期数，逗号分隔")
+    parser.add_argument("--k", type=int, default=20, help="返回期数")
+    parser.add_argument("--repeat", type=int, default=20, help="每种规模的查询次数")
+    args = parser.parse_args()
+    run([int(s) for s in args.sizes.split(",")], args.k, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+CSV 解析与二进制快照加载耗时对比
+
+用法:
+    python -m benchmarks.bench_snapshot
+    python -m benchmarks.bench_snapshot --sizes 3000,100000
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.synthetic import synthetic_store, write_csv
+from data.snapshot import read_snapshot
+from data.storage import CSVStorage
+
+
+def _timeit(func, repeat: int) -> float:
+    """返回多次运行中的最短耗时（秒）"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(sizes, repeat: int = 3):
+    print(f"{'期数':>10} {'CSV 解析':>12} {'快照加载':>12} {'加速比':>10}")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = Path(tmp) / "ssq_data.csv"
+            write_csv(synthetic_store(size), csv_path)
+
+            storage = CSVStorage(str(csv_path))
+            storage.load_store()  # 生成快照
+
+            csv_time = _timeit(CSVStorage(str(csv_path), use_snapshot=False).load_store, 1 if size > 1_000_000 else repeat)
+            snap_time = _timeit(lambda: read_snapshot(storage.snapshot_path), repeat)
+        print(f"{size:>10} {csv_time * 1000:>10.2f}ms {snap_time * 1000:>10.3f}ms {csv_time / snap_time:>9.0f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CSV 与二进制快照加载耗时对比")
+    parser.add_argument("--sizes", default="3000,100000,10000000", help="合成期数，逗号分隔")
+    parser.add_argument("--repeat", type=int, default=3, help="重复次数")
+    args = parser.parse_args()
+    run([int(s) for s in args.sizes.split(",")], args.repeat)
+
+
+if __name__ == "__main__":
+    main()
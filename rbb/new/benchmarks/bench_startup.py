@@ -0,0 +1,105 @@
+"""
+离线命令启动耗时（冷启动墙钟时间与 -X importtime 导入耗时）
+
+以子进程运行 `python main.py query ...`（禁用常驻进程转发，数据目录指向临时合成数据），
+超出 Config 中的预算或加载了网络/解析相关模块时返回非零退出码。
+
+用法:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --rows 100000 --repeat 10
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from benchmarks.synthetic import synthetic_store, write_csv
+from config import Config
+
+MAIN = Config.PROJECT_ROOT / "main.py"
+
+
+def _command(issue: int, importtime: bool = False) -> List[str]:
+    flags = ["-X", "importtime"] if importtime else []
+    return [sys.executable, *flags, str(MAIN), "query", "--by", "times", "--value", str(issue)]
+
+
+def _run(command: List[str], env: Dict[str, str]) -> Tuple[float, str]:
+    """运行命令，返回 (耗时秒, stderr)"""
+    start = time.perf_counter()
+    result = subprocess.run(command, env=env, capture_output=True, text=True, cwd=Config.PROJECT_ROOT)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"命令执行失败: {result.stderr}")
+    return elapsed, result.stderr
+
+
+def parse_importtime(stderr: str) -> Tuple[Dict[str, int], List[str]]:
+    """
+    解析 -X importtime 输出
+
+    Returns:
+        (顶层导入模块名 -> 累计导入耗时（微秒）, 全部已导入模块名)
+    """
+    top_level, modules = {}, []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules.append(name.strip())
+        if not name[1:].startswith(" "):  # 缩进表示被其他模块间接导入
+            top_level[name.strip()] = int(cumulative)
+    return top_level, modules
+
+
+def run(rows: int, repeat: int) -> bool:
+    with tempfile.TemporaryDirectory() as tmp:
+        store = synthetic_store(rows)
+        write_csv(store, Path(tmp) / "ssq_data.csv")
+        env = dict(os.environ, RBB_DATA_DIR=tmp, RBB_NO_DAEMON="1")
+        issue = int(store.times[0])
+
+        _run(_command(issue), env)  # 预热：生成快照
+        wall = statistics.median(_run(_command(issue), env)[0] for _ in range(repeat)) * 1000
+        _, stderr = _run(_command(issue, importtime=True), env)
+
+    imports, modules = parse_importtime(stderr)
+    import_total = sum(imports.values()) / 1000
+    forbidden = [name for name in modules if name.split(".")[0] in Config.STARTUP_FORBIDDEN_IMPORTS]
+
+    print(f"数据规模: {rows} 期，重复 {repeat} 次")
+    print(f"冷启动耗时（中位数）: {wall:.1f}ms（预算 {Config.STARTUP_BUDGET_MS}ms）")
+    print(f"顶层导入耗时合计:     {import_total:.1f}ms（预算 {Config.IMPORT_BUDGET_MS}ms）")
+    print("耗时最多的顶层导入:")
+    for name, cumulative in sorted(imports.items(), key=lambda item: -item[1])[:5]:
+        print(f"  {name:<24} {cumulative / 1000:>8.1f}ms")
+
+    ok = True
+    if wall > Config.STARTUP_BUDGET_MS:
+        print("超出冷启动预算")
+        ok = False
+    if import_total > Config.IMPORT_BUDGET_MS:
+        print("超出导入耗时预算")
+        ok = False
+    if forbidden:
+        print(f"离线命令加载了不应加载的模块: {', '.join(forbidden)}")
+        ok = False
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="离线命令启动耗时")
+    parser.add_argument("--rows", type=int, default=3000, help="合成期数")
+    parser.add_argument("--repeat", type=int, default=5, help="重复次数")
+    args = parser.parse_args()
+    sys.exit(0 if run(args.rows, args.repeat) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import csv
+from pathlib import Path
+
+import numpy as np
+
+from data.store import DrawStore
+
+
+def synthetic_store(count: int, seed: int = 0, chunk: int = 1_000_000) -> DrawStore:
+    """
+    生成合成开奖数据（最新一期在前，期号连续递减，每 2-3 天一期）
+
+    Args:
+        count: 期数
+        seed: 随机种子
+        chunk: 分块生成的行数，控制内存峰值
+
+    Returns:
+        DrawStore: 合成数据
+    """
+    rng = np.random.default_rng(seed)
+    reds = np.empty((count, 6), dtype=np.uint8)
+    for start in range(0, count, chunk):
+        stop = min(start + chunk, count)
+        keys = rng.random((stop - start, 33), dtype=np.float32)
+        picked = np.argpartition(keys, 6, axis=1)[:, :6] + 1
+        reds[start:stop] = np.sort(picked, axis=1)
+
+    blues = rng.integers(1, 17, size=count, dtype=np.uint8)
+    times = np.arange(count, 0, -1, dtype=np.int32)
+    gaps = rng.integers(2, 4, size=count)
+    days = np.cumsum(gaps[::-1])[::-1]
+    dates = np.datetime64("2003-02-23", "D") + days.astype("timedelta64[D]")
+    return DrawStore(times, reds, blues, dates)
+
+
+def random_tickets(count: int, seed: int = 0):
+    """生成随机号码（用户选号格式）[{'red': [...], 'blue': ...}]"""
+    rng = np.random.default_rng(seed)
+    reds = np.argsort(rng.random((count, 33)), axis=1)[:, :6] + 1
+    blues = rng.integers(1, 17, size=count)
+    return [
+        {"red": [f"{n:02d}" for n in row], "blue": f"{blue:02d}"}
+        for row, blue in zip(reds.tolist(), blues.tolist())
+    ]
+
+
+def write_csv(store: DrawStore, path: Path, chunk: int = 100_000):
+    """以 CSVStorage 的格式写出合成数据"""
+    headers = ["times", "rb1", "rb2", "rb3", "rb4", "rb5", "rb6", "bb", "dates"]
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(headers)
+        for start in range(0, len(store), chunk):
+            part = store[start:start + chunk]
+            writer.writerows(
+                [str(t).zfill(5), *(f"{b:02d}" for b in reds), f"{blue:02d}", date]
+                for t, reds, blue, date in zip(
+                    part.times.tolist(),
+                    part.reds.tolist(),
+                    part.blues.tolist(),
+                    part.dates.astype(str).tolist(),
+                )
+            )
+
+
+def render_history_html(store: DrawStore) -> str:
+    """按 500.com 历史开奖页面的表格结构渲染合成数据"""
+    parts = [
+        "<html><head><meta charset=\"utf-8\" /></head><body>",
+        "<table class=\"nav\"><tr><td>双色球</td></tr></table>",
+        "<table class=\"chaxun\"><tr><td>查询</td></tr></table>",
+        "<table id=\"tablelist\"><thead>",
+        "<tr class=\"th_1\"><td rowspan=\"2\">期号</td><td colspan=\"7\">中奖号码</td></tr>",
+        "<tr class=\"th_2\"><td>注数</td><td>奖金(元)</td></tr>",
+        "</thead><tbody id=\"tdata\">",
+    ]
+    for t, reds, blue, date in zip(
+        store.times.tolist(), store.reds.tolist(), store.blues.tolist(), store.dates.astype(str).tolist()
+    ):
+        parts.append(
+            f"<tr class=\"t_tr1\"><!--<td>2</td>--><td>{str(t).zfill(5)}</td>"
+            + "".join(f"<td class=\"t_cfont2\">{b:02d}</td>" for b in reds)
+            + f"<td class=\"t_cfont4\">{blue:02d}</td><td class=\"t_cfont4\">&nbsp;</td>"
+            + "<td>1,234,567,890</td><td>5</td><td>6,543,210</td><td>120</td><td>123,456</td>"
+            + f"<td>345,678,901</td><td>{date}</td></tr>"
+        )
+    parts.append("</tbody></table></body></html>")
+    return "\n".join(parts)
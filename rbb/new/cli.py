@@ -1,12 +1,27 @@
 import argparse
+import csv
+import itertools
+import json
+import re
+import signal
+import sys
+from datetime import date
+from typing import Dict, Tuple
 
+import daemon
+from common.data_fetcher import ResponseCache
 from config import Config
+from data.date_index import WEEKDAY_LABELS, parse_weekday, to_day
+from data.features import FEATURE_LABELS, GROUP_LABELS, GROUP_NAMES, DrawFeatures, parse_condition
 from data.fetcher import DataFetcher
 from data.loader import DataLoader
 from data.storage import CSVStorage
+from service.backtest import STRATEGY_NAMES, Backtester, make_strategy
 from service.prize_checker import PrizeChecker
 from service.query_service import QueryService
 from service.statistics import StatisticsService
+from service.ticket_checker import TicketChecker, TicketSummary, read_tickets
+from utils.validators import validate_bet, validate_blue_ball, validate_numbers, validate_red_balls
 
 
 class CLI:
@@ -17,12 +32,68 @@ class CLI:
         self.config.ensure_dirs()
 
         # 初始化组件
-        fetcher = DataFetcher(self.config.DATA_URL)
-        storage = CSVStorage(str(self.config.STORAGE_PATH))
+        fetcher = DataFetcher(
+            self.config.DATA_URL,
+            request_interval=self.config.REQUEST_INTERVAL,
+            timeout=self.config.REQUEST_TIMEOUT,
+            max_workers=self.config.FETCH_WORKERS,
+            cache=ResponseCache(self.config.HTTP_CACHE_DIR, ttl=self.config.HTTP_CACHE_TTL),
+        )
+        storage = CSVStorage(
+            str(self.config.STORAGE_PATH),
+            compact_threshold=self.config.SEGMENT_COMPACT_THRESHOLD,
+        )
         self.loader = DataLoader(fetcher, storage)
 
-    def run(self):
-        """运行 CLI"""
+    def run(self, argv=None):
+        """
+        运行 CLI
+
+        Args:
+            argv: 命令行参数（不含程序名），默认取 sys.argv[1:]
+
+        Returns:
+            int: 退出码
+        """
+        parser, commands = self.build_parser()
+        args = parser.parse_args(argv)
+
+        if not args.command:
+            parser.print_help()
+            return 0
+
+        if args.command == "query":
+            self._validate_query(commands["query"], args)
+        elif args.command == "check":
+            self._validate_check(commands["check"], args)
+        elif args.command == "stats":
+            if args.start is not None and args.end is not None and args.start > args.end:
+                commands["stats"].error("--from 期号不能大于 --to 期号")
+            if args.type == "features" and args.group in ("year", "month", "weekday"):
+                commands["stats"].error("features 统计的 --group 应为形态特征")
+
+        # 执行命令
+        if args.command == "query":
+            self._handle_query(args)
+        elif args.command == "check":
+            return self._handle_check(args) or 0
+        elif args.command == "stats":
+            self._handle_stats(args)
+        elif args.command == "backtest":
+            self._handle_backtest(args)
+        elif args.command == "update":
+            self._handle_update(args)
+        elif args.command == "serve":
+            return self._handle_serve(args)
+        return 0
+
+    def build_parser(self) -> Tuple[argparse.ArgumentParser, Dict[str, argparse.ArgumentParser]]:
+        """
+        构建命令行解析器
+
+        Returns:
+            (主解析器, 子命令名称 -> 子命令解析器)
+        """
         parser = argparse.ArgumentParser(
             description="双色球历史开奖查询工具",
             formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -30,62 +101,221 @@ class CLI:
 示例:
   python cli.py query --by times --value 22065
   python cli.py query --by date --value 2022-06-09
+  python cli.py query --by times --input issues.txt --format csv
+  python cli.py query --contains 07 21 --blue 05
+  python cli.py query --month 2022-06 --weekday sun
+  python cli.py query --ticket 01 03 16 18 29 33 --blue 06 --near
+  python cli.py query --ticket 01 03 16 18 29 33 --blue 06 --similar 20
+  python cli.py query --feature sum=90-120 odd=3 ac=7,8
   python cli.py check --red 01 03 16 18 29 33 --blue 06
   python cli.py check --red 01 03 16 18 29 33 --blue 06 --batch
+  python cli.py check --red 01 03 16 18 29 33 07 10 --blue 06 11
+  python cli.py check --banker 01 03 --red 16 18 29 33 07 10 --blue 06 --batch
+  python cli.py check --tickets-file tickets.csv --times 22065 22066 --workers 4
   python cli.py stats --type freq --count 10
+  python cli.py stats --type freq --group weekday --count 5
+  python cli.py stats --type hot --from 22001 --to 22150
+  python cli.py stats --type pairs --count 10
+  python cli.py stats --type features --group zones
+  python cli.py backtest --strategy hot cold --window 50
   python cli.py update --incremental
+  python cli.py serve
             """,
         )
         subparsers = parser.add_subparsers(dest="command", help="可用命令")
 
         # 查询命令
         query_parser = subparsers.add_parser("query", help="查询开奖号码")
+        query_parser.add_argument("--by", choices=["times", "date"], help="查询方式：期号或日期")
+        query_parser.add_argument("--value", help="查询值")
         query_parser.add_argument(
-            "--by", choices=["times", "date"], required=True, help="查询方式：期号或日期"
+            "--input", metavar="FILE", help="与 --by 合用：从文件（- 为标准输入）逐行读取期号或日期批量查询"
         )
-        query_parser.add_argument("--value", required=True, help="查询值")
+        query_parser.add_argument(
+            "--format", choices=["ndjson", "csv"], default="ndjson", help="批量查询的输出格式"
+        )
+        query_parser.add_argument("--contains", nargs="+", metavar="RED", help="按包含的红球查询")
+        query_parser.add_argument("--any", action="store_true", help="包含任一红球即可（默认需同时包含）")
+        query_parser.add_argument("--ticket", nargs=6, metavar="RED", help="查询某注号码（6 个红球）是否开出过")
+        query_parser.add_argument("--near", action="store_true", help="与 --ticket 合用：查询至少 5 个红球相同的期次")
+        query_parser.add_argument(
+            "--similar", type=int, metavar="K", help="与 --ticket 合用：显示最接近的 K 期（红球、蓝球、期号依次排序）"
+        )
+        query_parser.add_argument("--blue", help="按蓝球查询，可与 --contains / --ticket 组合")
+        query_parser.add_argument(
+            "--feature",
+            nargs="+",
+            metavar="NAME=VALUE",
+            help=f"按形态特征查询，如 sum=90-120 odd=3 ac=7,8（特征: {', '.join(FEATURE_LABELS)}）",
+        )
+        query_parser.add_argument("--from", dest="date_from", metavar="DATE", help="按日期范围查询：起始日期")
+        query_parser.add_argument("--to", dest="date_to", metavar="DATE", help="按日期范围查询：结束日期")
+        query_parser.add_argument("--month", help="查询某月的开奖，如 2022-06")
+        query_parser.add_argument("--year", help="查询某年的开奖，如 2022")
+        query_parser.add_argument(
+            "--weekday", nargs="+", metavar="DAY", help="只保留指定星期的开奖（mon-sun 或 1-7），可与日期条件组合"
+        )
+        query_parser.add_argument("--limit", type=int, default=20, help="最多显示期数")
         query_parser.add_argument("--refresh", action="store_true", help="强制刷新数据")
 
         # 核对命令
         check_parser = subparsers.add_parser("check", help="核对中奖")
-        check_parser.add_argument("--red", nargs=6, required=True, help="红球号码（6个）")
-        check_parser.add_argument("--blue", required=True, help="蓝球号码")
-        check_parser.add_argument("--times", help="指定期号核对")
+        check_parser.add_argument("--red", nargs="+", help="红球号码（6个；复式为 7 个以上，胆拖为拖码）")
+        check_parser.add_argument("--blue", nargs="+", help="蓝球号码（复式可多个）")
+        check_parser.add_argument("--banker", nargs="+", metavar="RED", help="胆码（1-5 个），与 --red 拖码组成胆拖投注")
+        check_parser.add_argument("--times", nargs="+", help="指定期号核对（号码文件核对时可指定多期）")
         check_parser.add_argument("--batch", action="store_true", help="批量核对最近100期")
+        check_parser.add_argument(
+            "--tickets-file", metavar="FILE", help="从文件（- 为标准输入）逐行读取号码批量核对，支持 CSV 与 JSONL"
+        )
+        check_parser.add_argument(
+            "--format", choices=["ndjson", "csv"], default="ndjson", help="号码文件核对的逐注结果输出格式"
+        )
+        check_parser.add_argument("--workers", type=int, default=1, help="号码文件核对的工作进程数")
 
         # 统计命令
         stats_parser = subparsers.add_parser("stats", help="统计分析")
         stats_parser.add_argument(
-            "--type", choices=["freq", "hot", "cold", "missing"], default="freq", help="统计类型"
+            "--type",
+            choices=["freq", "hot", "cold", "missing", "pairs", "triples", "features"],
+            default="freq",
+            help="统计类型",
         )
         stats_parser.add_argument("--count", type=int, default=10, help="显示数量")
+        stats_parser.add_argument(
+            "--group",
+            choices=["year", "month", "weekday", *GROUP_NAMES],
+            help="频率统计按年/月/星期或形态特征分组；features 统计时为显示分布的特征",
+        )
+        stats_parser.add_argument("--from", dest="start", type=int, help="只统计自该期号起的开奖（含）")
+        stats_parser.add_argument("--to", dest="end", type=int, help="只统计至该期号的开奖（含）")
+
+        # 回测命令
+        backtest_parser = subparsers.add_parser("backtest", help="选号策略历史回测")
+        backtest_parser.add_argument(
+            "--strategy", nargs="+", choices=STRATEGY_NAMES, default=list(STRATEGY_NAMES), help="回测的策略（默认全部）"
+        )
+        backtest_parser.add_argument("--window", type=int, help="热号/冷号只统计最近 N 期（默认全部历史）")
+        backtest_parser.add_argument(
+            "--min-history", type=int, default=self.config.BACKTEST_MIN_HISTORY, help="开始回测前至少积累的期数"
+        )
+        backtest_parser.add_argument("--workers", type=int, default=1, help="工作进程数，多个策略并行回测")
 
         # 更新命令
         update_parser = subparsers.add_parser("update", help="更新数据")
         update_parser.add_argument("--incremental", action="store_true", help="增量更新")
+        update_parser.add_argument("--sharded", action="store_true", help="全量更新时按年份分片并发抓取")
 
-        args = parser.parse_args()
+        # 常驻进程
+        serve_parser = subparsers.add_parser("serve", help="启动常驻进程（其他命令自动转发）")
+        serve_parser.add_argument(
+            "--socket", default=str(self.config.DAEMON_SOCKET), help="套接字路径"
+        )
+        serve_parser.add_argument("--stop", action="store_true", help="停止正在运行的常驻进程")
 
-        if not args.command:
-            parser.print_help()
+        return parser, subparsers.choices
+
+
+    @staticmethod
+    def _validate_query(parser, args):
+        """校验查询参数组合，不合法时由 argparse 报错退出"""
+        if args.input is not None:
+            if not args.by or args.value is not None:
+                parser.error("--input 需与 --by 一起使用，且不能同时指定 --value")
             return
+        if (args.near or args.similar is not None) and args.ticket is None:
+            parser.error("--near / --similar 需与 --ticket 一起使用")
+        if args.near and args.similar is not None:
+            parser.error("--near 与 --similar 不能同时使用")
+        if args.similar is not None and args.similar <= 0:
+            parser.error("--similar 应为正整数")
+        if args.ticket is not None:
+            if args.contains is not None:
+                parser.error("--ticket 与 --contains 不能同时使用")
+            if not validate_red_balls(args.ticket):
+                parser.error("--ticket 应为 6 个不重复的 01-33 红球")
+            if args.blue is not None and not validate_blue_ball(args.blue):
+                parser.error("--blue 蓝球应为 01-16")
+        elif args.feature is not None:
+            try:
+                args.conditions = dict(parse_condition(text) for text in args.feature)
+            except ValueError as e:
+                parser.error(f"--feature 格式错误: {e}")
+        elif args.contains is not None or args.blue is not None:
+            if args.contains and not validate_numbers(args.contains, 33):
+                parser.error("--contains 红球应为不重复的 01-33")
+            if args.blue is not None and not validate_blue_ball(args.blue):
+                parser.error("--blue 蓝球应为 01-16")
+        elif CLI._is_date_query(args):
+            periods = [args.date_from or args.date_to, args.month, args.year]
+            if sum(p is not None for p in periods) > 1:
+                parser.error("--from/--to、--month、--year 只能选择一种")
+            try:
+                for value in (args.date_from, args.date_to):
+                    if value is not None:
+                        to_day(value)
+                if args.month is not None and not re.fullmatch(r"\d{4}-\d{2}", args.month):
+                    raise ValueError(args.month)
+                if args.year is not None and not re.fullmatch(r"\d{4}", args.year):
+                    raise ValueError(args.year)
+                if args.weekday is not None:
+                    args.weekday = [parse_weekday(day) for day in args.weekday]
+            except ValueError as e:
+                parser.error(f"日期参数格式错误: {e}")
+        elif not (args.by and args.value):
+            parser.error("请指定 --by 和 --value，或使用 --contains / --ticket / --feature / --from / --month / --year")
 
-        # 执行命令
-        if args.command == "query":
-            self._handle_query(args)
-        elif args.command == "check":
-            self._handle_check(args)
-        elif args.command == "stats":
-            self._handle_stats(args)
-        elif args.command == "update":
-            self._handle_update(args)
+    @staticmethod
+    def _validate_check(parser, args):
+        """校验核对参数组合，不合法时由 argparse 报错退出"""
+        if args.workers < 1:
+            parser.error("--workers 应为正整数")
+        if args.tickets_file is not None:
+            if args.red is not None or args.blue is not None or args.banker is not None:
+                parser.error("--tickets-file 不能与 --red / --blue / --banker 同时使用")
+            if args.times and args.batch:
+                parser.error("--times 与 --batch 不能同时使用")
+            return
+        if args.red is None or args.blue is None:
+            parser.error("请指定 --red 和 --blue，或使用 --tickets-file")
+        if args.banker is not None or len(args.red) > 6 or len(args.blue) > 1:
+            if not validate_bet(args.red, args.blue, args.banker or ()):
+                parser.error("复式/胆拖投注无效：胆码 1-5 个，胆码与红球不重复且合计至少 6 个（01-33），蓝球不重复（01-16）")
+        else:
+            if not validate_red_balls(args.red):
+                parser.error("--red 应为 6 个不重复的 01-33 红球")
+            if not validate_blue_ball(args.blue[0]):
+                parser.error("--blue 蓝球应为 01-16")
+        if args.times and len(args.times) > 1:
+            parser.error("单注核对时 --times 只能指定一期，多期请使用 --batch 或 --tickets-file")
+
+    @staticmethod
+    def _is_date_query(args):
+        return any(
+            value is not None for value in (args.date_from, args.date_to, args.month, args.year, args.weekday)
+        )
 
     def _handle_query(self, args):
         """处理查询命令"""
-        records = self.loader.load(force_refresh=args.refresh)
-        query_service = QueryService(records)
+        dataset = self.loader.dataset(force_refresh=args.refresh)
+        query_service = dataset.derived("query", QueryService)
+
+        if args.input is not None:
+            self._stream_query(query_service, args)
+
+        elif args.ticket is not None:
+            self._print_ticket(query_service, args)
 
-        if args.by == "times":
+        elif args.feature is not None:
+            self._print_features(query_service, args)
+
+        elif args.contains is not None or args.blue is not None:
+            self._print_contains(query_service, args)
+
+        elif self._is_date_query(args):
+            self._print_dates(query_service, args)
+
+        elif args.by == "times":
             result = query_service.query_by_times(args.value)
             if result:
                 print(f"期号: {result.times}")
@@ -105,49 +335,263 @@ class CLI:
             else:
                 print(f"未找到日期 {args.value}")
 
+    @staticmethod
+    def _print_contains(query_service, args):
+        """输出按包含号码查询的结果"""
+        matched = query_service.search_contains(args.contains or (), args.blue, args.any)
+        conditions = []
+        if args.contains:
+            balls = " ".join(f"{int(b):02d}" for b in args.contains)
+            conditions.append(f"{'包含任一' if args.any else '同时包含'}红球 {balls}")
+        if args.blue is not None:
+            conditions.append(f"蓝球 {int(args.blue):02d}")
+        print(f"{'，'.join(conditions)}：共 {len(matched)} 期")
+        for record in matched[:args.limit]:
+            print(f"  {record.times}  {record.date}  {' - '.join(record.red_balls)} / {record.blue_ball}")
+        if len(matched) > args.limit:
+            print(f"  ……（仅显示最近 {args.limit} 期）")
+
+    @staticmethod
+    def _print_features(query_service, args):
+        """输出按形态特征查询的结果"""
+        matched = query_service.query_features(args.conditions)
+        shown = matched[:args.limit]
+        features = DrawFeatures(shown)
+        print(f"形态特征 {' '.join(args.feature)}：共 {len(matched)} 期")
+        for i, record in enumerate(shown):
+            shape = " ".join(f"{name}={features[name][i]}" for name in ("sum", "span", "odd", "ac"))
+            print(f"  {record.times}  {record.date}  {' - '.join(record.red_balls)} / {record.blue_ball}  {shape}")
+        if len(matched) > args.limit:
+            print(f"  ……（仅显示最近 {args.limit} 期）")
+
+    @staticmethod
+    def _stream_query(query_service, args, batch_size=10000):
+        """
+        批量查询：逐批读取输入、查询并立即输出，不缓存全部输入或结果
+
+        每行输入输出一条结果；未找到时 NDJSON 的 found 为 false，CSV 只输出查询值。
+        """
+        source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+        writer = csv.writer(sys.stdout, lineterminator="\n") if args.format == "csv" else None
+        if writer:
+            writer.writerow(["query", "times", "rb1", "rb2", "rb3", "rb4", "rb5", "rb6", "bb", "dates"])
+        try:
+            values = (line.strip() for line in source)
+            values = (value for value in values if value)
+            while True:
+                batch = list(itertools.islice(values, batch_size))
+                if not batch:
+                    break
+                positions = query_service.query_many(batch, by=args.by)
+                records = iter(query_service.store[positions[positions >= 0]].to_records())
+                for value, position in zip(batch, positions.tolist()):
+                    record = next(records) if position >= 0 else None
+                    if writer:
+                        writer.writerow([value, *record.to_row()] if record else [value])
+                    elif record:
+                        row = {"query": value, "found": True, "times": record.times, "date": record.date,
+                               "red_balls": record.red_balls, "blue_ball": record.blue_ball}
+                        sys.stdout.write(json.dumps(row, ensure_ascii=False) + "\n")
+                    else:
+                        sys.stdout.write(json.dumps({"query": value, "found": False}, ensure_ascii=False) + "\n")
+                sys.stdout.flush()
+        finally:
+            if source is not sys.stdin:
+                source.close()
+
+    @staticmethod
+    def _print_dates(query_service, args):
+        """输出按日期范围、整月、整年及星期查询的结果"""
+        if args.month is not None:
+            matched = query_service.query_month(args.month, args.weekday)
+            condition = f"{args.month} 月"
+        elif args.year is not None:
+            matched = query_service.query_year(args.year, args.weekday)
+            condition = f"{args.year} 年"
+        else:
+            matched = query_service.query_dates(args.date_from, args.date_to, args.weekday)
+            condition = f"{args.date_from or '最早'} 至 {args.date_to or '最新'}"
+        if args.weekday is not None:
+            condition += "（" + "、".join(WEEKDAY_LABELS[day] for day in sorted(set(args.weekday))) + "）"
+
+        print(f"{condition}：共 {len(matched)} 期")
+        for record in matched[:args.limit]:
+            weekday = WEEKDAY_LABELS[date.fromisoformat(record.date).weekday()]
+            print(f"  {record.times}  {record.date} {weekday}  {' - '.join(record.red_balls)} / {record.blue_ball}")
+        if len(matched) > args.limit:
+            print(f"  ……（仅显示最近 {args.limit} 期）")
+
+    @staticmethod
+    def _print_shared(record, count, blue_ball):
+        """输出一期开奖及与号码相同的红球个数"""
+        blue = "，蓝球相同" if blue_ball is not None and record.blue == int(blue_ball) else ""
+        print(
+            f"  {record.times}  {record.date}  {' - '.join(record.red_balls)} / {record.blue_ball}"
+            f"  （红球相同 {count} 个{blue}）"
+        )
+
+    @staticmethod
+    def _print_ticket(query_service, args):
+        """输出按整注号码查询的结果"""
+        ticket = " ".join(f"{int(b):02d}" for b in sorted(args.ticket, key=int))
+        if args.blue is not None:
+            ticket += f" / {int(args.blue):02d}"
+
+        if args.similar is not None:
+            matched = query_service.similar(args.ticket, args.blue, args.similar)
+            shared = matched.contains_red(int(b) for b in args.ticket)
+            print(f"与号码 {ticket} 最接近的 {len(matched)} 期:")
+            for record, count in zip(matched, shared.tolist()):
+                CLI._print_shared(record, count, args.blue)
+            return
+
+        if not args.near:
+            matched = query_service.query_ticket(args.ticket, args.blue)
+            if not len(matched):
+                print(f"号码 {ticket} 从未开出")
+                return
+            print(f"号码 {ticket} 共开出 {len(matched)} 次:")
+            for record in matched[:args.limit]:
+                print(f"  {record.times}  {record.date}  {' - '.join(record.red_balls)} / {record.blue_ball}")
+            return
+
+        matched = query_service.query_near(args.ticket)
+        shared = matched.contains_red(int(b) for b in args.ticket)
+        print(f"与号码 {ticket} 至少 5 个红球相同：共 {len(matched)} 期")
+        for record, count in zip(matched[:args.limit], shared[:args.limit].tolist()):
+            CLI._print_shared(record, count, args.blue)
+        if len(matched) > args.limit:
+            print(f"  ……（仅显示最近 {args.limit} 期）")
+
     def _handle_check(self, args):
         """处理核对命令"""
-        records = self.loader.load()
+        dataset = self.loader.dataset()
+        store = dataset.store
+        if args.tickets_file is not None:
+            return self._check_tickets_file(dataset, args)
+
         prize_checker = PrizeChecker()
-        user_numbers = {"red": args.red, "blue": args.blue}
+        is_bet = args.banker is not None or len(args.red) > 6 or len(args.blue) > 1
+        user_numbers = {"red": args.red, "blue": args.blue[0]}
+        bet = {"banker": args.banker or [], "red": args.red, "blue": args.blue}
+        if is_bet:
+            parts = [f"胆码 {' '.join(bet['banker'])}"] if bet["banker"] else []
+            parts += [f"{'拖码' if bet['banker'] else '红球'} {' '.join(args.red)}", f"蓝球 {' '.join(args.blue)}"]
+            print(f"{'胆拖' if bet['banker'] else '复式'}投注: {' / '.join(parts)}，共 {prize_checker.bet_size(bet)} 注")
 
         if args.batch:
             # 批量核对最近100期
-            recent_records = records[:100]
-            results = prize_checker.batch_check(user_numbers, recent_records)
+            if is_bet:
+                results = prize_checker.batch_check_bet(bet, store[:100])
+            else:
+                results = prize_checker.batch_check(user_numbers, store[:100])
             print("批量核对结果（最近100期）：")
             for level, count in results.items():
-                print(f"  {level}: {count}次")
+                print(f"  {level}: {count}{'注' if is_bet else '次'}")
         else:
             # 单期核对
             if args.times:
-                query_service = QueryService(records)
-                record = query_service.query_by_times(args.times)
+                query_service = dataset.derived("query", QueryService)
+                record = query_service.query_by_times(args.times[0])
                 if not record:
-                    print(f"未找到期号 {args.times}")
+                    print(f"未找到期号 {args.times[0]}")
                     return
             else:
-                record = records[0]  # 最新一期
+                record = store[0]  # 最新一期
 
             # 转换为字典格式
             record_dict = {
                 "red_balls": record.red_balls,
                 "blue_ball": record.blue_ball,
             }
-            prize = prize_checker.check(user_numbers, record_dict)
             print(f"期号: {record.times}")
             print(f"开奖号码: {' - '.join(record.red_balls)} / {record.blue_ball}")
-            print(f"您的号码: {' - '.join(args.red)} / {args.blue}")
+            if is_bet:
+                print("中奖情况:")
+                for level, count in prize_checker.check_bet(bet, record_dict).items():
+                    print(f"  {level}: {count}注")
+                return
+            prize = prize_checker.check(user_numbers, record_dict)
+            print(f"您的号码: {' - '.join(args.red)} / {args.blue[0]}")
             print(f"中奖等级: {prize}")
 
+    @staticmethod
+    def _check_tickets_file(dataset, args):
+        """
+        号码文件核对：逐批读取、核对并立即输出每注结果，最后输出汇总
+
+        逐注结果写到标准输出（NDJSON 或 CSV），汇总写到标准错误，便于重定向结果文件。
+
+        Returns:
+            int: 退出码，期号不存在时为 1
+        """
+        store = dataset.store
+        if args.times:
+            query_service = dataset.derived("query", QueryService)
+            positions = query_service.query_many(args.times)
+            missing = [times for times, position in zip(args.times, positions.tolist()) if position < 0]
+            if missing:
+                print(f"未找到期号 {' '.join(missing)}", file=sys.stderr)
+                return 1
+            draws = store[positions]
+        else:
+            draws = store[:100] if args.batch else store[:1]
+
+        source = sys.stdin if args.tickets_file == "-" else open(args.tickets_file, encoding="utf-8-sig")
+        names = PrizeChecker.PRIZE_NAMES
+        writer = csv.writer(sys.stdout, lineterminator="\n") if args.format == "csv" else None
+        if writer:
+            writer.writerow(["ticket", "red", "blue", "valid", "best", *names[1:]])
+        summary = TicketSummary(len(draws))
+        try:
+            for batch in TicketChecker(draws, workers=args.workers).check(read_tickets(source)):
+                for result in batch.results(start=summary.tickets + 1):
+                    if writer:
+                        prizes = result.get("prizes", {})
+                        writer.writerow([
+                            result["ticket"], " ".join(result["red"] or ()), result["blue"] or "",
+                            int(result["valid"]), result.get("best", ""), *(prizes.get(name, 0) for name in names[1:]),
+                        ])
+                    else:
+                        sys.stdout.write(json.dumps(result, ensure_ascii=False) + "\n")
+                summary.add(batch)
+                sys.stdout.flush()
+        finally:
+            if source is not sys.stdin:
+                source.close()
+
+        totals = summary.to_dict()
+        print(f"核对 {totals['tickets']} 注 × {totals['draws']} 期，无效 {totals['invalid']} 注，"
+              f"中奖 {totals['winning_tickets']} 注", file=sys.stderr)
+        for level, count in totals["prizes"].items():
+            print(f"  {level}: {count}次", file=sys.stderr)
+        return 0
+
     def _handle_stats(self, args):
         """处理统计命令"""
-        records = self.loader.load()
-        # 转换为字典列表格式
-        records_dict = [r.to_dict() for r in records]
-        stats_service = StatisticsService(records_dict)
+        dataset = self.loader.dataset()
+        stats_service = dataset.derived(
+            "stats", lambda store: StatisticsService(store, self.loader.stats_state(dataset))
+        )
+        if args.start is not None or args.end is not None:
+            stats_service = stats_service.window(args.start, args.end)
+            if not stats_service.draws:
+                print("该期号范围内没有开奖记录")
+                return
+            print(f"期号 {stats_service.start_times}-{stats_service.end_times}（{stats_service.draws}期）")
+
+        if args.type == "freq" and args.group:
+            group_names = {"year": "年", "month": "月", "weekday": "星期", **GROUP_LABELS}
+            print(f"按{group_names[args.group]}分组频率统计:")
+            groups = stats_service.frequency_by_bucket(args.group, args.count)
+            for label, freq in groups.items():
+                reds = " ".join(f"{num}({count})" for num, count in freq["red"])
+                blues = " ".join(f"{num}({count})" for num, count in freq["blue"])
+                print(f"  {label}（{freq['draws']}期）")
+                print(f"    红球: {reds}")
+                print(f"    蓝球: {blues}")
 
-        if args.type == "freq":
+        elif args.type == "freq":
             print("红球频率统计:")
             red_freq = stats_service.red_ball_frequency(args.count)
             for num, count in red_freq:
@@ -171,27 +615,106 @@ class CLI:
             print(f"  蓝球: {' - '.join(cold_nums['blue'])}")
 
         elif args.type == "missing":
-            missing = stats_service.analyze_missing()
-            print(f"遗漏值（最近30期未出现）:")
-            print(f"  红球: {', '.join(missing['red'].keys())}")
-            print(f"  蓝球: {', '.join(missing['blue'].keys())}")
+            omission = stats_service.omission()
+            print("遗漏统计（按当前遗漏降序）:")
+            for color, label in (("red", "红球"), ("blue", "蓝球")):
+                numbers = sorted(omission[color].items(), key=lambda item: -item[1]["current"])[:args.count]
+                print(f"  {label}:")
+                print(f"    号码{'当前':>4}{'最大':>4}{'平均':>6}")  # 中文表头每字占两列
+                for num, gap in numbers:
+                    mean = "-" if gap["mean"] is None else f"{gap['mean']:.2f}"
+                    print(f"    {num:<4}{gap['current']:>6}{gap['max']:>6}{mean:>8}")
+
+        elif args.type in ("pairs", "triples"):
+            if args.type == "pairs":
+                print("红球同现（两个号码同时开出）:")
+                combos = stats_service.pair_frequency(args.count)
+            else:
+                print("红球同现（三个号码同时开出）:")
+                combos = stats_service.triple_frequency(args.count)
+            for numbers, count in combos:
+                print(f"  {'-'.join(numbers)}: {count}次")
+
+        elif args.type == "features":
+            if args.group:
+                print(f"{GROUP_LABELS[args.group]}分布:")
+                for value, draws in stats_service.feature_distribution(args.group).items():
+                    print(f"  {value}: {draws}期")
+            else:
+                print("形态特征（平均 / 最小 / 最大）:")
+                for name, summary in stats_service.feature_summary().items():
+                    print(f"  {FEATURE_LABELS[name]}（{name}）: {summary['mean']} / {summary['min']} / {summary['max']}")
+
+    def _handle_backtest(self, args):
+        """处理回测命令"""
+        backtester = Backtester(
+            self.loader.dataset().store,
+            min_history=args.min_history,
+            price=self.config.TICKET_PRICE,
+            prize_amounts=self.config.PRIZE_AMOUNTS,
+        )
+        strategies = [make_strategy(name, args.window) for name in dict.fromkeys(args.strategy)]
+        results = backtester.run_many(strategies, workers=args.workers)
+
+        print(f"回测 {backtester.steps} 期（每期 1 注，每注 {self.config.TICKET_PRICE} 元）:")
+        print(f"  {'策略':<10}{'中奖率':>8}{'投入':>10}{'奖金':>12}{'回报率':>9}  中奖情况")
+        for result in results:
+            prizes = " ".join(f"{level}{count}" for level, count in result.to_dict()["prizes"].items())
+            print(f"  {result.name:<10}{result.hit_rate:>9.2%}{result.cost:>11}{result.payout:>13}{result.roi:>10.1%}  {prizes}")
 
     def _handle_update(self, args):
         """处理更新命令"""
         if args.incremental:
             print("执行增量更新...")
-            records = self.loader.update_incremental()
-            print(f"更新完成，共 {len(records)} 条记录")
+            store = self.loader.update_incremental()
+            print(f"更新完成，共 {len(store)} 条记录")
         else:
             print("执行全量更新...")
+            self.loader.sharded = args.sharded
             records = self.loader.load(force_refresh=True)
             print(f"更新完成，共 {len(records)} 条记录")
 
+    def _handle_serve(self, args):
+        """处理常驻进程命令"""
+        if args.stop:
+            if daemon.stop(args.socket):
+                print("常驻进程已停止")
+                return 0
+            print("常驻进程未运行")
+            return 1
+
+        try:
+            server = daemon.DaemonServer(args.socket, self.run)
+        except RuntimeError as e:
+            print(e)
+            return 1
+
+        # 预热：加载数据集并构建查询索引、同步统计状态
+        dataset = self.loader.dataset()
+        dataset.derived("query", QueryService)
+        self.loader.stats_state(dataset)
+        print(f"常驻进程已启动: {args.socket}（{len(dataset.store)} 条记录）")
+        sys.stdout.flush()
+
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        return 0
+
 
-def main():
+def main(argv=None):
+    """命令行入口：常驻进程运行时转发，否则在本进程内执行"""
+    argv = sys.argv[1:] if argv is None else list(argv)
+    code = daemon.forward(argv, str(Config.DAEMON_SOCKET))
+    if code is not None:
+        return code
     cli = CLI()
-    cli.run()
+    return cli.run(argv)
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main() or 0)
@@ -0,0 +1,26 @@
+from typing import Iterable, Sequence
+
+import numpy as np
+
+# 0-255 各字节中 1 的个数，供不支持 np.bitwise_count 的 NumPy 版本使用
+_BYTE_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def bit_count(values: np.ndarray) -> np.ndarray:
+    """逐元素统计无符号整数二进制中 1 的个数，返回 uint8 数组"""
+    if hasattr(np, "bitwise_count"):  # NumPy 2.0+
+        return np.bitwise_count(values)
+    values = np.ascontiguousarray(values)
+    per_byte = _BYTE_POPCOUNT[values.view(np.uint8)].reshape(*values.shape, values.itemsize)
+    return per_byte.sum(axis=-1, dtype=np.uint8)
+
+
+def ball_masks(groups: Iterable[Sequence]) -> np.ndarray:
+    """号码列表转为 uint64 掩码数组（第 n-1 位表示 n 号球），形状 (N,)"""
+    masks = []
+    for balls in groups:
+        mask = 0
+        for ball in balls:
+            mask |= 1 << (int(ball) - 1)
+        masks.append(mask)
+    return np.array(masks, dtype=np.uint64)
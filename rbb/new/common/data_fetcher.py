@@ -1,36 +1,461 @@
+import codecs
+import gzip
+import hashlib
+import json
 import logging
-import requests
-from bs4 import BeautifulSoup
-from typing import List, Dict
+import os
+import threading
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+# requests / bs4 / html5lib 仅在实际抓取、解析时导入，离线命令启动时不加载
+if TYPE_CHECKING:
+    import requests
 
 logger = logging.getLogger(__name__)
 
 
+def _noop():
+    pass
+
+
+class HistoryRowParser(HTMLParser):
+    """
+    流式开奖表格解析器（不构建 DOM）
+
+    与 html5lib 解析规则保持一致：取文档中第 3 个 table，跳过前 2 行表头，
+    单元格数不少于 16 的行视为开奖记录。未闭合的 td/tr 由后续同级标签隐式闭合。
+    """
+
+    TABLE_INDEX = 2
+    HEADER_ROWS = 2
+    MIN_CELLS = 16
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.rows = deque()
+        self.table_count = 0
+        self._depth = 0  # 目标表格内的 table 嵌套深度
+        self._row_count = 0
+        self._cells = None
+        self._text = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "table":
+            if self._depth:
+                self._depth += 1
+            else:
+                self.table_count += 1
+                if self.table_count == self.TABLE_INDEX + 1:
+                    self._depth = 1
+        elif not self._depth:
+            return
+        elif tag == "tr":
+            self._end_row()
+            self._row_count += 1
+            if self._row_count > self.HEADER_ROWS:
+                self._cells = []
+        elif tag == "td" and self._cells is not None:
+            self._end_cell()
+            self._text = []
+
+    def handle_endtag(self, tag):
+        if not self._depth:
+            return
+        if tag == "td":
+            self._end_cell()
+        elif tag == "tr":
+            self._end_row()
+        elif tag == "table":
+            self._depth -= 1
+            if not self._depth:
+                self._end_row()
+
+    def handle_data(self, data):
+        if self._text is not None:
+            self._text.append(data)
+
+    def _end_cell(self):
+        if self._text is not None:
+            self._cells.append("".join(self._text).strip())
+            self._text = None
+
+    def _end_row(self):
+        if self._cells is None:
+            return
+        self._end_cell()
+        cells, self._cells = self._cells, None
+        if len(cells) >= self.MIN_CELLS:
+            self.rows.append(
+                {
+                    "times": cells[0],
+                    "red_balls": cells[1:7],
+                    "blue_ball": cells[7],
+                    "date": cells[15],
+                }
+            )
+
+
+def iter_history_rows(chunks: Iterable[Union[str, bytes]], encoding: str = "utf-8") -> Iterator[Dict]:
+    """
+    边读边解析开奖表格，逐行产出记录字典
+
+    Args:
+        chunks: HTML 文本或字节块（如 response.iter_content()）
+        encoding: 字节块的编码
+
+    Yields:
+        Dict: {'times', 'red_balls', 'blue_ball', 'date'}
+    """
+    parser = HistoryRowParser()
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    for chunk in chunks:
+        parser.feed(decoder.decode(chunk) if isinstance(chunk, bytes) else chunk)
+        while parser.rows:
+            yield parser.rows.popleft()
+    parser.feed(decoder.decode(b"", final=True))
+    parser.close()
+    while parser.rows:
+        yield parser.rows.popleft()
+
+    if parser.table_count <= HistoryRowParser.TABLE_INDEX:
+        logger.error("网页结构异常，未找到数据表格")
+        raise Exception("网页结构异常")
+
+
+class ResponseCache:
+    """
+    HTTP 响应磁盘缓存（按 URL 存放）
+
+    每个 URL 对应两个文件：``<sha1>.html.gz`` 保存 gzip 压缩的原始响应，
+    ``<sha1>.json`` 保存 ETag / Last-Modified / 抓取时间及解析结果。
+    缓存在 TTL 内直接命中；过期后发送条件请求，服务器返回 304 时沿用解析结果，不再解析。
+    """
+
+    def __init__(self, cache_dir: Union[str, Path], ttl: float = 0):
+        """
+        Args:
+            cache_dir: 缓存目录
+            ttl: 缓存有效期（秒），有效期内不发请求；0 表示每次都发条件请求
+        """
+        self.cache_dir = Path(cache_dir)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "not_modified": 0, "misses": 0}
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """命中统计：hits（TTL 内命中）、not_modified（304 重新验证）、misses（完整下载）"""
+        with self._lock:
+            return dict(self._stats)
+
+    def count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def _path(self, url: str, suffix: str) -> Path:
+        return self.cache_dir / (hashlib.sha1(url.encode("utf-8")).hexdigest() + suffix)
+
+    def get(self, url: str) -> Optional[Dict]:
+        """读取缓存元数据（含解析结果），不存在或损坏时返回 None"""
+        try:
+            with open(self._path(url, ".json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def is_fresh(self, entry: Dict) -> bool:
+        """缓存是否仍在 TTL 内"""
+        return self.ttl > 0 and time.time() - entry["fetched_at"] < self.ttl
+
+    @staticmethod
+    def conditional_headers(entry: Optional[Dict]) -> Dict[str, str]:
+        """根据缓存生成条件请求头"""
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def load_body(self, url: str) -> Optional[bytes]:
+        """读取缓存的原始响应"""
+        try:
+            return gzip.decompress(self._path(url, ".html.gz").read_bytes())
+        except OSError:
+            return None
+
+    def store(self, url: str, compressed_body: bytes, headers, records: List[Dict]):
+        """
+        保存响应
+
+        Args:
+            url: 请求地址
+            compressed_body: gzip 压缩后的原始响应
+            headers: 响应头
+            records: 解析结果
+        """
+        entry = {
+            "url": url,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "fetched_at": time.time(),
+            "records": records,
+        }
+        self._write(self._path(url, ".html.gz"), compressed_body)
+        self._write(self._path(url, ".json"), json.dumps(entry, ensure_ascii=False).encode("utf-8"))
+
+    def touch(self, url: str, entry: Dict, headers):
+        """304 后刷新抓取时间（服务器可能下发新的验证器）"""
+        entry["fetched_at"] = time.time()
+        entry["etag"] = headers.get("ETag") or entry.get("etag")
+        entry["last_modified"] = headers.get("Last-Modified") or entry.get("last_modified")
+        self._write(self._path(url, ".json"), json.dumps(entry, ensure_ascii=False).encode("utf-8"))
+
+    def _write(self, path: Path, data: bytes):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+
 class DataFetcher:
     """数据抓取器"""
 
-    def __init__(self, base_url: str):
+    PARSERS = ("html5lib", "stream")
+    STREAM_CHUNK_SIZE = 64 * 1024
+    FIRST_YEAR = 3  # 双色球首期为 2003 年（期号 03001）
+
+    def __init__(
+        self,
+        base_url: str,
+        parser: str = "html5lib",
+        request_interval: float = 0,
+        timeout: float = 30,
+        max_workers: int = 4,
+        cache: Optional[ResponseCache] = None,
+    ):
+        """
+        Args:
+            base_url: 数据源地址
+            parser: HTML 解析方式，'html5lib'（构建 DOM）或 'stream'（流式逐行解析）
+            request_interval: 相邻两次请求发起的最小间隔（秒），并发抓取时同样生效
+            timeout: 单次请求超时（秒）
+            max_workers: 分片并发抓取的线程数，同时也是连接池大小
+            cache: 响应缓存（可选），启用后发送条件请求并缓存解析结果
+        """
+        if parser not in self.PARSERS:
+            raise ValueError(f"不支持的解析方式: {parser}")
         self.base_url = base_url
+        self.parser = parser
+        self.request_interval = request_interval
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.cache = cache
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:78.0) Gecko/20100101 Firefox/78.0"
         }
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._throttle_lock = threading.Lock()
+        self._next_request_at = 0.0
+
+    @property
+    def session(self) -> "requests.Session":
+        """复用 keep-alive 连接的 HTTP 会话（首次使用时创建）"""
+        with self._session_lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                session.headers.update(self.headers)
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._session = session
+            return self._session
+
+    def close(self):
+        """关闭 HTTP 会话"""
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    def fetch(self, start: int = 1, end: int = None, revalidate: bool = False) -> List[Dict]:
+        """
+        抓取双色球历史数据
+
+        Args:
+            start: 起始期号
+            end: 结束期号（可选）
+            revalidate: 为 True 时忽略缓存有效期，始终向服务器发送条件请求（强制刷新）
+        """
+        records, commit = self._fetch_range(start, end, revalidate=revalidate)
+        commit()
+        return records
+
+    def fetch_if_modified(
+        self, start: int = 1, end: int = None, conditional: bool = True
+    ) -> Tuple[Optional[List[Dict]], Callable[[], None]]:
+        """
+        抓取双色球历史数据，远端数据未变化（缓存命中或 304）时记录为 None
+
+        新下载的响应不立即写入缓存：调用方将记录持久化成功后再调用确认函数写入，
+        持久化失败时缓存保持原样，下次仍会完整下载。未启用缓存时确认函数为空操作。
+
+        Args:
+            start: 起始期号
+            end: 结束期号（可选）
+            conditional: 为 False 时忽略已有缓存，不发条件请求（如本地数据为空时）
+
+        Returns:
+            (开奖记录列表或 None, 确认函数)
+        """
+        return self._fetch_range(start, end, only_modified=True, conditional=conditional)
+
+    def cache_stats(self) -> Dict[str, int]:
+        """响应缓存命中统计（未启用缓存时为空）"""
+        return self.cache.stats if self.cache else {}
+
+    def fetch_sharded(
+        self, start: int = 1, end: Optional[int] = None, max_workers: Optional[int] = None, revalidate: bool = False
+    ) -> List[Dict]:
+        """
+        按年份分片并发抓取，合并后按期号去重并降序排列
+
+        Args:
+            start: 起始期号
+            end: 结束期号（可选，默认到今年最后一期）
+            max_workers: 并发线程数（默认使用构造时的 max_workers）
+            revalidate: 同 fetch()
+
+        Returns:
+            List[Dict]: 开奖记录列表
+        """
+        shards = self.year_shards(start, end)
+        workers = min(max_workers or self.max_workers, len(shards)) or 1
+        logger.info(f"分片抓取 {len(shards)} 个年份，并发 {workers}")
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(lambda shard: self.fetch(*shard, revalidate=revalidate), shards))
+        return self.merge_shards(results)
+
+    @classmethod
+    def year_shards(cls, start: int = 1, end: Optional[int] = None) -> List[Tuple[int, int]]:
+        """
+        将期号范围按年份拆分为 [(起始期号, 结束期号)]，期号格式为 YYNNN
+
+        Args:
+            start: 起始期号
+            end: 结束期号（可选，默认到今年最后一期）
+        """
+        last_year = end // 1000 if end else date.today().year % 100
+        shards = []
+        for year in range(max(start // 1000, cls.FIRST_YEAR), last_year + 1):
+            lo = max(start, year * 1000 + 1)
+            hi = min(end, year * 1000 + 999) if end else year * 1000 + 999
+            if lo <= hi:
+                shards.append((lo, hi))
+        return shards
+
+    @staticmethod
+    def merge_shards(shards: Iterable[List[Dict]]) -> List[Dict]:
+        """合并分片结果，按期号去重并降序排列"""
+        merged = {}
+        for records in shards:
+            for record in records:
+                merged.setdefault(int(record["times"]), record)
+        return [merged[times] for times in sorted(merged, reverse=True)]
+
+    def _throttle(self):
+        """保证相邻请求的发起间隔不小于 request_interval"""
+        if self.request_interval <= 0:
+            return
+        with self._throttle_lock:
+            now = time.monotonic()
+            wait = self._next_request_at - now
+            self._next_request_at = max(now, self._next_request_at) + self.request_interval
+        if wait > 0:
+            time.sleep(wait)
+
+    def _fetch_range(
+        self,
+        start: int,
+        end: Optional[int],
+        only_modified: bool = False,
+        conditional: bool = True,
+        revalidate: bool = False,
+    ) -> Tuple[Optional[List[Dict]], Callable[[], None]]:
+        """
+        抓取单个期号范围
+
+        Returns:
+            (开奖记录列表, 确认函数)：only_modified 且远端数据未变化时记录为 None；
+            新下载的响应在调用确认函数时才写入缓存
+        """
+        import requests
 
-    def fetch(self, start: int = 1, end: int = None) -> List[Dict]:
-        """抓取双色球历史数据"""
         url = f"{self.base_url}?start={start:05d}"
         if end:
             url += f"&end={end:05d}"
 
+        entry = self.cache.get(url) if self.cache and conditional else None
+        if entry and not revalidate and self.cache.is_fresh(entry):
+            self.cache.count("hits")
+            logger.info(f"缓存命中: {url}")
+            return (None if only_modified else entry["records"]), _noop
+
         logger.info(f"开始抓取数据: {url}")
 
         try:
-            response = requests.get(url, headers=self.headers, timeout=30)
+            stream = self.parser == "stream"
+            response = self._get(url, entry, stream)
+            if response.status_code == 304:
+                response.close()
+                if entry:
+                    self.cache.count("not_modified")
+                    self.cache.touch(url, entry, response.headers)
+                    logger.info(f"数据未变化: {url}")
+                    return (None if only_modified else entry["records"]), _noop
+                # 本地没有缓存却收到 304（如缓存已被删除、中间代理），按未命中处理，不带条件头重新请求
+                logger.warning(f"收到 304 但本地无缓存，重新请求: {url}")
+                response = self._get(url, None, stream)
+                if response.status_code == 304:
+                    response.close()
+                    raise Exception("服务器返回 304，但本地没有可用缓存")
             response.raise_for_status()
-            response.encoding = "UTF-8"
-            html = response.text
-            records = self._parse_html(html)
+
+            compressor = zlib.compressobj(wbits=31) if self.cache else None  # gzip 格式
+            compressed = []
+            if stream:
+                chunks = response.iter_content(self.STREAM_CHUNK_SIZE)
+                if compressor:
+                    chunks = self._tee(chunks, compressor, compressed)
+                records = list(iter_history_rows(chunks))
+            else:
+                response.encoding = "UTF-8"
+                records = self._parse_html(response.text)
+                if compressor:
+                    compressed.append(compressor.compress(response.content))
+            commit = _noop
+            if self.cache:
+                compressed.append(compressor.flush())
+                self.cache.count("misses")
+                body, headers = b"".join(compressed), response.headers
+
+                def commit():
+                    self.cache.store(url, body, headers, records)
+
             logger.info(f"成功抓取 {len(records)} 条记录")
-            return records
+            return records, commit
         except requests.exceptions.Timeout:
             logger.error(f"请求超时: {url}")
             raise Exception("请求超时，请检查网络连接")
@@ -41,8 +466,33 @@ class DataFetcher:
             logger.error(f"数据抓取失败: {e}")
             raise Exception(f"数据抓取失败: {e}")
 
+    def _get(self, url: str, entry: Optional[Dict], stream: bool) -> "requests.Response":
+        """发送请求，entry 非空时带上条件请求头"""
+        self._throttle()
+        return self.session.get(
+            url,
+            headers=ResponseCache.conditional_headers(entry),
+            timeout=self.timeout,
+            stream=stream,
+        )
+
+    @staticmethod
+    def _tee(chunks: Iterable[bytes], compressor, out: List[bytes]) -> Iterator[bytes]:
+        """逐块转发响应，同时增量压缩到 out 以写入缓存"""
+        for chunk in chunks:
+            out.append(compressor.compress(chunk))
+            yield chunk
+
+    def parse(self, html: str) -> List[Dict]:
+        """按当前解析方式解析 HTML"""
+        if self.parser == "stream":
+            return list(iter_history_rows([html]))
+        return self._parse_html(html)
+
     def _parse_html(self, html: str) -> List[Dict]:
-        """解析 HTML"""
+        """解析 HTML（html5lib 构建完整 DOM）"""
+        from bs4 import BeautifulSoup
+
         soup = BeautifulSoup(html, "html5lib")
         tables = soup.find_all("table")
 
@@ -1,4 +1,38 @@
-from typing import Dict, List
+from math import comb
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from .bits import ball_masks, bit_count
+
+
+class PrizeMatrix:
+    """
+    多注号码 × 多期开奖的核对结果
+
+    - codes: 奖级编号矩阵，uint8，形状 (T, D)，编号含义见 PrizeChecker.PRIZE_NAMES（0 为未中奖）；
+      只统计次数时为 None
+    - counts: 每注号码各奖级的中奖次数，形状 (T, 7)
+    """
+
+    def __init__(self, codes: np.ndarray, counts: np.ndarray, names: Sequence[str]):
+        self.codes = codes
+        self.counts = counts
+        self.names = tuple(names)
+
+    @property
+    def best(self) -> np.ndarray:
+        """每注号码的最高奖级编号（0 为从未中奖），形状 (T,)"""
+        won = self.counts[:, 1:] > 0
+        return np.where(won.any(axis=1), won.argmax(axis=1) + 1, 0)
+
+    def summary(self, ticket: int) -> Dict[str, int]:
+        """某注号码的各奖级次数（与 batch_check 的返回格式一致）"""
+        return {
+            self.names[code]: int(count)
+            for code, count in enumerate(self.counts[ticket].tolist())
+            if count
+        }
 
 
 class PrizeChecker:
@@ -15,6 +49,12 @@ class PrizeChecker:
         (0, True): "六等奖",
     }
 
+    # 奖级编号：下标即编号，0 为未中奖
+    PRIZE_NAMES = ("未中奖", "一等奖", "二等奖", "三等奖", "四等奖", "五等奖", "六等奖")
+
+    # 矩阵核对时每批处理的号码注数：中间数组为 批注数 × 期数 × 8 字节，批过大时超出 CPU 缓存反而变慢
+    MATRIX_CHUNK = 128
+
     def check(self, user_numbers: Dict, lottery_record: Dict) -> str:
         """核对中奖"""
         user_red = set(user_numbers["red"])
@@ -32,4 +72,148 @@ class PrizeChecker:
         for record in records:
             prize = self.check(user_numbers, record)
             results[prize] = results.get(prize, 0) + 1
-        return results
\ No newline at end of file
+        return results
+
+    @classmethod
+    def prize_codes(cls) -> np.ndarray:
+        """奖级编号查找表：下标为 红球命中数 * 2 + 蓝球是否命中，形状 (14,)"""
+        table = np.zeros(14, dtype=np.uint8)
+        for (red, blue), name in cls.PRIZE_LEVELS.items():
+            table[red * 2 + blue] = cls.PRIZE_NAMES.index(name)
+        return table
+
+    def _draw_arrays(self, records) -> Tuple[np.ndarray, np.ndarray]:
+        """开奖记录转为 (红球掩码 uint64, 蓝球 uint8) 数组"""
+        masks = ball_masks(record["red_balls"] for record in records)
+        blues = np.array([int(record["blue_ball"]) for record in records], dtype=np.uint8)
+        return masks, blues
+
+    def check_matrix(self, tickets: Sequence[Dict], records) -> PrizeMatrix:
+        """
+        多注号码对多期开奖的矩阵核对
+
+        红球命中数由号码掩码与开奖掩码按位与后统计 1 的个数得到，与蓝球是否命中组合为
+        0-13 的编号，再经查找表转换为奖级编号。按号码分批计算，中间数组大小与批大小成正比。
+
+        Args:
+            tickets: 用户号码列表 [{'red': List[str], 'blue': str}]
+            records: 开奖记录列表（字典格式）
+
+        Returns:
+            PrizeMatrix: 奖级编号矩阵及每注号码的各奖级次数
+        """
+        ticket_masks = ball_masks(ticket["red"] for ticket in tickets)
+        ticket_blues = np.array([int(ticket["blue"]) for ticket in tickets], dtype=np.uint8)
+        return self.prize_matrix(ticket_masks, ticket_blues, *self._draw_arrays(records))
+
+    def prize_matrix(
+        self,
+        ticket_masks: np.ndarray,
+        ticket_blues: np.ndarray,
+        draw_masks: np.ndarray,
+        draw_blues: np.ndarray,
+        keep_codes: bool = True,
+    ) -> PrizeMatrix:
+        """
+        按掩码数组核对（check_matrix 的数组版本）
+
+        Args:
+            ticket_masks / ticket_blues: 号码红球掩码（uint64）与蓝球（uint8），形状 (T,)
+            draw_masks / draw_blues: 开奖红球掩码与蓝球，形状 (D,)
+            keep_codes: 为 False 时只统计各奖级次数，不保留 T×D 矩阵（codes 为 None）
+
+        Returns:
+            PrizeMatrix: 奖级编号矩阵及每注号码的各奖级次数
+        """
+        table = self.prize_codes()
+        levels = len(self.PRIZE_NAMES)
+        tickets, draws = len(ticket_masks), len(draw_masks)
+
+        codes = np.empty((tickets, draws), dtype=np.uint8) if keep_codes else None
+        counts = np.zeros((tickets, levels), dtype=np.int64)
+        for start in range(0, tickets, self.MATRIX_CHUNK):
+            stop = min(start + self.MATRIX_CHUNK, tickets)
+            matched = bit_count(ticket_masks[start:stop, None] & draw_masks[None, :])
+            matched *= np.uint8(2)
+            matched += ticket_blues[start:stop, None] == draw_blues[None, :]
+            chunk = codes[start:stop] if keep_codes else matched
+            np.take(table, matched, out=chunk)
+            for code in range(1, levels):
+                counts[start:stop, code] = np.count_nonzero(chunk == code, axis=1)
+        counts[:, 0] = draws - counts[:, 1:].sum(axis=1)
+        return PrizeMatrix(codes, counts, self.PRIZE_NAMES)
+
+    @staticmethod
+    def _bet_parts(bet: Dict) -> Tuple[List, List, List]:
+        """复式/胆拖投注拆为 (胆码, 拖码, 蓝球)；复式投注无胆码，蓝球可为单个号码"""
+        blue = bet["blue"]
+        return list(bet.get("banker") or ()), list(bet["red"]), [blue] if isinstance(blue, str) else list(blue)
+
+    @classmethod
+    def bet_size(cls, bet: Dict) -> int:
+        """复式/胆拖投注展开后的单式注数：C(拖码数, 6 - 胆码数) * 蓝球数"""
+        banker, drag, blues = cls._bet_parts(bet)
+        return comb(len(drag), 6 - len(banker)) * len(blues)
+
+    @staticmethod
+    def _bet_red_table(banker_count: int, drag_count: int) -> np.ndarray:
+        """
+        红球命中分布表
+
+        table[hb, hg, m] 为胆码命中 hb 个、拖码命中 hg 个时，展开后红球命中 m 个的组合数：
+        每注从拖码中选 6 - 胆码数 个，其中 j 个命中，组合数为 C(hg, j) * C(拖码数 - hg, 6 - 胆码数 - j)
+        """
+        picks = 6 - banker_count
+        table = np.zeros((banker_count + 1, 7, 7), dtype=np.int64)
+        for hb in range(banker_count + 1):
+            for hg in range(min(drag_count, 6 - hb) + 1):
+                for j in range(min(hg, picks) + 1):
+                    table[hb, hg, hb + j] += comb(hg, j) * comb(drag_count - hg, picks - j)
+        return table
+
+    def bet_matrix(self, bet: Dict, records) -> np.ndarray:
+        """
+        复式/胆拖投注逐期核对，不展开为单式
+
+        每期只需胆码命中数、拖码命中数（掩码按位与后统计 1 的个数）与蓝球是否命中，
+        查红球命中分布表后按奖级查找表汇总，每期计算量与投注大小无关。
+
+        Args:
+            bet: 投注 {'red': 拖码（复式为全部红球）, 'blue': 蓝球列表, 'banker': 胆码（可选）}
+            records: 开奖记录
+
+        Returns:
+            np.ndarray: 每期各奖级注数，形状 (D, 7)，列下标为奖级编号（见 PRIZE_NAMES）
+        """
+        banker, drag, blues = self._bet_parts(bet)
+        draw_masks, draw_blues = self._draw_arrays(records)
+        banker_mask, drag_mask = ball_masks([banker, drag])
+
+        hb = bit_count(draw_masks & banker_mask).astype(np.intp)
+        hg = bit_count(draw_masks & drag_mask).astype(np.intp)
+        red = self._bet_red_table(len(banker), len(drag))[hb, hg]  # 每期红球命中 m 个的组合数，(D, 7)
+        blue_hit = np.isin(draw_blues, [int(b) for b in blues]).astype(np.int64)
+
+        # 每种 (红球命中数, 蓝球是否命中) 的注数，列下标为 红球命中数 * 2 + 蓝球是否命中
+        by_match = np.empty((len(red), 14), dtype=np.int64)
+        by_match[:, 0::2] = red * (len(blues) - blue_hit)[:, None]
+        by_match[:, 1::2] = red * blue_hit[:, None]
+        levels = np.zeros((14, len(self.PRIZE_NAMES)), dtype=np.int64)
+        levels[np.arange(14), self.prize_codes()] = 1
+        return by_match @ levels
+
+    def _bet_summary(self, counts: np.ndarray) -> Dict[str, int]:
+        return {self.PRIZE_NAMES[code]: int(count) for code, count in enumerate(counts.tolist()) if count}
+
+    def check_bet(self, bet: Dict, lottery_record) -> Dict[str, int]:
+        """
+        核对一期复式/胆拖投注
+
+        Returns:
+            Dict[str, int]: 各奖级注数（含未中奖），合计为 bet_size(bet)
+        """
+        return self._bet_summary(self.bet_matrix(bet, [lottery_record])[0])
+
+    def batch_check_bet(self, bet: Dict, records) -> Dict[str, int]:
+        """批量核对复式/胆拖投注，返回各期合计的各奖级注数"""
+        return self._bet_summary(self.bet_matrix(bet, records).sum(axis=0))
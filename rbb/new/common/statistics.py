@@ -7,18 +7,21 @@ class StatisticsService:
 
     def __init__(self, records: List[Dict]):
         self.records = records
+        # 号码计数在首次使用时统计一次，热号、冷号、频率统计共用
+        self._red_counter = None
+        self._blue_counter = None
 
     def red_ball_frequency(self, top_n: int = 33) -> List[Tuple[str, int]]:
         """红球频率统计"""
-        all_reds = [ball for record in self.records for ball in record["red_balls"]]
-        counter = Counter(all_reds)
-        return counter.most_common(top_n)
+        if self._red_counter is None:
+            self._red_counter = Counter(ball for record in self.records for ball in record["red_balls"])
+        return self._red_counter.most_common(top_n)
 
     def blue_ball_frequency(self, top_n: int = 16) -> List[Tuple[str, int]]:
         """蓝球频率统计"""
-        all_blues = [record["blue_ball"] for record in self.records]
-        counter = Counter(all_blues)
-        return counter.most_common(top_n)
+        if self._blue_counter is None:
+            self._blue_counter = Counter(record["blue_ball"] for record in self.records)
+        return self._blue_counter.most_common(top_n)
 
     def get_hot_numbers(self, red_count: int = 6, blue_count: int = 3) -> Dict[str, List[str]]:
         """获取热号"""
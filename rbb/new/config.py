@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 
@@ -9,19 +10,42 @@ class Config:
 
     # 存储路径
     PROJECT_ROOT = Path(__file__).parent
-    DATA_DIR = PROJECT_ROOT / "data_files"
+    DATA_DIR = Path(os.environ.get("RBB_DATA_DIR") or PROJECT_ROOT / "data_files")
     STORAGE_PATH = DATA_DIR / "ssq_data.csv"
     LOG_FILE = PROJECT_ROOT / "ssq.log"
+    SEGMENT_COMPACT_THRESHOLD = 8  # 增量分段数达到该值时合并回主文件
+    DAEMON_SOCKET = DATA_DIR / "rbb.sock"  # 常驻进程套接字
 
     # 请求配置
     REQUEST_TIMEOUT = 30
     REQUEST_INTERVAL = 1  # 秒
+    FETCH_WORKERS = 4  # 分片抓取并发数
+    HTTP_CACHE_DIR = DATA_DIR / "http_cache"  # 响应缓存目录
+    HTTP_CACHE_TTL = 600  # 响应缓存有效期（秒），过期后发送条件请求
 
     # 业务配置
     DEFAULT_RECENT_COUNT = 30  # 统计最近 N 期
     HOT_NUMBERS_COUNT = 6  # 热号数量
     COLD_NUMBERS_COUNT = 6  # 冷号数量
 
+    # 回测配置
+    TICKET_PRICE = 2  # 每注金额（元）
+    # 单注奖金（元）；一、二等奖为浮动奖金，此处取估计值
+    PRIZE_AMOUNTS = {
+        "一等奖": 5_000_000,
+        "二等奖": 100_000,
+        "三等奖": 3_000,
+        "四等奖": 200,
+        "五等奖": 10,
+        "六等奖": 5,
+    }
+    BACKTEST_MIN_HISTORY = 30  # 开始回测前至少积累的期数
+
+    # 启动耗时预算（benchmarks/bench_startup.py 超出时返回非零）
+    STARTUP_BUDGET_MS = 800  # 离线 query 命令冷启动总耗时
+    IMPORT_BUDGET_MS = 400  # -X importtime 统计的顶层模块导入耗时合计
+    STARTUP_FORBIDDEN_IMPORTS = ("requests", "bs4", "html5lib")  # 离线命令不应加载的模块
+
     @classmethod
     def ensure_dirs(cls):
         """确保目录存在"""
@@ -0,0 +1,220 @@
+"""
+常驻进程模式
+
+`cli.py serve` 启动常驻进程，数据集与索引保持在内存中，通过 Unix 域套接字接收命令。
+客户端只依赖标准库：发送命令行参数，接收输出与退出码。常驻进程未运行时由调用方在本进程内执行。
+
+协议：每个连接一行 JSON 请求、一行 JSON 响应（UTF-8）
+
+- 请求: {"op": "run", "argv": [...], "cwd": "..."} / {"op": "ping"} / {"op": "stop"}
+- 响应: {"stdout": "...", "stderr": "...", "code": 0}
+"""
+
+import contextlib
+import io
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+import traceback
+from typing import Callable, List, Optional, Sequence
+
+# 设置该环境变量后不转发，始终在本进程内执行
+NO_DAEMON_ENV = "RBB_NO_DAEMON"
+
+# 不转发的子命令
+LOCAL_COMMANDS = {"serve"}
+
+# 各子命令的长选项（与 cli.CLI.build_parser 一致，由测试校验），用于按 argparse 的规则解析缩写；
+# 客户端不导入 cli，避免转发前加载数据与统计模块
+COMMAND_OPTIONS = {
+    "query": (
+        "--help", "--by", "--value", "--input", "--format", "--contains", "--any", "--ticket", "--near",
+        "--similar", "--blue", "--feature", "--from", "--to", "--month", "--year", "--weekday", "--limit",
+        "--refresh",
+    ),
+    "check": (
+        "--help", "--red", "--blue", "--banker", "--times", "--batch", "--tickets-file", "--format", "--workers",
+    ),
+    "stats": ("--help", "--type", "--count", "--group", "--from", "--to"),
+    "backtest": ("--help", "--strategy", "--window", "--min-history", "--workers"),
+    "update": ("--help", "--incremental", "--sharded"),
+    "serve": ("--help", "--socket", "--stop"),
+}
+
+# 子命令含这些选项时不转发：需要读取本进程标准输入、边处理边输出或启动进程池
+LOCAL_OPTIONS = {
+    "query": {"--input"},
+    "check": {"--tickets-file", "--workers"},
+    "backtest": {"--workers"},
+}
+
+CONNECT_TIMEOUT = 1.0  # 秒
+
+
+def _request(socket_path: str, payload: dict, timeout: Optional[float] = None) -> Optional[dict]:
+    """发送一次请求；常驻进程不可用时返回 None"""
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(socket_path):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(CONNECT_TIMEOUT)
+            sock.connect(socket_path)
+            sock.settimeout(timeout)
+            with sock.makefile("rwb") as stream:
+                stream.write(json.dumps(payload).encode("utf-8") + b"\n")
+                stream.flush()
+                line = stream.readline()
+    except OSError:
+        return None
+    if not line:
+        return None
+    return json.loads(line.decode("utf-8"))
+
+
+def is_running(socket_path: str) -> bool:
+    """常驻进程是否在监听"""
+    return _request(socket_path, {"op": "ping"}, timeout=CONNECT_TIMEOUT) is not None
+
+
+def _resolve(arg: str, options: Sequence[str]) -> List[str]:
+    """
+    与 argparse 相同的长选项解析："=" 之前的部分与选项完全相同时取该选项，
+    否则取以其为前缀的全部选项（多于一个时 argparse 报歧义错误）
+    """
+    name = arg.split("=", 1)[0]
+    if name in options:
+        return [name]
+    return [option for option in options if option.startswith(name)]
+
+
+def is_local(argv: Sequence[str]) -> bool:
+    """
+    命令是否必须在本进程内执行
+
+    按所选子命令自己的选项解析各参数（含 "--input=-" 形式及缩写），解析到 LOCAL_OPTIONS 中的选项时不转发；
+    有歧义且可能是本地选项的缩写同样不转发，交由本进程的 argparse 报错。
+    """
+    if not argv:
+        return False
+    command = argv[0]
+    if command in LOCAL_COMMANDS:
+        return True
+    local = LOCAL_OPTIONS.get(command)
+    if not local:
+        return False
+    options = COMMAND_OPTIONS[command]
+    for arg in argv[1:]:
+        if arg == "--":
+            break
+        if len(arg) > 2 and arg.startswith("--") and local.intersection(_resolve(arg, options)):
+            return True
+    return False
+
+
+def forward(argv: Sequence[str], socket_path: str) -> Optional[int]:
+    """
+    将命令转发给常驻进程并输出结果
+
+    Args:
+        argv: 命令行参数（不含程序名）
+        socket_path: 套接字路径
+
+    Returns:
+        Optional[int]: 退出码；未转发（常驻进程未运行、已禁用或为本地命令）时返回 None
+    """
+    argv = list(argv)
+    if os.environ.get(NO_DAEMON_ENV) or is_local(argv):
+        return None
+
+    response = _request(socket_path, {"op": "run", "argv": argv, "cwd": os.getcwd()})
+    if response is None:
+        return None
+    sys.stdout.write(response.get("stdout", ""))
+    sys.stderr.write(response.get("stderr", ""))
+    sys.stdout.flush()
+    return int(response.get("code", 0))
+
+
+def stop(socket_path: str) -> bool:
+    """通知常驻进程退出"""
+    return _request(socket_path, {"op": "stop"}, timeout=CONNECT_TIMEOUT) is not None
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """处理单个连接"""
+
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            request = json.loads(line.decode("utf-8"))
+        except ValueError:
+            self._reply({"stdout": "", "stderr": "无效请求\n", "code": 2})
+            return
+
+        op = request.get("op", "run")
+        if op == "ping":
+            self._reply({"stdout": "", "stderr": "", "code": 0})
+        elif op == "stop":
+            self._reply({"stdout": "", "stderr": "", "code": 0})
+            # serve_forever 所在线程正在等待本请求返回，需在其他线程中调用 shutdown
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+        else:
+            self._reply(self.server.execute(request.get("argv", []), request.get("cwd")))
+
+    def _reply(self, response: dict):
+        self.wfile.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+
+
+class DaemonServer(socketserver.UnixStreamServer):
+    """
+    常驻进程服务端
+
+    请求逐个串行处理：命令通过重定向 sys.stdout / sys.stderr 捕获输出，
+    数据集缓存与派生索引在请求之间保持常驻。
+    """
+
+    def __init__(self, socket_path: str, runner: Callable[[List[str]], Optional[int]]):
+        """
+        Args:
+            socket_path: 套接字路径
+            runner: 执行命令的函数，接收参数列表，返回退出码
+        """
+        self.socket_path = str(socket_path)
+        self.runner = runner
+        if os.path.exists(self.socket_path):
+            if is_running(self.socket_path):
+                raise RuntimeError(f"常驻进程已在运行: {self.socket_path}")
+            os.unlink(self.socket_path)  # 上次异常退出残留的套接字文件
+        super().__init__(self.socket_path, _Handler)
+        os.chmod(self.socket_path, 0o600)
+
+    def execute(self, argv: List[str], cwd: Optional[str] = None) -> dict:
+        """执行一条命令并返回捕获的输出和退出码"""
+        stdout, stderr = io.StringIO(), io.StringIO()
+        previous_cwd = os.getcwd()
+        try:
+            with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                try:
+                    if cwd:
+                        os.chdir(cwd)  # 使相对路径参数与客户端一致
+                    code = self.runner(list(argv)) or 0
+                except SystemExit as e:  # argparse 参数错误、--help 等
+                    code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+                    if isinstance(e.code, str):
+                        print(e.code, file=sys.stderr)
+                except Exception:
+                    traceback.print_exc()
+                    code = 1
+        finally:
+            os.chdir(previous_cwd)
+        return {"stdout": stdout.getvalue(), "stderr": stderr.getvalue(), "code": code}
+
+    def server_close(self):
+        super().server_close()
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.socket_path)
@@ -1,7 +1,9 @@
 # 数据访问层
 from .fetcher import DataFetcher
-from .loader import DataLoader
+from .loader import DataLoader, Dataset
 from .models import LotteryRecord
+from .stats_state import StatsState
 from .storage import CSVStorage
+from .store import DrawStore
 
-__all__ = ["LotteryRecord", "DataFetcher", "CSVStorage", "DataLoader"]
+__all__ = ["LotteryRecord", "DataFetcher", "CSVStorage", "DataLoader", "Dataset", "DrawStore", "StatsState"]
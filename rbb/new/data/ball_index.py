@@ -0,0 +1,70 @@
+from typing import Iterable, Optional
+
+import numpy as np
+
+from .store import DrawStore
+
+
+class BallIndex:
+    """
+    号码倒排位图索引
+
+    每个红球（01-33）和蓝球（01-16）对应一个位图，第 i 位表示第 i 期（store 中的位置）是否开出该号码。
+    位图以 np.packbits 按位压缩存放（每期 1 bit），"同时包含"、"包含任一"、"蓝球为"等条件
+    通过位图按位与/或组合，最后再展开为位置。
+
+    每个红球约出现在 18% 的期次中，分布均匀，游程编码类压缩收益很小，因此采用定长按位存储。
+    """
+
+    RED_MAX = 33
+    BLUE_MAX = 16
+
+    def __init__(self, store: DrawStore):
+        self.size = len(store)
+        # red[n - 1] / blue[n - 1] 为 n 号球的位图
+        self.red = np.stack(
+            [np.packbits((store.reds == n).any(axis=1)) for n in range(1, self.RED_MAX + 1)]
+        )
+        self.blue = np.stack([np.packbits(store.blues == n) for n in range(1, self.BLUE_MAX + 1)])
+
+    def _full(self) -> np.ndarray:
+        """全部期次的位图"""
+        return np.packbits(np.ones(self.size, dtype=bool))
+
+    def red_all(self, numbers: Iterable[int]) -> np.ndarray:
+        """同时包含全部红球的位图"""
+        rows = self.red[[int(n) - 1 for n in numbers]]
+        return np.bitwise_and.reduce(rows, axis=0) if len(rows) else self._full()
+
+    def red_any(self, numbers: Iterable[int]) -> np.ndarray:
+        """包含任一红球的位图"""
+        rows = self.red[[int(n) - 1 for n in numbers]]
+        return np.bitwise_or.reduce(rows, axis=0) if len(rows) else np.zeros_like(self._full())
+
+    def blue_is(self, number: int) -> np.ndarray:
+        """蓝球为给定号码的位图"""
+        return self.blue[int(number) - 1]
+
+    def match(
+        self, reds: Iterable[int] = (), blue: Optional[int] = None, match_any: bool = False
+    ) -> np.ndarray:
+        """
+        组合条件查询
+
+        Args:
+            reds: 红球号码
+            blue: 蓝球号码（可选）
+            match_any: 为 True 时红球为"包含任一"，否则为"同时包含"
+
+        Returns:
+            np.ndarray: 命中期次在 store 中的位置（升序）
+        """
+        reds = list(reds)
+        bitmap = self.red_any(reds) if match_any and reds else self.red_all(reds)
+        if blue is not None:
+            bitmap = bitmap & self.blue_is(blue)
+        return self.positions(bitmap)
+
+    def positions(self, bitmap: np.ndarray) -> np.ndarray:
+        """位图展开为位置数组"""
+        return np.flatnonzero(np.unpackbits(bitmap, count=self.size))
@@ -0,0 +1,103 @@
+from math import comb
+from typing import Iterable, Optional
+
+import numpy as np
+
+from .store import DrawStore
+
+RED_MAX = 33
+RED_COUNT = 6
+
+# _COMB[n, k] = C(n, k)，n ∈ [0, 33]，k ∈ [0, 6]
+_COMB = np.array([[comb(n, k) for k in range(RED_COUNT + 1)] for n in range(RED_MAX + 1)], dtype=np.int64)
+
+RANK_SIZE = comb(RED_MAX, RED_COUNT)  # 红球组合总数 1107568，秩 < 2^21
+KEY_BITS = 25  # 组合秩 * 16 + (蓝球 - 1) < 2^25
+
+
+def combination_rank(red_balls: Iterable) -> int:
+    """
+    红球组合在组合数系统（colex 序）中的秩：sum(C(c_i, i + 1))，c_i 为升序排列的 0 起号码
+
+    Args:
+        red_balls: 红球号码（顺序任意，数量即组合大小）
+
+    Returns:
+        int: 秩，6 个红球时取值范围 [0, C(33, 6))
+    """
+    return sum(comb(int(ball) - 1, i + 1) for i, ball in enumerate(sorted(int(b) for b in red_balls)))
+
+
+def ticket_key(red_balls: Iterable, blue_ball) -> int:
+    """号码（6 红 + 1 蓝）的 25 位整数键：组合秩 * 16 + (蓝球 - 1)"""
+    return combination_rank(red_balls) * 16 + int(blue_ball) - 1
+
+
+def _ranks(sorted_reds: np.ndarray) -> np.ndarray:
+    """按行计算组合秩，sorted_reds 为升序排列的 0 起号码，形状 (N, k)"""
+    k = sorted_reds.shape[1]
+    return _COMB[sorted_reds, np.arange(1, k + 1)].sum(axis=1)
+
+
+class _Buckets:
+    """直接寻址分桶表：键（0 <= key < size）-> 位置数组，CSR 布局，查找 O(1)"""
+
+    def __init__(self, keys: np.ndarray, values: np.ndarray, size: int):
+        order = np.argsort(keys, kind="stable")
+        self.values = values[order].astype(np.int32)
+        self.offsets = np.zeros(size + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys, minlength=size), out=self.offsets[1:])
+
+    def get(self, key: int) -> np.ndarray:
+        return self.values[self.offsets[key]:self.offsets[key + 1]]
+
+
+class ComboIndex:
+    """
+    红球组合秩索引
+
+    - 精确查找：按 6 红球组合秩分桶，"该组合是否开出过" 为 O(1) 查找
+    - 近似查找（至少 5 个红球相同）：多索引哈希，每期的 6 个 5 红球子组合分别按秩分桶；
+      与号码至少 5 个红球相同的期次必然与号码共享某个 5 红球子组合，只需查 6 个桶
+    """
+
+    def __init__(self, store: DrawStore):
+        self.size = len(store)
+        reds = np.sort(store.reds, axis=1).astype(np.int64) - 1
+        self.ranks = _ranks(reds).astype(np.int32)
+        self.keys = self.ranks * 16 + store.blues.astype(np.int32) - 1
+        positions = np.arange(self.size, dtype=np.int32)
+        self._exact = _Buckets(self.ranks, positions, RANK_SIZE)
+
+        # 第 j 列为去掉第 j 个红球后的 5 红球子组合秩，形状 (N, 6)
+        subsets = np.stack(
+            [_ranks(np.delete(reds, j, axis=1)).astype(np.int32) for j in range(RED_COUNT)], axis=1
+        )
+        self._near = _Buckets(
+            subsets.ravel(), np.repeat(positions, RED_COUNT), comb(RED_MAX, RED_COUNT - 1)
+        )
+
+    def exact(self, red_balls: Iterable, blue_ball: Optional[int] = None) -> np.ndarray:
+        """
+        开出过给定红球组合（及蓝球）的期次
+
+        Returns:
+            np.ndarray: 位置数组（升序）
+        """
+        positions = self._exact.get(combination_rank(red_balls))
+        if blue_ball is not None:
+            positions = positions[self.keys[positions] % 16 == int(blue_ball) - 1]
+        return positions
+
+    def near(self, red_balls: Iterable) -> np.ndarray:
+        """
+        与给定 6 红球至少 5 个红球相同的期次
+
+        Returns:
+            np.ndarray: 位置数组（升序，去重）
+        """
+        balls = sorted(int(b) for b in red_balls)
+        buckets = [
+            self._near.get(combination_rank(balls[:j] + balls[j + 1:])) for j in range(RED_COUNT)
+        ]
+        return np.unique(np.concatenate(buckets))
@@ -0,0 +1,65 @@
+from itertools import combinations
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+RED_MAX = 33
+
+# 全部 3 红球组合（C(33, 3) = 5456 个），按号码升序，0 起下标
+_TRIPLES = np.array(list(combinations(range(RED_MAX), 3)), dtype=np.intp)
+
+
+def _one_hot(reds: np.ndarray) -> np.ndarray:
+    """红球 (N, 6) 转为 (N, 33) 的 0/1 矩阵（float32，矩阵乘法走 BLAS，期数在 2^24 内计数精确）"""
+    matrix = np.zeros((len(reds), RED_MAX), dtype=np.float32)
+    matrix[np.arange(len(reds))[:, None], reds.astype(np.intp) - 1] = 1
+    return matrix
+
+
+def _top(counts: np.ndarray, top_n: int) -> np.ndarray:
+    """次数最多的 top_n 个下标（次数相同按组合升序），不含次数为 0 的"""
+    order = np.argsort(-counts, kind="stable")[:max(top_n, 0)]
+    return order[counts[order] > 0]
+
+
+class Cooccurrence:
+    """
+    红球同现统计
+
+    由每期红球的 0/1 矩阵 X（期数 × 33）计算：两两同现矩阵为 XᵀX（对角线为各号码出现次数）；
+    三个号码同现次数按第一个号码分组，对包含号码 i 的期次再做一次 XᵢᵀXᵢ，共 33 次矩阵乘法。
+    """
+
+    def __init__(self, reds: np.ndarray):
+        """
+        Args:
+            reds: 各期红球，形状 (N, 6)
+        """
+        self._matrix = _one_hot(reds)
+        self.draws = len(reds)
+        self.pairs = (self._matrix.T @ self._matrix).astype(np.int64)  # (33, 33)，下标 0 对应 01 号
+        self._triples: Optional[np.ndarray] = None
+
+    @property
+    def triples(self) -> np.ndarray:
+        """三个号码同现次数 (33, 33, 33)，triples[i, j, k] 为同时开出 i+1、j+1、k+1 号的期数（首次使用时计算）"""
+        if self._triples is None:
+            matrix = self._matrix
+            triples = np.empty((RED_MAX, RED_MAX, RED_MAX), dtype=np.int64)
+            for i in range(RED_MAX):
+                rows = matrix[matrix[:, i] > 0]
+                triples[i] = rows.T @ rows
+            self._triples = triples
+            self._matrix = None  # 两两、三个号码同现均已算出，不再需要
+        return self._triples
+
+    def top_pairs(self, top_n: int = 20) -> List[Tuple[Tuple[int, int], int]]:
+        """同现次数最多的 top_n 对号码 [((号码, 号码), 次数)]"""
+        first, second = np.triu_indices(RED_MAX, k=1)
+        counts = self.pairs[first, second]
+        return [((int(first[i]) + 1, int(second[i]) + 1), int(counts[i])) for i in _top(counts, top_n)]
+
+    def top_triples(self, top_n: int = 20) -> List[Tuple[Tuple[int, int, int], int]]:
+        """同现次数最多的 top_n 组三个号码 [((号码, 号码, 号码), 次数)]"""
+        counts = self.triples[_TRIPLES[:, 0], _TRIPLES[:, 1], _TRIPLES[:, 2]]
+        return [(tuple(int(n) + 1 for n in _TRIPLES[i]), int(counts[i])) for i in _top(counts, top_n)]
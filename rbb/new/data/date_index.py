@@ -0,0 +1,117 @@
+from typing import Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+DateLike = Union[str, np.datetime64]
+
+# 星期名称，下标为 0（周一）到 6（周日）
+WEEKDAY_NAMES = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+WEEKDAY_LABELS = ("周一", "周二", "周三", "周四", "周五", "周六", "周日")
+
+_NAT = np.datetime64("NaT", "D").view(np.int64)
+
+
+def to_day(value: DateLike) -> int:
+    """日期转为自 1970-01-01 起的天数，格式错误时抛出 ValueError"""
+    day = np.datetime64(value, "D")
+    if np.isnat(day):
+        raise ValueError(f"无效日期: {value}")
+    return int(day.view(np.int64))
+
+
+def parse_weekday(value: Union[str, int]) -> int:
+    """星期转为 0（周一）到 6（周日），支持 mon-sun、1-7"""
+    text = str(value).strip().lower()
+    if text.isdigit() and 1 <= int(text) <= 7:
+        return int(text) - 1
+    if text[:3] in WEEKDAY_NAMES:
+        return WEEKDAY_NAMES.index(text[:3])
+    raise ValueError(f"无效星期: {value}")
+
+
+class DateIndex:
+    """
+    开奖日期索引
+
+    日期只解析一次，保存为自 1970-01-01 起的天数（epoch day），另按天数升序保存排序后的数组及对应位置。
+    日期范围、整月、整年查询通过二分查找定位；星期由天数直接算出，无需解析字符串。
+    """
+
+    def __init__(self, dates: np.ndarray):
+        """
+        Args:
+            dates: 开奖日期，datetime64[D]，按 store 中的位置排列
+        """
+        self.days = dates.astype("datetime64[D]").view(np.int64)
+        self.valid = self.days != _NAT
+        self.weekday = ((self.days + 3) % 7).astype(np.uint8)  # 1970-01-01 为周四
+        positions = np.flatnonzero(self.valid)
+        order = np.argsort(self.days[positions], kind="stable")
+        self.order = positions[order]
+        self.sorted_days = np.ascontiguousarray(self.days[self.order])
+
+    def between(self, start: Optional[DateLike] = None, end: Optional[DateLike] = None) -> np.ndarray:
+        """
+        日期在 [start, end] 内的位置（升序），start / end 缺省时不限
+
+        Returns:
+            np.ndarray: store 中的位置
+        """
+        lo = 0 if start is None else int(np.searchsorted(self.sorted_days, to_day(start), side="left"))
+        hi = len(self.sorted_days) if end is None else int(
+            np.searchsorted(self.sorted_days, to_day(end), side="right")
+        )
+        return np.sort(self.order[lo:max(lo, hi)])
+
+    def lookup(self, days: np.ndarray) -> np.ndarray:
+        """
+        批量精确查找
+
+        Args:
+            days: 自 1970-01-01 起的天数数组
+
+        Returns:
+            np.ndarray: 每个日期在 store 中的位置（同一日期有多期时取位置最小者），未找到为 -1
+        """
+        days = np.asarray(days, dtype=np.int64)
+        idx = np.searchsorted(self.sorted_days, days, side="left")
+        found = idx < len(self.sorted_days)
+        found[found] = self.sorted_days[idx[found]] == days[found]
+        positions = np.full(len(days), -1, dtype=np.int64)
+        positions[found] = self.order[idx[found]]
+        return positions
+
+    def month(self, month: str) -> np.ndarray:
+        """某月（如 "2022-06"）的位置"""
+        first = np.datetime64(month, "M")
+        return self.between(first.astype("datetime64[D]"), (first + 1).astype("datetime64[D]") - 1)
+
+    def year(self, year: Union[str, int]) -> np.ndarray:
+        """某年（如 2022）的位置"""
+        first = np.datetime64(str(year), "Y")
+        return self.between(first.astype("datetime64[D]"), (first + 1).astype("datetime64[D]") - 1)
+
+    def on_weekdays(self, positions: np.ndarray, weekdays: Iterable[int]) -> np.ndarray:
+        """从位置中筛选星期在 weekdays（0 为周一）内的"""
+        return positions[np.isin(self.weekday[positions], list(weekdays))]
+
+    def buckets(self, kind: str) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+        """
+        按日历分组
+
+        Args:
+            kind: 'year'、'month' 或 'weekday'
+
+        Returns:
+            (位置, 各位置所属分组编号, 分组名称)，分组按时间（星期按周一至周日）排列
+        """
+        positions = np.flatnonzero(self.valid)
+        if kind == "weekday":
+            return positions, self.weekday[positions].astype(np.intp), list(WEEKDAY_LABELS)
+        if kind not in ("year", "month"):
+            raise ValueError(f"不支持的分组方式: {kind}")
+
+        unit = "datetime64[Y]" if kind == "year" else "datetime64[M]"
+        periods = self.days[positions].astype("datetime64[D]").astype(unit)
+        labels, ids = np.unique(periods, return_inverse=True)
+        return positions, ids.ravel(), labels.astype(str).tolist()
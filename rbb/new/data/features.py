@@ -0,0 +1,144 @@
+from itertools import combinations
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .store import DrawStore
+
+# 形态特征名称及说明
+FEATURE_LABELS = {
+    "sum": "和值",
+    "span": "跨度",
+    "odd": "奇数个数",
+    "zone1": "一区（01-11）个数",
+    "zone2": "二区（12-22）个数",
+    "zone3": "三区（23-33）个数",
+    "consecutive": "连号个数",
+    "ac": "AC值",
+}
+FEATURE_NAMES = tuple(FEATURE_LABELS)
+
+# 可分组的名称：各特征取值，另有 odd_even（奇偶比）与 zones（三区比）
+GROUP_LABELS = {**FEATURE_LABELS, "odd_even": "奇偶比", "zones": "三区比"}
+GROUP_NAMES = tuple(GROUP_LABELS)
+
+# 条件：单个取值、(最小值, 最大值)（含两端）或取值集合
+Condition = Union[int, Tuple[int, int], Iterable[int]]
+
+_PAIRS = np.array(list(combinations(range(6), 2)), dtype=np.intp)  # 6 个红球两两组合（15 对）
+
+
+def parse_condition(text: str) -> Tuple[str, Condition]:
+    """
+    解析条件表达式
+
+    支持 "sum=100"、"sum=90-120"、"odd=2,3,4"
+
+    Raises:
+        ValueError: 格式错误或特征名称不存在
+    """
+    name, sep, value = text.partition("=")
+    name = name.strip().lower()
+    if not sep or name not in FEATURE_LABELS:
+        raise ValueError(f"无效条件: {text}（可用特征: {', '.join(FEATURE_NAMES)}）")
+    value = value.replace(" ", "")
+    if "-" in value:
+        low, _, high = value.partition("-")
+        return name, (int(low), int(high))
+    if "," in value:
+        return name, [int(v) for v in value.split(",") if v]
+    return name, int(value)
+
+
+class DrawFeatures:
+    """
+    开奖号码形态特征
+
+    对全部期次的红球一次性向量化计算和值、跨度、奇数个数、三区个数、连号个数、AC 值，
+    每个特征保存为与 store 位置对齐的列（uint8），按特征筛选与分组直接在列上计算。
+
+    - 连号个数：排序后相邻两个红球相差 1 的对数（0-5）
+    - AC 值：15 对红球差值中不同取值的个数减 5（0-10）
+    """
+
+    def __init__(self, store: DrawStore):
+        reds = np.sort(store.reds, axis=1).astype(np.int16)
+        steps = np.diff(reds, axis=1)
+        differences = np.sort(reds[:, _PAIRS[:, 1]] - reds[:, _PAIRS[:, 0]], axis=1)
+        distinct = 1 + np.count_nonzero(np.diff(differences, axis=1), axis=1)
+
+        columns = {
+            "sum": reds.sum(axis=1),
+            "span": reds[:, -1] - reds[:, 0],
+            "odd": np.count_nonzero(reds & 1, axis=1),
+            "zone1": np.count_nonzero(reds <= 11, axis=1),
+            "zone2": np.count_nonzero((reds >= 12) & (reds <= 22), axis=1),
+            "zone3": np.count_nonzero(reds >= 23, axis=1),
+            "consecutive": np.count_nonzero(steps == 1, axis=1),
+            "ac": distinct - 5,
+        }
+        self.columns: Dict[str, np.ndarray] = {name: column.astype(np.uint8) for name, column in columns.items()}
+
+    def __len__(self) -> int:
+        return len(self.columns["sum"])
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        """特征列，名称见 FEATURE_NAMES"""
+        if name not in self.columns:
+            raise ValueError(f"不支持的特征: {name}")
+        return self.columns[name]
+
+    def mask(self, conditions: Dict[str, Condition]) -> np.ndarray:
+        """
+        同时满足全部条件的期次
+
+        Args:
+            conditions: 特征名称 -> 条件，如 {"sum": (90, 120), "odd": 3, "ac": [7, 8]}
+
+        Returns:
+            np.ndarray: 与 store 位置对齐的布尔数组
+        """
+        matched = np.ones(len(self), dtype=bool)
+        for name, condition in conditions.items():
+            column = self[name]
+            if isinstance(condition, (int, np.integer)):
+                matched &= column == condition
+            elif isinstance(condition, tuple):
+                low, high = condition
+                matched &= (column >= low) & (column <= high)
+            else:
+                matched &= np.isin(column, list(condition))
+        return matched
+
+    def filter(self, conditions: Dict[str, Condition]) -> np.ndarray:
+        """同时满足全部条件的期次在 store 中的位置（升序）"""
+        return np.flatnonzero(self.mask(conditions))
+
+    def buckets(self, name: str, positions: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+        """
+        按特征取值分组
+
+        Args:
+            name: GROUP_NAMES 中的名称
+            positions: 只对这些位置分组，缺省为全部
+
+        Returns:
+            (位置, 各位置所属分组编号, 分组名称)，分组按取值升序排列，只含出现过的取值
+        """
+        if positions is None:
+            positions = np.arange(len(self))
+        if name == "odd_even":
+            values = self.columns["odd"][positions].astype(np.intp)
+            labels, ids = np.unique(values, return_inverse=True)
+            return positions, ids.ravel(), [f"{odd}:{6 - odd}" for odd in labels.tolist()]
+        if name == "zones":
+            zones = [self.columns[f"zone{i}"][positions].astype(np.intp) for i in (1, 2, 3)]
+            labels, ids = np.unique(zones[0] * 49 + zones[1] * 7 + zones[2], return_inverse=True)
+            return positions, ids.ravel(), [f"{v // 49}:{v // 7 % 7}:{v % 7}" for v in labels.tolist()]
+        labels, ids = np.unique(self[name][positions], return_inverse=True)
+        return positions, ids.ravel(), [str(v) for v in labels.tolist()]
+
+    def distribution(self, name: str, positions: Optional[np.ndarray] = None) -> Dict[str, int]:
+        """各取值的期数 {取值: 期数}，按取值升序"""
+        _, ids, labels = self.buckets(name, positions)
+        return dict(zip(labels, np.bincount(ids, minlength=len(labels)).tolist()))
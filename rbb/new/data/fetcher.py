@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 from .models import LotteryRecord
 from common.data_fetcher import DataFetcher as BaseDataFetcher
 
@@ -6,18 +6,28 @@ from common.data_fetcher import DataFetcher as BaseDataFetcher
 class DataFetcher(BaseDataFetcher):
     """双色球数据抓取器（继承共享模块）"""
 
-    def fetch(self, start: int = 1, end: Optional[int] = None) -> List[LotteryRecord]:
+    def fetch(self, start: int = 1, end: Optional[int] = None, revalidate: bool = False) -> List[LotteryRecord]:
         """
         抓取双色球历史数据
 
         Args:
             start: 起始期号
             end: 结束期号（可选，默认抓取全部）
+            revalidate: 为 True 时忽略缓存有效期，始终发送条件请求
 
         Returns:
             List[LotteryRecord]: 开奖记录列表
         """
-        raw_records = super().fetch(start, end)
+        return self._to_records(super().fetch(start, end, revalidate))
+
+    def fetch_sharded(
+        self, start: int = 1, end: Optional[int] = None, max_workers: Optional[int] = None, revalidate: bool = False
+    ) -> List[LotteryRecord]:
+        """按年份分片并发抓取（见共享模块），返回 LotteryRecord 列表"""
+        return self._to_records(super().fetch_sharded(start, end, max_workers, revalidate))
+
+    @staticmethod
+    def _to_records(raw_records: List[Dict]) -> List[LotteryRecord]:
         return [
             LotteryRecord(
                 times=r["times"],
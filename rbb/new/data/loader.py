@@ -1,51 +1,184 @@
-from typing import List
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 from .fetcher import DataFetcher
 from .models import LotteryRecord
+from .stats_state import StatsState
 from .storage import CSVStorage
+from .store import DrawStore
+
+logger = logging.getLogger(__name__)
+
+
+class Dataset:
+    """
+    已加载的数据集
+
+    持有 DrawStore 及按需构建的派生对象（如查询索引），派生对象随数据集一起缓存，
+    数据文件不变时可在多次命令、多个服务实例之间共享。
+    """
+
+    def __init__(self, store: DrawStore, stat_key: Tuple, version: str):
+        """
+        Args:
+            store: 列式开奖数据
+            stat_key: 加载时数据文件的 (文件名, mtime, 大小)
+            version: 数据文件内容摘要，作为数据集版本号
+        """
+        self.store = store
+        self.stat_key = stat_key
+        self.version = version
+        self._derived: Dict[str, Any] = {}
+        self._lock = threading.RLock()  # 可重入：factory 内可再获取其他派生对象
+
+    def derived(self, name: str, factory: Callable[[DrawStore], Any]) -> Any:
+        """
+        获取派生对象，首次访问时以 factory(store) 构建
+
+        Args:
+            name: 派生对象名称
+            factory: 构建函数（可在其中调用 derived 获取其他派生对象）
+        """
+        with self._lock:
+            if name not in self._derived:
+                self._derived[name] = factory(self.store)
+            return self._derived[name]
+
+
+# 进程级数据集缓存：数据文件路径 -> Dataset
+_DATASETS: Dict[str, Dataset] = {}
+_DATASETS_LOCK = threading.Lock()
+
+
+def clear_dataset_cache():
+    """清空进程级数据集缓存"""
+    with _DATASETS_LOCK:
+        _DATASETS.clear()
 
 
 class DataLoader:
     """数据加载器（支持缓存和增量更新）"""
 
-    def __init__(self, fetcher: DataFetcher, storage: CSVStorage):
+    def __init__(self, fetcher: DataFetcher, storage: CSVStorage, sharded: bool = False):
+        """
+        Args:
+            fetcher: 数据抓取器
+            storage: 数据存储
+            sharded: 全量抓取时是否按年份分片并发抓取
+        """
         self.fetcher = fetcher
         self.storage = storage
+        self.sharded = sharded
 
-    def load(self, force_refresh: bool = False) -> List[LotteryRecord]:
+    def load(
+        self, force_refresh: bool = False, as_store: bool = False
+    ) -> Union[List[LotteryRecord], DrawStore]:
         """
         加载数据（优先使用缓存）
 
         Args:
             force_refresh: 是否强制刷新数据
+            as_store: 为 True 时返回列式存储 DrawStore
 
         Returns:
-            List[LotteryRecord]: 开奖记录列表
+            开奖记录列表或 DrawStore
         """
         if not force_refresh:
-            cached = self.storage.load()
-            if cached:
+            cached = self.storage.load(as_store=as_store)
+            if len(cached):
                 return cached
 
-        # 抓取最新数据
-        records = self.fetcher.fetch()
+        # 抓取最新数据：保存时会重写主文件并清空分段，必须向服务器确认，不能直接使用缓存有效期内的旧响应
+        if self.sharded:
+            records = self.fetcher.fetch_sharded(revalidate=True)
+        else:
+            records = self.fetcher.fetch(revalidate=True)
         self.storage.save(records)
+        if as_store:
+            return DrawStore.from_records(records)
         return records
 
-    def update_incremental(self) -> List[LotteryRecord]:
-        """增量更新数据"""
-        cached = self.storage.load()
-        if not cached:
-            return self.load(force_refresh=True)
+    def dataset(self, force_refresh: bool = False) -> Dataset:
+        """
+        获取进程内共享的数据集（含派生索引）
+
+        以数据文件的 (mtime, 大小) 快速判断是否变化；变化时再比较内容摘要，
+        只有内容确实改变才重新加载。同一进程内使用相同存储路径的 DataLoader 共享同一份数据集。
+
+        Args:
+            force_refresh: 是否强制从网络刷新数据
+        """
+        key = str(self.storage.filepath.resolve())
+        with _DATASETS_LOCK:
+            cached = _DATASETS.get(key)
+
+        if cached and not force_refresh:
+            stat_key = self.storage.stat_key()
+            if stat_key == cached.stat_key:
+                return cached
+            if self.storage.content_hash() == cached.version:
+                cached.stat_key = stat_key
+                return cached
+            logger.info("数据文件已变化，重新加载数据集")
+
+        store = self.load(force_refresh=force_refresh, as_store=True)
+        dataset = Dataset(store, self.storage.stat_key(), self.storage.content_hash())
+        with _DATASETS_LOCK:
+            _DATASETS[key] = dataset
+        return dataset
+
+    def stats_state(self, dataset: Optional[Dataset] = None) -> StatsState:
+        """
+        获取与数据集同步的号码统计状态
+
+        从数据文件旁的 JSON 读取：数据文件的 stat_key 与保存时相同则直接使用；只追加了新期次时增量计入，
+        已计入的历史期次被修改时重新构建（见 StatsState.sync），有变化时写回。结果作为数据集的派生对象缓存。
+
+        Args:
+            dataset: 数据集，默认为 self.dataset()
+        """
+        dataset = dataset or self.dataset()
+        return dataset.derived("stats_state", lambda store: self._sync_stats(store, dataset.stat_key))
+
+    def _sync_stats(
+        self, store: DrawStore, version: Optional[Tuple] = None, previous: Optional[Tuple] = None
+    ) -> StatsState:
+        """
+        读取统计状态并与 store 同步，有变化时写回
+
+        Args:
+            store: 全部数据
+            version: 数据文件的 stat_key
+            previous: 只追加了新期次时，追加之前的 stat_key（见 StatsState.sync）
+        """
+        state = StatsState.load(self.storage.stats_path) or StatsState()
+        if state.sync(store, version, previous):
+            try:
+                state.save(self.storage.stats_path)
+            except OSError as e:
+                logger.warning(f"统计状态写入失败: {e}")
+        return state
+
+    def update_incremental(self) -> DrawStore:
+        """
+        增量更新数据（新数据追加为分段，不重写主文件；统计状态只计入新增期次）
+
+        Returns:
+            DrawStore: 更新后的全部数据
+        """
+        latest_times = self.storage.get_latest_times()
+        if latest_times is None:
+            return self.load(force_refresh=True, as_store=True)
 
-        latest_times = int(cached[0].times)
         # 抓取最新数据（从最新期号+1开始）
+        previous = self.storage.stat_key()
         new_records = self.fetcher.fetch(start=latest_times + 1)
-
         if new_records:
-            # 合并数据（新数据在前）
-            all_records = new_records + cached
-            self.storage.save(all_records)
-            return all_records
+            self.storage.append(new_records)
+        store = self.storage.load_store()
+        if new_records:
+            # 新记录的期号均大于原有数据，统计状态与追加前的数据一致时只需计入新期次
+            self._sync_stats(store, self.storage.stat_key(), previous)
 
-        return cached
+        return store
@@ -1,29 +1,117 @@
-from dataclasses import dataclass
-from typing import Dict, List
+from typing import Dict, Iterable, List, Tuple
+
+# 号码显示文本，下标即号码
+_LABELS = [f"{i:02d}" for i in range(34)]
+
+
+def red_mask(red_balls: Iterable) -> int:
+    """红球号码转为 33 位掩码（第 n-1 位表示 n 号球）"""
+    mask = 0
+    for ball in red_balls:
+        mask |= 1 << (int(ball) - 1)
+    return mask
+
+
+def mask_numbers(mask: int) -> Tuple[int, ...]:
+    """33 位掩码转为升序号码元组"""
+    numbers = []
+    while mask:
+        low = mask & -mask
+        numbers.append(low.bit_length())
+        mask ^= low
+    return tuple(numbers)
+
+
+def popcount(value: int) -> int:
+    """二进制中 1 的个数"""
+    return bin(value).count("1")
 
 
-@dataclass
 class LotteryRecord:
-    """双色球开奖记录"""
+    """
+    双色球开奖记录
+
+    紧凑表示：期号存为整数，红球存为 33 位掩码，蓝球存为整数，使用 __slots__ 不创建实例字典。
+    times / red_balls / blue_ball 以补零字符串形式按需生成，供显示使用。
+    """
+
+    __slots__ = ("issue", "red_mask", "blue", "date")
+
+    def __init__(self, times: str, red_balls: List[str], blue_ball: str, date: str):
+        """
+        Args:
+            times: 期号，如 "22065"
+            red_balls: 红球列表，如 ["09", "14", "18", "23", "28", "31"]
+            blue_ball: 蓝球，如 "02"
+            date: 开奖日期，如 "2022-06-09"
+        """
+        self.issue = int(times)
+        self.red_mask = red_mask(red_balls)
+        self.blue = int(blue_ball)
+        self.date = date
+
+    @classmethod
+    def from_mask(cls, issue: int, mask: int, blue: int, date: str) -> "LotteryRecord":
+        """由整数字段直接创建（不解析字符串）"""
+        record = cls.__new__(cls)
+        record.issue = issue
+        record.red_mask = mask
+        record.blue = blue
+        record.date = date
+        return record
+
+    @property
+    def times(self) -> str:
+        """期号，如 "22065" """
+        return str(self.issue).zfill(5)
+
+    @property
+    def red_numbers(self) -> Tuple[int, ...]:
+        """红球号码（升序整数）"""
+        return mask_numbers(self.red_mask)
+
+    @property
+    def red_balls(self) -> List[str]:
+        """红球列表（升序补零字符串）"""
+        return [_LABELS[n] for n in mask_numbers(self.red_mask)]
+
+    @property
+    def blue_ball(self) -> str:
+        """蓝球（补零字符串）"""
+        return _LABELS[self.blue]
+
+    def _key(self):
+        return (self.issue, self.red_mask, self.blue, self.date)
+
+    def __eq__(self, other):
+        if not isinstance(other, LotteryRecord):
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __repr__(self):
+        return (
+            f"LotteryRecord(times={self.times!r}, red_balls={self.red_balls!r}, "
+            f"blue_ball={self.blue_ball!r}, date={self.date!r})"
+        )
 
-    times: str  # 期号，如 "22065"
-    red_balls: List[str]  # 红球列表，如 ["09", "14", "18", "23", "28", "31"]
-    blue_ball: str  # 蓝球，如 "02"
-    date: str  # 开奖日期，如 "2022-06-09"
+    def to_row(self) -> List[str]:
+        """转换为 CSV 行：times, rb1..rb6, bb, dates"""
+        return [self.times, *self.red_balls, self.blue_ball, self.date]
 
     def to_dict(self) -> Dict[str, str]:
-        """转换为字典格式（用于 CSV 存储）"""
+        """转换为字典格式"""
+        red_balls = self.red_balls
         return {
             "times": self.times,
-            "red_balls": self.red_balls,
+            "red_balls": red_balls,
             "blue_ball": self.blue_ball,
             "date": self.date,
-            "rb1": self.red_balls[0],
-            "rb2": self.red_balls[1],
-            "rb3": self.red_balls[2],
-            "rb4": self.red_balls[3],
-            "rb5": self.red_balls[4],
-            "rb6": self.red_balls[5],
+            "rb1": red_balls[0],
+            "rb2": red_balls[1],
+            "rb3": red_balls[2],
+            "rb4": red_balls[3],
+            "rb5": red_balls[4],
+            "rb6": red_balls[5],
             "bb": self.blue_ball,
             "dates": self.date,
         }
@@ -0,0 +1,81 @@
+from typing import Optional, Tuple, Union
+
+import numpy as np
+
+from .store import DrawStore
+
+_INT32 = np.iinfo(np.int32)
+
+
+class RangeIndex:
+    """
+    号码出现次数前缀和索引
+
+    按期号升序逐期累加 49 个号码（33 个红球 + 16 个蓝球）的出现次数，得到 (N + 1, 49) 的前缀和矩阵
+    （第 0 行全为 0）。任意期号范围 [a, b] 内各号码的出现次数为两行相减，耗时与范围大小无关。
+    """
+
+    RED_MAX = 33
+    BLUE_MAX = 16
+
+    def __init__(self, store: DrawStore):
+        order = np.argsort(store.times, kind="stable")
+        self.order = order  # 升序期号对应的 store 位置
+        self.times = np.ascontiguousarray(store.times[order])  # 升序期号
+        count = len(order)
+
+        prefix = np.zeros((count + 1, self.RED_MAX + self.BLUE_MAX), dtype=np.int32)
+        rows = np.arange(1, count + 1)
+        prefix[rows[:, None], store.reds[order].astype(np.intp) - 1] = 1
+        prefix[rows, self.RED_MAX + store.blues[order].astype(np.intp) - 1] = 1
+        np.cumsum(prefix, axis=0, out=prefix)
+        self.prefix = prefix
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def bounds(
+        self, start: Optional[Union[str, int]] = None, end: Optional[Union[str, int]] = None
+    ) -> Tuple[int, int]:
+        """
+        期号在 [start, end] 内的期次在升序期号中的位置区间 [lo, hi)
+
+        Args:
+            start: 起始期号（含），缺省不限
+            end: 结束期号（含），缺省不限
+        """
+        # 键先转换为 int32，避免整个期号数组被提升为 int64 复制
+        lo = 0 if start is None else int(
+            np.searchsorted(self.times, np.int32(min(max(int(start), _INT32.min), _INT32.max)), side="left")
+        )
+        hi = len(self.times) if end is None else int(
+            np.searchsorted(self.times, np.int32(min(max(int(end), _INT32.min), _INT32.max)), side="right")
+        )
+        return lo, max(lo, hi)
+
+    def counts(self, lo: int, hi: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        升序位置 [lo, hi) 内各号码的出现次数
+
+        Returns:
+            (红球次数 (33,)，蓝球次数 (16,))，下标 0 对应 01 号
+        """
+        counts = self.prefix[hi] - self.prefix[lo]
+        return counts[:self.RED_MAX], counts[self.RED_MAX:]
+
+    def between(
+        self, start: Optional[Union[str, int]] = None, end: Optional[Union[str, int]] = None
+    ) -> Tuple[int, np.ndarray, np.ndarray]:
+        """
+        期号在 [start, end] 内各号码的出现次数
+
+        Returns:
+            (期数，红球次数 (33,)，蓝球次数 (16,))
+        """
+        lo, hi = self.bounds(start, end)
+        return (hi - lo, *self.counts(lo, hi))
+
+    def latest(self, n: int) -> Tuple[int, np.ndarray, np.ndarray]:
+        """最近 n 期各号码的出现次数，返回值同 between()"""
+        lo = max(len(self.times) - max(n, 0), 0)
+        return (len(self.times) - lo, *self.counts(lo, len(self.times)))
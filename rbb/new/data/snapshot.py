@@ -0,0 +1,114 @@
+import os
+import struct
+from pathlib import Path
+from typing import Dict, Tuple
+
+import numpy as np
+
+from .store import DrawStore
+
+# 文件头：魔数(8) + 版本(u32) + 保留(u32) + 记录数(u64) + 填充(8)，共 32 字节
+MAGIC = b"SSQSNAP\0"
+VERSION = 1
+_HEADER = struct.Struct("<8sIIQ8x")
+
+# 列布局：(列名, 数据类型, 每行元素数)，各列按 8 字节对齐依次存放
+_COLUMNS = (
+    ("times", np.dtype("<i4"), 1),
+    ("reds", np.dtype("u1"), 6),
+    ("blues", np.dtype("u1"), 1),
+    ("dates", np.dtype("<i8"), 1),  # 自 1970-01-01 起的天数，可直接视为 datetime64[D]
+)
+
+
+class SnapshotError(Exception):
+    """快照文件损坏或版本不匹配"""
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def _layout(count: int) -> Tuple[Dict[str, Tuple[int, int]], int]:
+    """计算各列的 (偏移, 字节数) 以及文件总长度"""
+    layout = {}
+    offset = _HEADER.size
+    for name, dtype, width in _COLUMNS:
+        size = count * width * dtype.itemsize
+        layout[name] = (offset, size)
+        offset = _align(offset + size)
+    return layout, offset
+
+
+def write_snapshot(store: DrawStore, path: Path):
+    """
+    将 DrawStore 写入二进制快照（先写临时文件再原子替换）
+
+    Args:
+        store: 列式开奖数据
+        path: 快照文件路径
+    """
+    path = Path(path)
+    count = len(store)
+    layout, total = _layout(count)
+    columns = {
+        "times": store.times,
+        "reds": store.reds,
+        "blues": store.blues,
+        "dates": store.dates.astype("datetime64[D]").view(np.int64),
+    }
+
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, 0, count))
+        for name, dtype, _ in _COLUMNS:
+            offset, _ = layout[name]
+            f.seek(offset)
+            f.write(np.ascontiguousarray(columns[name], dtype=dtype).tobytes())
+        f.truncate(total)
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path: Path) -> DrawStore:
+    """
+    以内存映射方式读取二进制快照，各列均为映射文件上的视图，不做解析和复制
+
+    Args:
+        path: 快照文件路径
+
+    Returns:
+        DrawStore: 列式开奖数据
+
+    Raises:
+        SnapshotError: 文件头无效、版本不匹配或长度不符
+    """
+    path = Path(path)
+    with open(path, "rb") as f:
+        header = f.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        raise SnapshotError(f"快照文件头不完整: {path}")
+
+    magic, version, _, count = _HEADER.unpack(header)
+    if magic != MAGIC:
+        raise SnapshotError(f"不是有效的快照文件: {path}")
+    if version != VERSION:
+        raise SnapshotError(f"快照版本不匹配: {version} != {VERSION}")
+
+    layout, total = _layout(count)
+    if path.stat().st_size != total:
+        raise SnapshotError(f"快照文件长度异常: {path}")
+    if count == 0:
+        return DrawStore.empty()
+
+    raw = np.memmap(path, dtype=np.uint8, mode="r")
+    columns = {}
+    for name, dtype, width in _COLUMNS:
+        offset, size = layout[name]
+        column = raw[offset:offset + size].view(dtype)
+        columns[name] = column.reshape(count, width) if width > 1 else column
+    return DrawStore(
+        columns["times"],
+        columns["reds"],
+        columns["blues"],
+        columns["dates"].view("datetime64[D]"),
+    )
@@ -0,0 +1,272 @@
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from .store import DrawStore
+
+VERSION = 4
+
+_MIX1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX2 = np.uint64(0x94D049BB133111EB)
+
+
+def _mix(x: np.ndarray) -> np.ndarray:
+    """splitmix64 混合（uint64 数组，乘法按 2^64 回绕）"""
+    x = (x ^ (x >> np.uint64(30))) * _MIX1
+    x = (x ^ (x >> np.uint64(27))) * _MIX2
+    return x ^ (x >> np.uint64(31))
+
+
+def _freeze(value: Any) -> Any:
+    """版本中的列表（如从 JSON 读回的 stat_key）转为元组，便于比较"""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+class StatsState:
+    """
+    号码统计状态
+
+    保存截至最新一期的各号码出现次数、最后开出的期号、当前遗漏期数（距最后一次开出相隔的期数，
+    从未开出为全部期数）以及历次遗漏的分布（相邻两次开出之间相隔的期数，不含首次开出前的期数）。
+    新开奖到达时只处理新增的期次，按 JSON 保存在数据文件旁，
+    热号、冷号、频率、遗漏统计直接读取，无需重新统计全部历史。
+
+    同时保存数据版本（如数据文件的 stat_key）与已计入期次的摘要：版本相同时无需检查；
+    调用方确认数据只在该版本上追加了新期次时直接增量计入；其余情况比较已计入部分的摘要，
+    只追加了新期次则增量计入，历史期次被修改则重新构建。
+    摘要为各期 64 位散列之和，增量计入时只需累加新期次。
+
+    下标 0 对应 01 号，红球 33 个，蓝球 16 个。
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """清空为尚无数据"""
+        self.draws = 0
+        self.latest_times = 0  # 已计入的最新期号，0 表示尚无数据
+        self.digest = 0  # 已计入期次（期号、红球、蓝球）的摘要
+        self.version: Any = None  # 同步时数据的版本
+        self.red_counts = np.zeros(33, dtype=np.int64)
+        self.blue_counts = np.zeros(16, dtype=np.int64)
+        self.red_last = np.zeros(33, dtype=np.int64)  # 最后开出的期号，0 表示从未开出
+        self.blue_last = np.zeros(16, dtype=np.int64)
+        self.red_omission = np.zeros(33, dtype=np.int64)
+        self.blue_omission = np.zeros(16, dtype=np.int64)
+        # 遗漏分布：gaps[n - 1, k] 为 n 号球遗漏 k 期后再次开出的次数，列数随最大遗漏增长
+        self.red_gaps = np.zeros((33, 0), dtype=np.int64)
+        self.blue_gaps = np.zeros((16, 0), dtype=np.int64)
+
+    @classmethod
+    def from_store(cls, store: DrawStore) -> "StatsState":
+        """由全部数据构建"""
+        state = cls()
+        state.update(store)
+        return state
+
+    @staticmethod
+    def _digest(store: DrawStore) -> int:
+        """期次的期号、红球、蓝球摘要：各期 64 位散列之和（模 2^64），可分段计算后相加"""
+        balls = store.blues.astype(np.uint64) << np.uint64(36)
+        for i in range(store.reds.shape[1]):
+            balls |= store.reds[:, i].astype(np.uint64) << np.uint64(6 * i)
+        rows = _mix(_mix(store.times.astype(np.int64).astype(np.uint64)) ^ balls)
+        return int(rows.sum(dtype=np.uint64))
+
+    def _new_count(self, store: DrawStore) -> int:
+        """store（按期号降序）开头期号大于 latest_times 的期数，只检查新增部分"""
+        if not self.draws:
+            return len(store)
+        times = store.times
+        count = 0
+        while count < len(times) and times[count] > self.latest_times:
+            count += 1
+        return count
+
+    def _appended(self, store: DrawStore) -> bool:
+        """store 在已计入部分之后只多出新期次（只检查期数与最新期号，不检查内容）"""
+        count = self._new_count(store)
+        if len(store) - count != self.draws:
+            return False
+        return self.draws == 0 or int(store.times[count]) == self.latest_times
+
+    def matches(self, store: DrawStore) -> bool:
+        """store 是否为已计入数据再追加新期次（已计入部分的期数、最新期号及内容均不变）"""
+        if not self._appended(store):
+            return False
+        return self.draws == 0 or self._digest(store[self._new_count(store):]) == self.digest
+
+    def update(self, store: DrawStore) -> int:
+        """
+        计入期号大于 latest_times 的新期次
+
+        Args:
+            store: 开奖数据（按期号降序，新期次在前）
+
+        Returns:
+            int: 新计入的期数
+        """
+        count = self._new_count(store)
+        if not count:
+            return 0
+        new = store[:count][::-1]  # 按期号升序
+        positions = np.arange(count)
+        times = new.times.astype(np.int64)
+
+        for color, balls, size in (
+            ("red", new.reds.astype(np.intp) - 1, 33),
+            ("blue", new.blues.astype(np.intp)[:, None] - 1, 16),
+        ):
+            counts, last, omission = (getattr(self, f"{color}_{field}") for field in ("counts", "last", "omission"))
+            flat = balls.ravel()
+            flat_positions = np.repeat(positions, balls.shape[1])
+            counts += np.bincount(flat, minlength=size)
+            self._add_gaps(color, flat, flat_positions, last > 0, omission)
+
+            # 每个号码在新期次中最后一次出现的位置，未出现为 -1
+            last_pos = np.full(size, -1)
+            np.maximum.at(last_pos, flat, flat_positions)
+            seen = last_pos >= 0
+            omission += count
+            omission[seen] = count - 1 - last_pos[seen]
+            last[seen] = times[last_pos[seen]]
+
+        self.draws += count
+        self.latest_times = int(times[-1])
+        self.digest = (self.digest + self._digest(new)) % 2**64
+        return count
+
+    def _add_gaps(self, color: str, balls: np.ndarray, positions: np.ndarray, seen: np.ndarray, omission: np.ndarray):
+        """
+        把新期次中每次开出前的遗漏计入遗漏分布
+
+        Args:
+            color: 'red' 或 'blue'
+            balls: 开出的号码（0 起下标）
+            positions: 对应的新期次位置（升序，从 0 起）
+            seen: 各号码在新期次之前是否开出过
+            omission: 各号码在新期次之前的当前遗漏
+        """
+        order = np.lexsort((positions, balls))
+        balls, positions = balls[order], positions[order]
+        # 同一号码在新期次中的上一次开出位置；首次开出时接上之前的遗漏（之前从未开出则不计）
+        repeat = np.zeros(len(balls), dtype=bool)
+        repeat[1:] = balls[1:] == balls[:-1]
+        previous = np.empty_like(positions)
+        previous[1:] = positions[:-1]
+        gaps = np.where(repeat, positions - previous - 1, omission[balls] + positions)
+        counted = repeat | seen[balls]
+        if not counted.any():
+            return
+
+        balls, gaps = balls[counted], gaps[counted]
+        hist = getattr(self, f"{color}_gaps")
+        width = int(gaps.max()) + 1
+        if width > hist.shape[1]:
+            hist = np.pad(hist, ((0, 0), (0, width - hist.shape[1])))
+            setattr(self, f"{color}_gaps", hist)
+        np.add.at(hist, (balls, gaps), 1)
+
+    def gap_summary(self, color: str) -> Dict[str, np.ndarray]:
+        """
+        各号码的遗漏统计
+
+        Args:
+            color: 'red' 或 'blue'
+
+        Returns:
+            {"current": 当前遗漏, "max": 最大遗漏（含当前遗漏）, "mean": 平均遗漏（历次遗漏的均值，
+            没有完整遗漏时为 nan）, "count": 历次遗漏次数, "histogram": 遗漏分布}，下标 0 对应 01 号
+        """
+        hist = getattr(self, f"{color}_gaps")
+        current = getattr(self, f"{color}_omission")
+        count = hist.sum(axis=1)
+        total = hist @ np.arange(hist.shape[1], dtype=np.int64)
+        # 最大的非零列即历次遗漏的最大值
+        widest = np.where(hist > 0, np.arange(hist.shape[1]), 0).max(axis=1, initial=0)
+        return {
+            "current": current,
+            "max": np.maximum(widest, current),
+            "mean": np.where(count > 0, total / np.maximum(count, 1), np.nan),
+            "count": count,
+            "histogram": hist,
+        }
+
+    def sync(self, store: DrawStore, version: Any = None, previous: Any = None) -> bool:
+        """
+        与数据同步：只追加了新期次时增量计入，否则（历史期次被修改）重新构建
+
+        Args:
+            store: 开奖数据（按期号降序）
+            version: 数据版本（如 CSVStorage.stat_key()），与已保存的版本相同时直接跳过
+            previous: 追加新期次之前的数据版本；与已保存的版本相同时信任已计入部分未变，
+                只计入新期次（耗时与新增期数成正比），否则校验已计入部分的摘要
+
+        Returns:
+            bool: 状态是否有变化（需要写回）
+        """
+        version, previous = _freeze(version), _freeze(previous)
+        if version is not None and version == self.version and self.draws == len(store):
+            return False
+        trusted = previous is not None and previous == self.version and self._appended(store)
+        rebuilt = not trusted and not self.matches(store)
+        if rebuilt:
+            self.reset()
+        changed = self.update(store) > 0 or rebuilt or version != self.version
+        self.version = version
+        return changed
+
+    def to_dict(self) -> dict:
+        return {
+            "version": VERSION,
+            "draws": self.draws,
+            "latest_times": self.latest_times,
+            "digest": self.digest,
+            "data_version": self.version,
+            **{
+                name: getattr(self, name).tolist()
+                for name in (
+                    "red_counts", "blue_counts", "red_last", "blue_last", "red_omission", "blue_omission",
+                    "red_gaps", "blue_gaps",
+                )
+            },
+        }
+
+    def save(self, path: Path):
+        """保存为 JSON（先写临时文件再原子替换）"""
+        path = Path(path)
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(json.dumps(self.to_dict()), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["StatsState"]:
+        """读取 JSON，文件不存在、损坏或版本不符时返回 None"""
+        try:
+            data = json.loads(Path(path).read_text(encoding="utf-8"))
+            if data["version"] != VERSION:
+                return None
+            state = cls()
+            state.draws = int(data["draws"])
+            state.latest_times = int(data["latest_times"])
+            state.digest = int(data["digest"])
+            state.version = _freeze(data["data_version"])
+            for name, size in (("red", 33), ("blue", 16)):
+                for field in ("counts", "last", "omission"):
+                    values = np.array(data[f"{name}_{field}"], dtype=np.int64)
+                    if values.shape != (size,):
+                        return None
+                    setattr(state, f"{name}_{field}", values)
+                gaps = np.array(data[f"{name}_gaps"], dtype=np.int64)
+                if gaps.ndim != 2 or len(gaps) != size:
+                    return None
+                setattr(state, f"{name}_gaps", gaps)
+            return state
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
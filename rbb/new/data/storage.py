@@ -1,15 +1,34 @@
 import csv
+import hashlib
+import logging
+import os
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Tuple, Union
 
 from .models import LotteryRecord
+from .snapshot import SnapshotError, read_snapshot, write_snapshot
+from .store import DrawStore
+
+logger = logging.getLogger(__name__)
 
 
 class CSVStorage:
-    """CSV 数据存储"""
+    """CSV 数据存储
+
+    主文件按期号降序保存全部数据；增量数据以追加方式写入分段目录
+    （``ssq_data.segments/000001.csv`` ...），分段数达到阈值时合并回主文件。
+    读取时合并主文件与全部分段，按期号去重并降序排列。
+    """
 
-    def __init__(self, filepath: str):
+    def __init__(self, filepath: str, use_snapshot: bool = True, compact_threshold: int = 8):
         self.filepath = Path(filepath)
+        # 二进制快照与 CSV 同目录，CSV 或分段更新后自动重建
+        self.snapshot_path = self.filepath.with_suffix(".snap")
+        self.segment_dir = self.filepath.with_suffix(".segments")
+        # 号码统计状态（StatsState），由 DataLoader 随数据增量更新
+        self.stats_path = self.filepath.with_suffix(".stats.json")
+        self.use_snapshot = use_snapshot
+        self.compact_threshold = compact_threshold
         self.headers = ["times", "rb1", "rb2", "rb3", "rb4", "rb5", "rb6", "bb", "dates"]
 
     def save(self, records: List[LotteryRecord], mode: str = "w"):
@@ -18,32 +37,160 @@ class CSVStorage:
 
         Args:
             records: 开奖记录列表
-            mode: 写入模式，'w' 覆盖，'a' 追加
+            mode: 写入模式，'w' 覆盖（同时清空分段），'a' 追加
         """
-        self.filepath.parent.mkdir(parents=True, exist_ok=True)
+        if mode != "w":
+            self._write_csv(self.filepath, records, mode)
+            return
+        # 先写临时文件再替换，写入中断时主文件与分段保持原样；替换成功后才删除分段
+        tmp_path = self.filepath.with_suffix(".tmp")
+        self._write_csv(tmp_path, records, "w")
+        os.replace(tmp_path, self.filepath)
+        self._clear_segments()
 
-        with open(self.filepath, mode, encoding="utf-8-sig", newline="") as f:
-            writer = csv.DictWriter(f, self.headers)
-            if mode == "w" or not self.filepath.exists():
-                writer.writeheader()
-            for record in records:
-                writer.writerow(record.to_dict())
+    def append(self, records: List[LotteryRecord]):
+        """
+        追加增量数据（只写入新记录，不重写主文件）
 
-    def load(self) -> List[LotteryRecord]:
-        """从 CSV 加载数据"""
-        if not self.filepath.exists():
-            return []
+        Args:
+            records: 新增开奖记录列表
+        """
+        if not records:
+            return
+        segments = self._segments()
+        seq = int(segments[-1].stem) + 1 if segments else 1
+        segment = self.segment_dir / f"{seq:06d}.csv"
+        tmp_path = segment.with_suffix(".tmp")
+        self._write_csv(tmp_path, records, "w")
+        os.replace(tmp_path, segment)
+        logger.info(f"追加分段 {segment.name}: {len(records)} 条记录")
 
-        records = []
-        with open(self.filepath, "r", encoding="utf-8-sig") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                records.append(LotteryRecord.from_dict(row))
-        return records
+        if len(segments) + 1 >= self.compact_threshold:
+            self.compact()
+
+    def compact(self):
+        """将全部分段合并回主文件"""
+        if not self._segments():
+            return
+        store = self._merge()
+        self.save(store.to_records())
+        logger.info(f"分段已合并到 {self.filepath.name}: 共 {len(store)} 条记录")
+
+    def load(self, as_store: bool = False) -> Union[List[LotteryRecord], DrawStore]:
+        """
+        加载数据（主文件与分段合并后的视图）
+
+        Args:
+            as_store: 为 True 时返回列式存储 DrawStore
+
+        Returns:
+            开奖记录列表或 DrawStore
+        """
+        store = self.load_store()
+        return store if as_store else store.to_records()
+
+    def load_store(self) -> DrawStore:
+        """
+        按列加载数据
+
+        优先内存映射二进制快照；快照不存在、已过期（早于 CSV 或分段）或损坏时
+        重新解析 CSV 并重建快照。
+        """
+        if not self.filepath.exists() and not self._segments():
+            return DrawStore.empty()
+        if not self.use_snapshot:
+            return self._merge()
+
+        if self._snapshot_fresh():
+            try:
+                return read_snapshot(self.snapshot_path)
+            except SnapshotError as e:
+                logger.warning(f"快照不可用，重新生成: {e}")
+
+        store = self._merge()
+        try:
+            write_snapshot(store, self.snapshot_path)
+        except OSError as e:
+            logger.warning(f"快照写入失败: {e}")
+        return store
 
     def get_latest_times(self) -> Optional[int]:
         """获取最新期号"""
-        records = self.load()
-        if not records:
+        store = self.load_store()
+        if not len(store):
             return None
-        return int(records[0].times)
+        return int(store.times[0])
+
+    def sources(self) -> List[Path]:
+        """数据源文件：主文件及全部分段"""
+        main = [self.filepath] if self.filepath.exists() else []
+        return main + self._segments()
+
+    def stat_key(self) -> Tuple:
+        """数据源的 (文件名, mtime, 大小) 元组，用于快速判断文件是否变化"""
+        key = []
+        for path in self.sources():
+            stat = path.stat()
+            key.append((path.name, stat.st_mtime_ns, stat.st_size))
+        return tuple(key)
+
+    def content_hash(self) -> str:
+        """数据源内容的 SHA-1 摘要"""
+        digest = hashlib.sha1()
+        for path in self.sources():
+            digest.update(path.name.encode("utf-8"))
+            digest.update(path.read_bytes())
+        return digest.hexdigest()
+
+    def _write_csv(self, path: Path, records: List[LotteryRecord], mode: str):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_header = mode == "w" or not path.exists() or path.stat().st_size == 0
+
+        with open(path, mode, encoding="utf-8-sig", newline="") as f:
+            writer = csv.writer(f)
+            if write_header:
+                writer.writerow(self.headers)
+            writer.writerows(record.to_row() for record in records)
+
+    def _segments(self) -> List[Path]:
+        """按序号升序返回分段文件"""
+        if not self.segment_dir.is_dir():
+            return []
+        return sorted(self.segment_dir.glob("[0-9]*.csv"))
+
+    def _clear_segments(self):
+        for segment in self._segments():
+            segment.unlink()
+
+    def _merge(self) -> DrawStore:
+        """合并主文件与分段（越新的分段优先），按期号去重并降序排列"""
+        parts = [self._parse_store(segment) for segment in reversed(self._segments())]
+        if self.filepath.exists():
+            parts.append(self._parse_store(self.filepath))
+        return DrawStore.concat(parts).dedupe()
+
+    def _snapshot_fresh(self) -> bool:
+        """快照是否存在且不早于 CSV 及分段"""
+        if not self.snapshot_path.exists():
+            return False
+        sources = [self.filepath, self.segment_dir, *self._segments()]
+        latest = max(p.stat().st_mtime_ns for p in sources if p.exists())
+        return self.snapshot_path.stat().st_mtime_ns >= latest
+
+    def _parse_store(self, path: Path) -> DrawStore:
+        """从 CSV 按列解析数据，不逐行创建 LotteryRecord"""
+        with open(path, "r", encoding="utf-8-sig") as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            rows = list(reader)
+        if not header or not rows:
+            return DrawStore.empty()
+
+        columns = {name: i for i, name in enumerate(header)}
+        red_idx = [columns[f"rb{i}"] for i in range(1, 7)]
+        return DrawStore(
+            [row[columns["times"]] for row in rows],
+            [[row[i] for i in red_idx] for row in rows],
+            [row[columns["bb"]] for row in rows],
+            [row[columns["dates"]] for row in rows],
+        )
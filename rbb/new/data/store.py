@@ -0,0 +1,130 @@
+from typing import Dict, Iterable, Iterator, List, Sequence, Union
+
+import numpy as np
+
+from .models import LotteryRecord
+
+
+class DrawStore:
+    """列式开奖数据存储
+
+    以 NumPy 数组按列保存开奖数据，行顺序与 CSV 一致（最新一期在前）：
+
+    - times: 期号，int32，形状 (N,)
+    - reds: 红球，uint8，形状 (N, 6)
+    - blues: 蓝球，uint8，形状 (N,)
+    - dates: 开奖日期，datetime64[D]，形状 (N,)
+    """
+
+    def __init__(self, times, reds, blues, dates):
+        self.times = np.asarray(times, dtype=np.int32)
+        self.reds = np.asarray(reds, dtype=np.uint8).reshape(-1, 6)
+        self.blues = np.asarray(blues, dtype=np.uint8)
+        self.dates = np.asarray(dates, dtype="datetime64[D]")
+
+    @classmethod
+    def empty(cls) -> "DrawStore":
+        """创建空存储"""
+        return cls([], np.empty((0, 6)), [], [])
+
+    @classmethod
+    def from_records(cls, records: Sequence[LotteryRecord]) -> "DrawStore":
+        """从 LotteryRecord 列表创建"""
+        if not records:
+            return cls.empty()
+        return cls(
+            [r.issue for r in records],
+            [r.red_numbers for r in records],
+            [r.blue for r in records],
+            [r.date for r in records],
+        )
+
+    @classmethod
+    def from_dicts(cls, records: Sequence[Dict]) -> "DrawStore":
+        """从字典列表创建（兼容 common 模块的字典格式，期号和日期可缺省）"""
+        if not records:
+            return cls.empty()
+        return cls(
+            [int(r.get("times") or 0) for r in records],
+            [[int(b) for b in r["red_balls"]] for r in records],
+            [int(r["blue_ball"]) for r in records],
+            [r.get("date") or "NaT" for r in records],
+        )
+
+    @classmethod
+    def coerce(cls, records: Union["DrawStore", Sequence]) -> "DrawStore":
+        """将 DrawStore / LotteryRecord 列表 / 字典列表统一转换为 DrawStore"""
+        if isinstance(records, DrawStore):
+            return records
+        if records and isinstance(records[0], dict):
+            return cls.from_dicts(records)
+        return cls.from_records(records)
+
+    @classmethod
+    def concat(cls, stores: Sequence["DrawStore"]) -> "DrawStore":
+        """按顺序拼接多个 DrawStore"""
+        stores = [s for s in stores if len(s)]
+        if not stores:
+            return cls.empty()
+        if len(stores) == 1:
+            return stores[0]
+        return cls(
+            np.concatenate([s.times for s in stores]),
+            np.concatenate([s.reds for s in stores]),
+            np.concatenate([s.blues for s in stores]),
+            np.concatenate([s.dates for s in stores]),
+        )
+
+    def dedupe(self) -> "DrawStore":
+        """按期号去重（同一期号保留最先出现的记录）并按期号降序排列"""
+        _, first = np.unique(-self.times.astype(np.int64), return_index=True)
+        if len(first) == len(self) and np.array_equal(first, np.arange(len(self))):
+            return self
+        return self[first]
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def __getitem__(self, key) -> Union[LotteryRecord, "DrawStore"]:
+        """整数下标返回 LotteryRecord，切片/掩码/下标数组返回 DrawStore"""
+        if isinstance(key, (int, np.integer)):
+            return self.record(int(key))
+        return DrawStore(self.times[key], self.reds[key], self.blues[key], self.dates[key])
+
+    def __iter__(self) -> Iterator[LotteryRecord]:
+        return iter(self.to_records())
+
+    @property
+    def red_masks(self) -> np.ndarray:
+        """红球 33 位掩码（第 n-1 位表示 n 号球），uint64，形状 (N,)"""
+        bits = np.left_shift(np.uint64(1), self.reds.astype(np.uint64) - np.uint64(1))
+        return np.bitwise_or.reduce(bits, axis=1) if len(self) else np.zeros(0, dtype=np.uint64)
+
+    def record(self, index: int) -> LotteryRecord:
+        """获取单条记录"""
+        index = range(len(self))[index]  # 支持负下标，越界时抛出 IndexError
+        return self[index:index + 1].to_records()[0]
+
+    def to_records(self) -> List[LotteryRecord]:
+        """转换为 LotteryRecord 列表"""
+        return [
+            LotteryRecord.from_mask(issue, mask, blue, date)
+            for issue, mask, blue, date in zip(
+                self.times.tolist(),
+                self.red_masks.tolist(),
+                self.blues.tolist(),
+                self.dates.astype(str).tolist(),
+            )
+        ]
+
+    def red_counts(self) -> np.ndarray:
+        """红球出现次数，下标 0 对应 01 号，形状 (33,)"""
+        return np.bincount(self.reds.ravel(), minlength=34)[1:34]
+
+    def blue_counts(self) -> np.ndarray:
+        """蓝球出现次数，下标 0 对应 01 号，形状 (16,)"""
+        return np.bincount(self.blues, minlength=17)[1:17]
+
+    def contains_red(self, numbers: Iterable[int]) -> np.ndarray:
+        """每期开奖与给定红球的命中个数，形状 (N,)"""
+        return np.isin(self.reds, list(numbers)).sum(axis=1)
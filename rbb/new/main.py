@@ -6,7 +6,15 @@
 
 import sys
 
-from cli import main
+import daemon
+from config import Config
 
 if __name__ == "__main__":
-    sys.exit(main() or 0)
+    # 常驻进程运行时直接转发，不加载数据和依赖库
+    argv = sys.argv[1:]
+    code = daemon.forward(argv, str(Config.DAEMON_SOCKET))
+    if code is None:
+        from cli import CLI
+
+        code = CLI().run(argv)
+    sys.exit(code or 0)
@@ -2,5 +2,6 @@
 from .prize_checker import PrizeChecker
 from .query_service import QueryService
 from .statistics import StatisticsService
+from .ticket_checker import TicketChecker
 
-__all__ = ["QueryService", "PrizeChecker", "StatisticsService"]
+__all__ = ["QueryService", "PrizeChecker", "StatisticsService", "TicketChecker"]
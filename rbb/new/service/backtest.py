@@ -0,0 +1,290 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from common.bits import bit_count
+from data.store import DrawStore
+from service.prize_checker import PrizeChecker
+
+# 每期选出的号码：(红球，形状 (k, 6)；蓝球，形状 (k,))
+Tickets = Tuple[np.ndarray, np.ndarray]
+
+
+def _rank(counts: np.ndarray, top_n: int, ascending: bool = False) -> np.ndarray:
+    """按次数排序取前 top_n 个号码（次数相同按号码升序），counts 下标 0 对应 01 号"""
+    order = (counts if ascending else -counts).argsort(kind="stable")
+    return order[:top_n] + 1
+
+
+class Strategy(ABC):
+    """
+    选号策略
+
+    回测按期号升序逐期推进：先调用 pick() 取本期号码（此时只能看到之前各期），
+    核对后再调用 update() 把本期计入策略的统计。统计在 update() 中增量维护，不重新遍历历史。
+    """
+
+    name = "strategy"
+
+    def reset(self, reds: np.ndarray, blues: np.ndarray):
+        """
+        开始回测
+
+        Args:
+            reds: 全部期次的红球，按期号升序，形状 (N, 6)
+            blues: 全部期次的蓝球，形状 (N,)
+        """
+        self.reds = reds
+        self.blues = blues
+        # 0 起下标，供计数数组直接寻址
+        self.red_index = reds.astype(np.intp) - 1
+        self.blue_index = blues.astype(np.intp) - 1
+
+    def update(self, index: int):
+        """第 index 期开奖后更新统计"""
+
+    @abstractmethod
+    def pick(self) -> Tickets:
+        """选出下一期的号码"""
+
+    @staticmethod
+    def ticket(red_balls: Sequence[int], blue_ball: int) -> Tickets:
+        """单注号码"""
+        return np.asarray(red_balls).reshape(1, 6), np.array([blue_ball])
+
+
+class FrequencyStrategy(Strategy):
+    """
+    热号/冷号策略：选出现次数最多（hot）或最少（cold）的 6 个红球和 1 个蓝球
+
+    window 为 None 时统计全部历史，否则只统计最近 window 期（滑动窗口，移出窗口的期次逐期扣除）。
+    """
+
+    def __init__(self, kind: str = "hot", window: Optional[int] = None):
+        if kind not in ("hot", "cold"):
+            raise ValueError(f"不支持的策略类型: {kind}")
+        self.kind = kind
+        self.window = window
+        self.name = kind if window is None else f"{kind}{window}"
+
+    def reset(self, reds: np.ndarray, blues: np.ndarray):
+        super().reset(reds, blues)
+        self.red_counts = np.zeros(33, dtype=np.int64)
+        self.blue_counts = np.zeros(16, dtype=np.int64)
+
+    def update(self, index: int):
+        self.red_counts[self.red_index[index]] += 1
+        self.blue_counts[self.blue_index[index]] += 1
+        if self.window is not None and index >= self.window:
+            self.red_counts[self.red_index[index - self.window]] -= 1
+            self.blue_counts[self.blue_index[index - self.window]] -= 1
+
+    def pick(self) -> Tickets:
+        cold = self.kind == "cold"
+        return self.ticket(_rank(self.red_counts, 6, cold), int(_rank(self.blue_counts, 1, cold)[0]))
+
+
+class OverdueStrategy(Strategy):
+    """遗漏策略：选距上次开出间隔最长的 6 个红球和 1 个蓝球"""
+
+    name = "overdue"
+
+    def reset(self, reds: np.ndarray, blues: np.ndarray):
+        super().reset(reds, blues)
+        # 上次开出的期次下标，从未开出为 -1
+        self.red_seen = np.full(33, -1, dtype=np.int64)
+        self.blue_seen = np.full(16, -1, dtype=np.int64)
+
+    def update(self, index: int):
+        self.red_seen[self.red_index[index]] = index
+        self.blue_seen[self.blue_index[index]] = index
+
+    def pick(self) -> Tickets:
+        return self.ticket(_rank(self.red_seen, 6, ascending=True), int(_rank(self.blue_seen, 1, ascending=True)[0]))
+
+
+class RandomStrategy(Strategy):
+    """随机选号（基准）"""
+
+    name = "random"
+
+    def __init__(self, seed: int = 0):
+        self.seed = seed
+
+    def reset(self, reds: np.ndarray, blues: np.ndarray):
+        super().reset(reds, blues)
+        self.rng = np.random.default_rng(self.seed)
+
+    def pick(self) -> Tickets:
+        red_balls = self.rng.choice(33, 6, replace=False) + 1
+        return self.ticket(red_balls, int(self.rng.integers(1, 17)))
+
+
+class FixedStrategy(Strategy):
+    """每期投注同一注号码（基准）"""
+
+    name = "fixed"
+
+    def __init__(self, red_balls: Sequence[str], blue_ball: str):
+        self._ticket = self.ticket([int(b) for b in red_balls], int(blue_ball))
+
+    def pick(self) -> Tickets:
+        return self._ticket
+
+
+STRATEGY_NAMES = ("hot", "cold", "overdue", "random")
+
+
+def make_strategy(name: str, window: Optional[int] = None) -> Strategy:
+    """
+    按名称创建内置策略
+
+    Args:
+        name: 'hot'、'cold'、'overdue' 或 'random'
+        window: 热号/冷号统计最近 window 期，缺省统计全部历史
+    """
+    if name in ("hot", "cold"):
+        return FrequencyStrategy(name, window)
+    if name == "overdue":
+        return OverdueStrategy()
+    if name == "random":
+        return RandomStrategy()
+    raise ValueError(f"不支持的策略: {name}")
+
+
+class BacktestResult:
+    """单个策略的回测结果"""
+
+    def __init__(self, name: str, codes: np.ndarray, price: int, prize_amounts: Dict[str, int]):
+        """
+        Args:
+            name: 策略名称
+            codes: 每期每注的奖级编号，形状 (期数, 每期注数)
+            price: 每注金额
+            prize_amounts: 奖级名称 -> 单注奖金
+        """
+        self.name = name
+        self.codes = codes
+        self.counts = np.bincount(codes.ravel(), minlength=len(PrizeChecker.PRIZE_NAMES))
+        amounts = np.array([prize_amounts.get(level, 0) for level in PrizeChecker.PRIZE_NAMES], dtype=np.int64)
+        self.draws = len(codes)
+        self.tickets = int(codes.size)
+        self.cost = self.tickets * price
+        self.payout = int(self.counts @ amounts)
+
+    @property
+    def hit_rate(self) -> float:
+        """中奖注数占比"""
+        return float(self.counts[1:].sum() / self.tickets) if self.tickets else 0.0
+
+    @property
+    def roi(self) -> float:
+        """回报率：奖金 / 投入"""
+        return self.payout / self.cost if self.cost else 0.0
+
+    def to_dict(self) -> Dict:
+        names = PrizeChecker.PRIZE_NAMES
+        return {
+            "strategy": self.name,
+            "draws": self.draws,
+            "tickets": self.tickets,
+            "hit_rate": self.hit_rate,
+            "prizes": {names[code]: int(self.counts[code]) for code in range(1, len(names)) if self.counts[code]},
+            "cost": self.cost,
+            "payout": self.payout,
+            "roi": self.roi,
+        }
+
+
+class Backtester:
+    """
+    逐期前推的选号策略回测
+
+    从第 min_history 期起逐期推进：策略只根据之前各期选号，核对本期后再把本期计入策略统计。
+    选号逐期进行，核对在推进结束后对全部期次一次性向量化计算（掩码按位与、统计 1 的个数、查奖级表）。
+    """
+
+    def __init__(
+        self,
+        store: DrawStore,
+        min_history: int = 30,
+        price: int = 2,
+        prize_amounts: Optional[Dict[str, int]] = None,
+    ):
+        """
+        Args:
+            store: 开奖数据（任意顺序，内部按期号升序）
+            min_history: 开始回测前至少积累的期数
+            price: 每注金额
+            prize_amounts: 奖级名称 -> 单注奖金，缺省时奖金均为 0
+        """
+        order = np.argsort(store.times, kind="stable")
+        self.reds = np.ascontiguousarray(store.reds[order])
+        self.blues = np.ascontiguousarray(store.blues[order])
+        self.masks = np.ascontiguousarray(store.red_masks[order])
+        self.min_history = min(max(min_history, 0), len(order))
+        self.price = price
+        self.prize_amounts = dict(prize_amounts or {})
+
+    @property
+    def steps(self) -> int:
+        """回测期数"""
+        return len(self.reds) - self.min_history
+
+    def run(self, strategy: Strategy) -> BacktestResult:
+        """回测单个策略"""
+        strategy.reset(self.reds, self.blues)
+        for index in range(self.min_history):
+            strategy.update(index)
+
+        reds, blues = [], []
+        for index in range(self.min_history, len(self.reds)):
+            ticket_reds, ticket_blues = strategy.pick()
+            reds.append(ticket_reds)
+            blues.append(ticket_blues)
+            strategy.update(index)
+        return BacktestResult(strategy.name, self._score(reds, blues), self.price, self.prize_amounts)
+
+    def _score(self, reds: List[np.ndarray], blues: List[np.ndarray]) -> np.ndarray:
+        """逐期号码对当期开奖的奖级编号，形状 (期数, 每期注数)"""
+        if not reds:
+            return np.zeros((0, 1), dtype=np.uint8)
+        reds, blues = np.stack(reds).astype(np.uint64), np.stack(blues)
+        masks = np.bitwise_or.reduce(np.left_shift(np.uint64(1), reds - np.uint64(1)), axis=2)
+        draws = slice(self.min_history, None)
+        matched = bit_count(masks & self.masks[draws, None]) * np.uint8(2)
+        matched += blues == self.blues[draws, None]
+        return PrizeChecker.prize_codes()[matched]
+
+    def run_many(self, strategies: Sequence[Strategy], workers: int = 1) -> List[BacktestResult]:
+        """
+        回测多个策略
+
+        Args:
+            strategies: 策略列表
+            workers: 工作进程数，大于 1 时各策略分发到进程池并行回测（开奖数组在进程启动时传入一次）
+
+        Returns:
+            List[BacktestResult]: 与 strategies 顺序一致
+        """
+        if workers <= 1 or len(strategies) <= 1:
+            return [self.run(strategy) for strategy in strategies]
+
+        from concurrent.futures import ProcessPoolExecutor  # 只在并行回测时导入
+
+        with ProcessPoolExecutor(min(workers, len(strategies)), initializer=_init_worker, initargs=(self,)) as pool:
+            return list(pool.map(_run_strategy, strategies))
+
+
+# 工作进程中的回测器，由 _init_worker 设置
+_backtester: Optional[Backtester] = None
+
+
+def _init_worker(backtester: Backtester):
+    global _backtester
+    _backtester = backtester
+
+
+def _run_strategy(strategy: Strategy) -> BacktestResult:
+    return _backtester.run(strategy)
@@ -1,11 +1,22 @@
-from typing import Dict, List, Union
-from data.models import LotteryRecord
+from typing import Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+
+from data.models import LotteryRecord, popcount, red_mask
+from data.store import DrawStore
 from common.prize_checker import PrizeChecker as BasePrizeChecker
 
 
 class PrizeChecker(BasePrizeChecker):
     """中奖核对服务（继承共享模块）"""
 
+    def __init__(self):
+        # 奖级查找表：_prize_table[红球命中数, 蓝球是否命中] -> 奖级名称
+        self._prize_table = np.array(
+            [[self.PRIZE_LEVELS.get((red, blue), "未中奖") for blue in (False, True)] for red in range(7)],
+            dtype=object,
+        )
+
     def check(
         self, user_numbers: Dict[str, Union[List[str], str]], lottery_record
     ) -> str:
@@ -19,15 +30,43 @@ class PrizeChecker(BasePrizeChecker):
         Returns:
             str: 中奖等级
         """
-        if isinstance(lottery_record, LotteryRecord):
-            record_dict = lottery_record.to_dict()
-        else:
-            record_dict = lottery_record
-        return super().check(user_numbers, record_dict)
+        if not isinstance(lottery_record, LotteryRecord):
+            return super().check(user_numbers, lottery_record)
+
+        matched_red = popcount(red_mask(user_numbers["red"]) & lottery_record.red_mask)
+        matched_blue = int(user_numbers["blue"]) == lottery_record.blue
+        return self.PRIZE_LEVELS.get((matched_red, matched_blue), "未中奖")
 
     def batch_check(
-        self, user_numbers: Dict[str, Union[List[str], str]], records: List[LotteryRecord]
+        self,
+        user_numbers: Dict[str, Union[List[str], str]],
+        records: Union[DrawStore, Sequence[LotteryRecord], Sequence[Dict]],
     ) -> Dict[str, int]:
         """批量核对（统计各等级中奖次数）"""
-        records_dict = [r.to_dict() for r in records]
-        return super().batch_check(user_numbers, records_dict)
+        if not isinstance(records, DrawStore) and records and isinstance(records[0], LotteryRecord):
+            # 记录列表：直接按掩码计数，不转换为字典或数组
+            mask = red_mask(user_numbers["red"])
+            blue = int(user_numbers["blue"])
+            counts = [0] * 14
+            for record in records:
+                counts[popcount(mask & record.red_mask) * 2 + (record.blue == blue)] += 1
+            counts = np.array(counts)
+        else:
+            store = DrawStore.coerce(records)
+            matched_red = store.contains_red(int(b) for b in user_numbers["red"])
+            matched_blue = store.blues == int(user_numbers["blue"])
+            counts = np.bincount(matched_red * 2 + matched_blue, minlength=14)
+        flat_table = self._prize_table.ravel()
+
+        results: Dict[str, int] = {}
+        for code in np.flatnonzero(counts).tolist():
+            prize = flat_table[code]
+            results[prize] = results.get(prize, 0) + int(counts[code])
+        return results
+
+    def _draw_arrays(self, records) -> Tuple[np.ndarray, np.ndarray]:
+        """开奖记录（DrawStore、LotteryRecord 列表或字典列表）转为 (红球掩码, 蓝球) 数组"""
+        if not isinstance(records, DrawStore) and records and isinstance(records[0], dict):
+            return super()._draw_arrays(records)
+        store = DrawStore.coerce(records)
+        return np.ascontiguousarray(store.red_masks), np.ascontiguousarray(store.blues)
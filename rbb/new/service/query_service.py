@@ -1,30 +1,306 @@
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Sequence, Union
 
-from data.models import LotteryRecord
+import numpy as np
+
+from common.bits import bit_count
+from data.ball_index import BallIndex
+from data.combo_index import ComboIndex
+from data.date_index import DateIndex, to_day
+from data.features import Condition, DrawFeatures
+from data.models import LotteryRecord, red_mask
+from data.store import DrawStore
+
+_INT32 = np.iinfo(np.int32)
+_NO_DAY = np.iinfo(np.int64).min
+
+
+def _epoch_day(value: str) -> int:
+    """日期字符串转为天数，格式错误时返回 _NO_DAY"""
+    try:
+        return to_day(value)
+    except ValueError:
+        return _NO_DAY
 
 
 class QueryService:
-    """查询服务"""
+    """查询服务
+
+    数据按期号降序保存（与 CSV 一致），另保存一份连续的升序期号数组，
+    按期号的查询均通过二分查找定位，范围类查询返回底层数据的切片视图（不复制）。
+    """
+
+    def __init__(self, records: Union[DrawStore, Sequence[LotteryRecord]]):
+        store = DrawStore.coerce(records)
+        times = store.times
+        if len(times) > 1 and not np.all(times[:-1] >= times[1:]):
+            store = store[np.argsort(-times.astype(np.int64), kind="stable")]
+        self.store = store
+        # 升序期号；searchsorted 要求连续数组，逆序视图每次查找都会被复制
+        self._issues = np.ascontiguousarray(store.times[::-1])
+        self._date_index: Optional[DateIndex] = None
+        self._ball_index: Optional[BallIndex] = None
+        self._combo_index: Optional[ComboIndex] = None
+        self._features: Optional[DrawFeatures] = None
+        self._red_masks: Optional[np.ndarray] = None
 
-    def __init__(self, records: List[LotteryRecord]):
-        self.records = records
-        self._times_index = {r.times: r for r in records}
-        self._date_index = {r.date: r for r in records}
+    @property
+    def ball_index(self) -> BallIndex:
+        """号码倒排位图索引（首次使用时构建）"""
+        if self._ball_index is None:
+            self._ball_index = BallIndex(self.store)
+        return self._ball_index
+
+    @property
+    def date_index(self) -> DateIndex:
+        """开奖日期索引（首次使用时构建）"""
+        if self._date_index is None:
+            self._date_index = DateIndex(self.store.dates)
+        return self._date_index
+
+    @property
+    def combo_index(self) -> ComboIndex:
+        """红球组合秩索引（首次使用时构建）"""
+        if self._combo_index is None:
+            self._combo_index = ComboIndex(self.store)
+        return self._combo_index
+
+    @property
+    def features(self) -> DrawFeatures:
+        """形态特征列（首次使用时计算）"""
+        if self._features is None:
+            self._features = DrawFeatures(self.store)
+        return self._features
+
+    def _position(self, times: int, side: str) -> int:
+        """期号在升序期号数组中的插入位置"""
+        # 键先转换为 int32：Python 整数会使整个数组被提升为 int64 复制，查找退化为 O(n)
+        key = np.int32(min(max(times, _INT32.min), _INT32.max))
+        return int(np.searchsorted(self._issues, key, side=side))
+
+    def _bounds(self, start: int, end: int):
+        """期号在 [start, end] 内的记录在 store 中的位置区间 [lo, hi)"""
+        n = len(self._issues)
+        left = self._position(start, "left")
+        right = self._position(end, "right")
+        return n - max(right, left), n - left
 
     def query_by_times(self, times: str) -> Optional[LotteryRecord]:
         """按期号查询"""
-        return self._times_index.get(times)
+        if not str(times).isdigit():
+            return None
+        lo, hi = self._bounds(int(times), int(times))
+        return self.store.record(lo) if lo < hi else None
+
+    def query_many(self, values: Sequence[str], by: str = "times") -> np.ndarray:
+        """
+        批量查询（整批向量化二分查找）
+
+        Args:
+            values: 期号或日期字符串列表
+            by: 'times' 按期号，'date' 按日期
+
+        Returns:
+            np.ndarray: 每个输入在 store 中的位置，格式错误或未找到为 -1
+        """
+        if by == "times":
+            keys = np.array([int(v) if str(v).isdigit() else -1 for v in values], dtype=np.int64)
+            keys = np.clip(keys, _INT32.min, _INT32.max).astype(np.int32)
+            right = np.searchsorted(self._issues, keys, side="right")
+            found = right > 0
+            found[found] = self._issues[right[found] - 1] == keys[found]
+            found &= keys >= 0
+            return np.where(found, len(self._issues) - right, -1)
+        if by == "date":
+            days = np.array([_epoch_day(v) for v in values], dtype=np.int64)
+            positions = self.date_index.lookup(days)
+            positions[days == _NO_DAY] = -1
+            return positions
+        raise ValueError(f"不支持的查询方式: {by}")
 
     def query_by_date(self, date: str) -> Optional[LotteryRecord]:
         """按日期查询"""
-        return self._date_index.get(date)
+        try:
+            positions = self.date_index.between(date, date)
+        except ValueError:
+            return None
+        return self.store.record(int(positions[0])) if len(positions) else None
+
+    def _take(self, positions: np.ndarray) -> DrawStore:
+        """按位置取记录，位置连续时返回切片视图"""
+        if len(positions) and positions[-1] - positions[0] + 1 == len(positions):
+            return self.store[int(positions[0]):int(positions[-1]) + 1]
+        return self.store[positions]
+
+    def _on_weekdays(self, positions: np.ndarray, weekdays: Optional[Iterable[int]]) -> np.ndarray:
+        return positions if weekdays is None else self.date_index.on_weekdays(positions, weekdays)
+
+    def query_dates(
+        self,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        weekdays: Optional[Iterable[int]] = None,
+    ) -> DrawStore:
+        """
+        按日期范围查询
+
+        Args:
+            start: 起始日期（含），如 "2022-01-01"，缺省不限
+            end: 结束日期（含），缺省不限
+            weekdays: 只保留这些星期的开奖（0 为周一，6 为周日），缺省不限
+
+        Returns:
+            DrawStore: 命中的期次（按期号降序）
+
+        Raises:
+            ValueError: 日期格式错误
+        """
+        return self._take(self._on_weekdays(self.date_index.between(start, end), weekdays))
+
+    def query_month(self, month: str, weekdays: Optional[Iterable[int]] = None) -> DrawStore:
+        """查询某月（如 "2022-06"）的开奖"""
+        return self._take(self._on_weekdays(self.date_index.month(month), weekdays))
+
+    def query_year(self, year: Union[str, int], weekdays: Optional[Iterable[int]] = None) -> DrawStore:
+        """查询某年（如 2022）的开奖"""
+        return self._take(self._on_weekdays(self.date_index.year(year), weekdays))
+
+    def range_store(self, start_times: Union[str, int], end_times: Union[str, int]) -> DrawStore:
+        """按期号范围查询（含两端），返回 DrawStore 切片视图"""
+        lo, hi = self._bounds(int(start_times), int(end_times))
+        return self.store[lo:hi]
 
     def query_range(self, start_times: str, end_times: str) -> List[LotteryRecord]:
         """按期号范围查询"""
-        start = int(start_times)
-        end = int(end_times)
-        return [r for r in self.records if start <= int(r.times) <= end]
+        return self.range_store(start_times, end_times).to_records()
+
+    def latest(self, n: int) -> DrawStore:
+        """最近 n 期，返回 DrawStore 切片视图"""
+        return self.store[:max(n, 0)]
+
+    def before(self, times: Union[str, int], n: Optional[int] = None) -> DrawStore:
+        """
+        期号小于 times 的记录（按期号降序）
+
+        Args:
+            times: 期号
+            n: 只返回距离最近的 n 期，默认全部
+
+        Returns:
+            DrawStore: 切片视图
+        """
+        lo = len(self._issues) - self._position(int(times), "left")
+        return self.store[lo:] if n is None else self.store[lo:lo + max(n, 0)]
+
+    def after(self, times: Union[str, int], n: Optional[int] = None) -> DrawStore:
+        """
+        期号大于 times 的记录（按期号降序）
+
+        Args:
+            times: 期号
+            n: 只返回距离最近的 n 期，默认全部
+
+        Returns:
+            DrawStore: 切片视图
+        """
+        hi = len(self._issues) - self._position(int(times), "right")
+        return self.store[:hi] if n is None else self.store[max(hi - max(n, 0), 0):hi]
+
+    def query_features(self, conditions: Dict[str, Condition]) -> DrawStore:
+        """
+        按形态特征查询
+
+        Args:
+            conditions: 特征名称 -> 条件，如 {"sum": (90, 120), "odd": 3, "ac": [7, 8]}
+
+        Returns:
+            DrawStore: 同时满足全部条件的期次（按期号降序）
+        """
+        return self._take(self.features.filter(conditions))
+
+    def search_contains(
+        self,
+        red_balls: Sequence[str] = (),
+        blue_ball: Optional[str] = None,
+        match_any: bool = False,
+    ) -> DrawStore:
+        """
+        按包含的号码查询
+
+        Args:
+            red_balls: 红球号码，如 ["07", "21"]
+            blue_ball: 蓝球号码（可选），如 "05"
+            match_any: 为 True 时查询包含任一红球的期次，否则查询同时包含全部红球的期次
+
+        Returns:
+            DrawStore: 命中的期次（按期号降序）
+        """
+        positions = self.ball_index.match(
+            [int(b) for b in red_balls],
+            None if blue_ball is None else int(blue_ball),
+            match_any,
+        )
+        return self.store[positions]
 
     def search_by_red_balls(self, red_balls: List[str]) -> List[LotteryRecord]:
         """按红球组合查询"""
-        return [r for r in self.records if set(r.red_balls) == set(red_balls)]
+        if len({int(b) for b in red_balls}) != 6:
+            return []
+        # 每期恰好 6 个红球，同时包含 6 个号码即为组合相同
+        return self.search_contains(red_balls).to_records()
+
+    def query_ticket(self, red_balls: Sequence[str], blue_ball: Optional[str] = None) -> DrawStore:
+        """
+        查询某注号码是否开出过（组合秩 O(1) 查找）
+
+        Args:
+            red_balls: 6 个红球
+            blue_ball: 蓝球（可选，不指定时只比较红球）
+
+        Returns:
+            DrawStore: 开出过该号码的期次（按期号降序）
+        """
+        blue = None if blue_ball is None else int(blue_ball)
+        return self.store[self.combo_index.exact(red_balls, blue)]
+
+    def query_near(self, red_balls: Sequence[str]) -> DrawStore:
+        """
+        查询与某注号码至少 5 个红球相同的期次（5 红球子组合多索引查找，不扫描全部记录）
+
+        Args:
+            red_balls: 6 个红球
+
+        Returns:
+            DrawStore: 命中的期次（按期号降序）
+        """
+        return self.store[self.combo_index.near(red_balls)]
+
+    def similar(self, red_balls: Sequence[str], blue_ball: Optional[str] = None, k: int = 20) -> DrawStore:
+        """
+        与某注号码最接近的 k 期
+
+        依次按红球相同个数、蓝球是否相同、期号（越新越靠前）排序。
+        红球相同个数由整列 33 位掩码按位与后统计 1 的个数得到，不逐条构建集合。
+
+        Args:
+            red_balls: 红球号码
+            blue_ball: 蓝球（可选）
+            k: 返回期数
+
+        Returns:
+            DrawStore: 最接近的 k 期（按上述顺序）
+        """
+        if self._red_masks is None:
+            self._red_masks = np.ascontiguousarray(self.store.red_masks)
+        # 得分 = 红球相同个数 * 2 + 蓝球是否相同，取值 0-13
+        score = bit_count(self._red_masks & np.uint64(red_mask(red_balls))) * np.uint8(2)
+        if blue_ball is not None:
+            score += self.store.blues == int(blue_ball)
+
+        # 由高分向低分累计，确定入选的最低得分，只对不低于该得分的期次排序
+        k = min(max(k, 0), len(score))
+        at_least = np.cumsum(np.bincount(score, minlength=14)[::-1])  # at_least[i]: 得分 >= 13 - i 的期数
+        lowest = 13 - int(np.argmax(at_least >= k))
+        candidates = np.flatnonzero(score >= lowest)
+        # 候选位置已按期号降序排列，稳定排序保证同分时新的期次在前
+        order = np.argsort(-score[candidates].astype(np.int8), kind="stable")[:k]
+        return self.store[candidates[order]]
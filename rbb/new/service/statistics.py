@@ -1,32 +1,302 @@
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from data.cooccurrence import Cooccurrence
+from data.date_index import DateIndex
+from data.features import FEATURE_NAMES, GROUP_NAMES, DrawFeatures
 from data.models import LotteryRecord
+from data.range_index import RangeIndex
+from data.stats_state import StatsState
+from data.store import DrawStore
 from common.statistics import StatisticsService as BaseStatisticsService
 
 
 class StatisticsService(BaseStatisticsService):
-    """统计分析服务（继承共享模块）"""
+    """统计分析服务（继承共享模块，基于 DrawStore 向量化计算）
+
+    号码出现次数取自 StatsState，热号、冷号、频率统计只需对 33 + 16 个计数排序；
+    任意期号范围的统计通过 window() 由前缀和索引两行相减得到。
+    """
+
+    def __init__(
+        self,
+        records: Union[DrawStore, Sequence[LotteryRecord], Sequence[Dict]],
+        state: Optional[StatsState] = None,
+    ):
+        """
+        Args:
+            records: 开奖数据
+            state: 与 records 对应的统计状态（如 DataLoader.stats_state()），缺省时由 records 构建
+        """
+        self.store = DrawStore.coerce(records)
+        super().__init__(self.store)
+        self._state = state
+        self._date_index = None
+        self._features = None
+        self._range_index = None
+        self._cooccurrence = None
+        self._window_cooccurrence: Dict[Tuple[int, int], Cooccurrence] = {}  # 按期号范围缓存的同现统计
+
+    @property
+    def state(self) -> StatsState:
+        """号码统计状态（未传入时首次使用时由 store 构建）"""
+        if self._state is None:
+            self._state = StatsState.from_store(self.store)
+        return self._state
+
+    @property
+    def red_counts(self) -> np.ndarray:
+        """各红球出现次数，下标 0 对应 01 号"""
+        return self.state.red_counts
+
+    @property
+    def blue_counts(self) -> np.ndarray:
+        """各蓝球出现次数，下标 0 对应 01 号"""
+        return self.state.blue_counts
+
+    @property
+    def range_index(self) -> RangeIndex:
+        """号码出现次数前缀和索引（首次使用时构建）"""
+        if self._range_index is None:
+            self._range_index = RangeIndex(self.store)
+        return self._range_index
+
+    def window(
+        self,
+        start: Optional[Union[str, int]] = None,
+        end: Optional[Union[str, int]] = None,
+        recent: Optional[int] = None,
+    ) -> "WindowStatistics":
+        """
+        期号范围内的统计
+
+        Args:
+            start: 起始期号（含），缺省不限
+            end: 结束期号（含），缺省不限
+            recent: 只统计最近 recent 期，指定时忽略 start / end
 
-    def __init__(self, records):
-        if records and isinstance(records[0], LotteryRecord):
-            records_dict = [r.to_dict() for r in records]
+        Returns:
+            WindowStatistics: 范围内的统计，频率、热号、冷号与范围大小无关
+        """
+        index = self.range_index
+        if recent is not None:
+            lo, hi = max(len(index) - max(recent, 0), 0), len(index)
         else:
-            records_dict = records
-        super().__init__(records_dict)
+            lo, hi = index.bounds(start, end)
+        return WindowStatistics(self, lo, hi)
+
+    @property
+    def cooccurrence(self) -> Cooccurrence:
+        """红球同现统计（首次使用时计算）"""
+        if self._cooccurrence is None:
+            self._cooccurrence = Cooccurrence(self.store.reds)
+        return self._cooccurrence
+
+    def pair_frequency(self, top_n: int = 20) -> List[Tuple[Tuple[str, str], int]]:
+        """同时开出次数最多的红球对 [((号码, 号码), 次数)]"""
+        return [
+            (tuple(f"{n:02d}" for n in pair), count) for pair, count in self.cooccurrence.top_pairs(top_n)
+        ]
+
+    def triple_frequency(self, top_n: int = 20) -> List[Tuple[Tuple[str, str, str], int]]:
+        """同时开出次数最多的三个红球 [((号码, 号码, 号码), 次数)]"""
+        return [
+            (tuple(f"{n:02d}" for n in triple), count) for triple, count in self.cooccurrence.top_triples(top_n)
+        ]
+
+    @property
+    def date_index(self) -> DateIndex:
+        """开奖日期索引（首次使用时构建）"""
+        if self._date_index is None:
+            self._date_index = DateIndex(self.store.dates)
+        return self._date_index
+
+    @property
+    def features(self) -> DrawFeatures:
+        """形态特征列（首次使用时计算）"""
+        if self._features is None:
+            self._features = DrawFeatures(self.store)
+        return self._features
+
+    def feature_distribution(self, name: str) -> Dict[str, int]:
+        """
+        形态特征分布
+
+        Args:
+            name: 特征名称，或 'odd_even'（奇偶比）、'zones'（三区比）
+
+        Returns:
+            {取值: 期数}，按取值升序
+        """
+        return self.features.distribution(name)
+
+    def feature_summary(self) -> Dict[str, Dict[str, float]]:
+        """各形态特征的平均值、最小值、最大值，没有数据时为空"""
+        if not len(self.store):
+            return {}
+        features = self.features
+        return {
+            name: {
+                "mean": round(float(features[name].mean()), 2),
+                "min": int(features[name].min()),
+                "max": int(features[name].max()),
+            }
+            for name in FEATURE_NAMES
+        }
+
+    @staticmethod
+    def _rank(counts: np.ndarray, top_n: int, keep_zero: bool = False) -> List[Tuple[str, int]]:
+        """
+        按出现次数降序排列（次数相同按号码升序），返回 [(号码, 次数)]
+
+        keep_zero 为 True 时未出现的号码以次数 0 排在最后（冷号取自末尾），否则不列出；
+        没有任何开奖时返回空列表。
+        """
+        if not counts.any():
+            return []
+        order = np.argsort(-counts, kind="stable")
+        if not keep_zero:
+            order = order[counts[order] > 0]
+        return [(f"{i + 1:02d}", int(counts[i])) for i in order[:top_n]]
+
+    def red_ball_frequency(self, top_n: int = 33, keep_zero: bool = False) -> List[Tuple[str, int]]:
+        """红球频率统计，keep_zero 为 True 时包含未出现的号码（次数 0）"""
+        return self._rank(self.red_counts, top_n, keep_zero)
+
+    def blue_ball_frequency(self, top_n: int = 16, keep_zero: bool = False) -> List[Tuple[str, int]]:
+        """蓝球频率统计，keep_zero 为 True 时包含未出现的号码（次数 0）"""
+        return self._rank(self.blue_counts, top_n, keep_zero)
+
+    def get_cold_numbers(self, red_count: int = 6, blue_count: int = 3) -> Dict[str, List[str]]:
+        """获取冷号：出现次数最少的号码，范围内未出现的号码最冷"""
+        cold_reds = [num for num, _ in self.red_ball_frequency(keep_zero=True)[-red_count:]]
+        cold_blues = [num for num, _ in self.blue_ball_frequency(keep_zero=True)[-blue_count:]]
+        return {"red": cold_reds, "blue": cold_blues}
 
     def analyze_missing(self, recent_n: int = 30) -> Dict[str, Dict[str, int]]:
-        """分析遗漏值（最近 N 期未出现的号码）"""
-        recent_records = self.records[:recent_n]
+        """分析遗漏值：最近 N 期未出现的号码及其当前遗漏期数（按遗漏降序）"""
+        result = {}
+        for color in ("red", "blue"):
+            current = getattr(self.state, f"{color}_omission")
+            order = np.argsort(-current, kind="stable")
+            result[color] = {f"{i + 1:02d}": int(current[i]) for i in order if current[i] >= recent_n}
+        return result
+
+    def omission(self) -> Dict[str, Dict[str, Dict]]:
+        """
+        遗漏统计
+
+        遗漏为号码相邻两次开出之间相隔的期数（首次开出前的期数不计入历次遗漏），
+        当前遗漏为最后一次开出至今的期数（从未开出为全部期数）。取自 StatsState，无需重新扫描历史。
+
+        Returns:
+            {"red": {号码: 统计}, "blue": {号码: 统计}}，统计为
+            {"current": 当前遗漏, "max": 最大遗漏（含当前遗漏）, "mean": 平均遗漏（没有历次遗漏时为 None）,
+            "count": 历次遗漏次数, "histogram": {遗漏期数: 次数}}
+        """
+        result = {}
+        for color in ("red", "blue"):
+            summary = self.state.gap_summary(color)
+            current, longest, mean, count = (
+                summary[key].tolist() for key in ("current", "max", "mean", "count")
+            )
+            histogram = summary["histogram"]
+            result[color] = {
+                f"{i + 1:02d}": {
+                    "current": current[i],
+                    "max": longest[i],
+                    "mean": round(mean[i], 2) if count[i] else None,
+                    "count": count[i],
+                    "histogram": {int(gap): int(histogram[i, gap]) for gap in np.flatnonzero(histogram[i])},
+                }
+                for i in range(len(current))
+            }
+        return result
+
+    def frequency_by_bucket(
+        self, bucket: str = "year", top_n: int = 33
+    ) -> Dict[str, Dict[str, Union[int, List[Tuple[str, int]]]]]:
+        """
+        按日历或形态特征分组统计号码频率
 
-        red_set = {str(i).zfill(2) for i in range(1, 34)}
-        blue_set = {str(i).zfill(2) for i in range(1, 17)}
+        Args:
+            bucket: 分组方式，'year'（按年）、'month'（按月）、'weekday'（按星期），
+                或形态特征名称、'odd_even'（奇偶比）、'zones'（三区比）
+            top_n: 每组红球/蓝球各返回前 N 个
 
-        recent_reds = {ball for r in recent_records for ball in r["red_balls"]}
-        recent_blues = {r["blue_ball"] for r in recent_records}
+        Returns:
+            {分组名称: {"draws": 期数, "red": [(号码, 次数)], "blue": [(号码, 次数)]}}，
+            分组按时间（星期按周一至周日）或特征取值排列，不含没有开奖的分组
+        """
+        index = self.features if bucket in GROUP_NAMES else self.date_index
+        positions, ids, labels = index.buckets(bucket)
+        groups = len(labels)
+        reds = self.store.reds[positions].astype(np.intp)
+        blues = self.store.blues[positions].astype(np.intp)
 
-        missing_reds = red_set - recent_reds
-        missing_blues = blue_set - recent_blues
+        # 以 (分组, 号码) 组合编号一次 bincount 得到所有分组的计数
+        red_counts = np.bincount((ids[:, None] * 34 + reds).ravel(), minlength=groups * 34).reshape(groups, 34)
+        blue_counts = np.bincount(ids * 17 + blues, minlength=groups * 17).reshape(groups, 17)
+        draws = np.bincount(ids, minlength=groups)
 
         return {
-            "red": {num: recent_n for num in missing_reds},
-            "blue": {num: recent_n for num in missing_blues},
+            label: {
+                "draws": int(draws[g]),
+                "red": self._rank(red_counts[g, 1:], top_n),
+                "blue": self._rank(blue_counts[g, 1:], top_n),
+            }
+            for g, label in enumerate(labels)
+            if draws[g]
         }
+
+
+class WindowStatistics(StatisticsService):
+    """
+    期号范围内的统计
+
+    出现次数由前缀和矩阵两行相减得到；范围内期次在全部数据中连续时取切片视图，不复制。
+    统计状态（遗漏等）在首次使用时构建，范围为全部期次时沿用全部数据的统计状态。
+    """
+
+    COOCCURRENCE_CACHE_SIZE = 16
+
+    def __init__(self, parent: StatisticsService, lo: int, hi: int):
+        """
+        Args:
+            parent: 全部数据的统计服务
+            lo, hi: 范围在升序期号中的位置区间 [lo, hi)
+        """
+        index = parent.range_index
+        positions = index.order[lo:hi][::-1]  # 范围内期次在 parent.store 中的位置（按期号降序）
+        if len(positions) and positions[-1] - positions[0] + 1 == len(positions):
+            store = parent.store[int(positions[0]):int(positions[-1]) + 1]
+        else:
+            store = parent.store[positions]
+        super().__init__(store, parent.state if hi - lo == len(index) else None)
+        self._parent = parent
+        self._bounds = (lo, hi)
+        self._red_counts, self._blue_counts = index.counts(lo, hi)
+        self.draws = hi - lo
+        self.start_times = int(index.times[lo]) if hi > lo else None
+        self.end_times = int(index.times[hi - 1]) if hi > lo else None
+
+    @property
+    def red_counts(self) -> np.ndarray:
+        return self._red_counts
+
+    @property
+    def blue_counts(self) -> np.ndarray:
+        return self._blue_counts
+
+    @property
+    def cooccurrence(self) -> Cooccurrence:
+        """范围内的红球同现统计，按范围缓存在全部数据的统计服务中"""
+        if self.draws == len(self._parent.range_index):
+            return self._parent.cooccurrence
+        cache = self._parent._window_cooccurrence
+        if self._bounds not in cache:
+            if len(cache) >= self.COOCCURRENCE_CACHE_SIZE:
+                cache.pop(next(iter(cache)))  # 淘汰最早缓存的范围
+            cache[self._bounds] = Cooccurrence(self.store.reds)
+        return cache[self._bounds]
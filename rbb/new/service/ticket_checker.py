@@ -0,0 +1,216 @@
+import csv
+import json
+from collections import deque
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+import numpy as np
+
+from data.store import DrawStore
+from service.prize_checker import PrizeChecker
+from utils.validators import validate_tickets
+
+# 一注号码的原始字段：(红球字符串列表, 蓝球字符串)，无法解析的行为 (None, None)
+TicketRow = Tuple[Optional[List[str]], Optional[str]]
+
+# CSV 表头可用的列名，去掉末尾序号后比较（如 r1、rb1、red_1、bb、blue）
+_HEADER_NAMES = {"r", "rb", "red", "b", "bb", "blue", "红球", "蓝球"}
+
+
+def read_tickets(source: TextIO) -> Iterator[TicketRow]:
+    """
+    逐行读取号码文件（不一次性读入）
+
+    按第一个非空行判断格式：
+    - JSONL：每行 {"red": ["01", ...], "blue": "06"}
+    - CSV：每行 6 个红球 + 1 个蓝球，首行各列均为已知列名时视为表头跳过，
+      否则按号码处理（无法解析时记为无效）
+
+    Yields:
+        TicketRow: 每注号码的原始字段
+    """
+    lines = (line for line in source if line.strip())
+    first = next(lines, None)
+    if first is None:
+        return
+    lines = _chain(first, lines)
+
+    if first.lstrip().startswith("{"):
+        for line in lines:
+            try:
+                item = json.loads(line)
+                yield [str(ball) for ball in item["red"]], str(item["blue"])
+            except (ValueError, KeyError, TypeError):
+                yield None, None
+        return
+
+    rows = csv.reader(lines)
+    header = next(rows)
+    if not _is_header(header):
+        rows = _chain(header, rows)
+    for row in rows:
+        fields = [field.strip() for field in row if field.strip()]
+        yield (fields[:6], fields[6]) if len(fields) == 7 else (None, None)
+
+
+def _is_header(row: List[str]) -> bool:
+    """CSV 行是否为表头：非空列均为 _HEADER_NAMES 中的列名"""
+    fields = [field.strip().lower() for field in row if field.strip()]
+    return bool(fields) and all(field.rstrip("0123456789_") in _HEADER_NAMES for field in fields)
+
+
+def _chain(first, rest: Iterable) -> Iterator:
+    yield first
+    yield from rest
+
+
+def _number(text: str) -> int:
+    """号码字符串转为整数，非数字或超过两位数时为 -1"""
+    return int(text) if text.isdigit() and int(text) < 100 else -1
+
+
+def parse_tickets(rows: List[TicketRow]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    原始字段转为整数数组并批量验证
+
+    Returns:
+        (红球 (N, 6) int16, 蓝球 (N,) int16, 是否有效 (N,) bool)，无效号码的红球、蓝球均为 -1
+    """
+    reds = np.full((len(rows), 6), -1, dtype=np.int16)
+    blues = np.full(len(rows), -1, dtype=np.int16)
+    for i, (red, blue) in enumerate(rows):
+        if red is not None and len(red) == 6:
+            reds[i] = [_number(ball) for ball in red]
+            blues[i] = _number(blue)
+    valid = validate_tickets(reds, blues)
+    reds[~valid] = -1
+    blues[~valid] = -1
+    return reds, blues, valid
+
+
+class TicketBatch:
+    """一批号码的核对结果"""
+
+    def __init__(self, rows: List[TicketRow], valid: np.ndarray, counts: np.ndarray):
+        self.rows = rows
+        self.valid = valid
+        self.counts = counts  # 每注各奖级次数，形状 (N, 7)，无效号码全为 0
+
+    def results(self, start: int = 1) -> Iterator[Dict]:
+        """
+        每注号码的核对结果
+
+        Args:
+            start: 本批第一注的序号（从 1 开始计）
+        """
+        names = PrizeChecker.PRIZE_NAMES
+        for i, ((red, blue), valid, counts) in enumerate(zip(self.rows, self.valid.tolist(), self.counts.tolist())):
+            result = {"ticket": start + i, "red": red, "blue": blue, "valid": valid}
+            if valid:
+                won = [code for code in range(1, len(names)) if counts[code]]
+                result["best"] = names[won[0]] if won else names[0]
+                result["prizes"] = {names[code]: counts[code] for code in won}
+            yield result
+
+
+class TicketSummary:
+    """号码文件核对汇总"""
+
+    def __init__(self, draws: int):
+        self.draws = draws
+        self.tickets = 0
+        self.invalid = 0
+        self.winning = 0  # 至少中奖一次的注数
+        self.counts = np.zeros(len(PrizeChecker.PRIZE_NAMES), dtype=np.int64)
+
+    def add(self, batch: TicketBatch):
+        self.tickets += len(batch.rows)
+        self.invalid += int(np.count_nonzero(~batch.valid))
+        self.winning += int(np.count_nonzero(batch.counts[:, 1:].any(axis=1)))
+        self.counts += batch.counts[batch.valid].sum(axis=0)
+
+    def to_dict(self) -> Dict:
+        names = PrizeChecker.PRIZE_NAMES
+        return {
+            "draws": self.draws,
+            "tickets": self.tickets,
+            "invalid": self.invalid,
+            "winning_tickets": self.winning,
+            "prizes": {names[code]: int(self.counts[code]) for code in range(1, len(names)) if self.counts[code]},
+        }
+
+
+# 工作进程中的开奖数组，由 _init_worker 设置
+_draws: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+
+def _init_worker(draw_masks: np.ndarray, draw_blues: np.ndarray):
+    global _draws
+    _draws = (draw_masks, draw_blues)
+
+
+def _check_rows(rows: List[TicketRow], draws: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> TicketBatch:
+    """解析、验证并核对一批号码"""
+    draw_masks, draw_blues = draws or _draws
+    reds, blues, valid = parse_tickets(rows)
+    bits = np.left_shift(np.uint64(1), np.maximum(reds, 1).astype(np.uint64) - np.uint64(1))
+    masks = np.bitwise_or.reduce(bits, axis=1)
+    matrix = PrizeChecker().prize_matrix(masks, blues.astype(np.uint8), draw_masks, draw_blues, keep_codes=False)
+    matrix.counts[~valid] = 0
+    return TicketBatch(rows, valid, matrix.counts)
+
+
+class TicketChecker:
+    """
+    号码文件核对服务
+
+    号码按批读取、解析、验证与核对，每批结果立即交给调用方，内存占用与文件大小无关。
+    workers > 1 时各批分发到进程池并行核对（开奖数组在进程启动时传入一次），
+    同时在途的批数有上限，结果按文件顺序返回。
+    """
+
+    def __init__(self, draws: DrawStore, batch_size: int = 2000, workers: int = 1):
+        """
+        Args:
+            draws: 参与核对的开奖期次
+            batch_size: 每批注数
+            workers: 工作进程数，1 为在当前进程中核对
+        """
+        self.draw_count = len(draws)
+        self._draws = (np.ascontiguousarray(draws.red_masks), np.ascontiguousarray(draws.blues))
+        self.batch_size = max(batch_size, 1)
+        self.workers = max(workers, 1)
+
+    def _batches(self, rows: Iterable[TicketRow]) -> Iterator[List[TicketRow]]:
+        rows = iter(rows)
+        while True:
+            batch = list(islice(rows, self.batch_size))
+            if not batch:
+                return
+            yield batch
+
+    def check(self, rows: Iterable[TicketRow]) -> Iterator[TicketBatch]:
+        """
+        核对号码
+
+        Args:
+            rows: 号码原始字段（如 read_tickets 的返回值）
+
+        Yields:
+            TicketBatch: 按输入顺序的每批结果
+        """
+        if self.workers == 1:
+            for batch in self._batches(rows):
+                yield _check_rows(batch, self._draws)
+            return
+
+        from concurrent.futures import ProcessPoolExecutor  # 只在并行核对时导入，不拖慢离线命令启动
+
+        with ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=self._draws) as pool:
+            pending = deque()
+            for batch in self._batches(rows):
+                pending.append(pool.submit(_check_rows, batch))
+                if len(pending) >= self.workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
@@ -0,0 +1,116 @@
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import synthetic_store
+from common.prize_checker import PrizeChecker
+from service.backtest import Backtester, FixedStrategy, FrequencyStrategy, OverdueStrategy, Strategy, make_strategy
+from service.statistics import StatisticsService
+
+
+@pytest.fixture(scope="module")
+def store():
+    return synthetic_store(400, seed=21)
+
+
+class _Recorder(Strategy):
+    """记录每次选号时策略已看到的期数，并按给定策略选号"""
+
+    def __init__(self, inner: Strategy):
+        self.inner = inner
+        self.name = inner.name
+        self.seen = []
+        self.picks = []
+
+    def reset(self, reds, blues):
+        super().reset(reds, blues)
+        self.inner.reset(reds, blues)
+        self.count = 0
+
+    def update(self, index):
+        assert index == self.count  # 逐期按顺序更新
+        self.count += 1
+        self.inner.update(index)
+
+    def pick(self):
+        self.seen.append(self.count)
+        ticket = self.inner.pick()
+        self.picks.append(ticket)
+        return ticket
+
+
+class TestBacktest:
+    """测试选号策略回测"""
+
+    def test_walk_forward(self, store):
+        """选号时只能看到之前各期"""
+        recorder = _Recorder(FrequencyStrategy("hot"))
+        result = Backtester(store, min_history=50).run(recorder)
+        assert recorder.seen == list(range(50, len(store)))
+        assert result.draws == len(store) - 50 == result.tickets
+
+    def test_incremental_matches_recompute(self, store):
+        """增量维护的统计与按之前各期重新计算一致"""
+        ascending = store[::-1]
+        for strategy, window in ((FrequencyStrategy("hot"), None), (FrequencyStrategy("cold", 40), 40)):
+            recorder = _Recorder(strategy)
+            Backtester(store, min_history=100).run(recorder)
+            for step in (0, 57, 299):
+                index = 100 + step
+                history = ascending[:index] if window is None else ascending[index - window:index]
+                counts = history.red_counts()
+                order = np.argsort(counts if strategy.kind == "cold" else -counts, kind="stable")
+                assert recorder.picks[step][0][0].tolist() == (order[:6] + 1).tolist()
+                if strategy.kind == "hot" and window is None:
+                    hot = StatisticsService(history).get_hot_numbers(6, 1)
+                    assert recorder.picks[step][0][0].tolist() == [int(n) for n in hot["red"]]
+                    assert recorder.picks[step][1].tolist() == [int(n) for n in hot["blue"]]
+
+    def test_overdue(self, store):
+        """遗漏策略选间隔最长的号码"""
+        recorder = _Recorder(OverdueStrategy())
+        Backtester(store, min_history=100).run(recorder)
+        ascending = store[::-1]
+        index = 250
+        last_seen = [max(i for i in range(index) if n in ascending.reds[i]) for n in range(1, 34)]
+        expected = np.argsort(last_seen, kind="stable")[:6] + 1
+        assert recorder.picks[index - 100][0][0].tolist() == expected.tolist()
+
+    def test_scoring_matches_checker(self, store):
+        """核对结果与逐期 PrizeChecker.check 一致，奖金与投入按配置计算"""
+        ticket = {"red": store.record(10).red_balls, "blue": store.record(10).blue_ball}
+        amounts = {"一等奖": 1000, "五等奖": 10, "六等奖": 5}
+        result = Backtester(store, min_history=0, price=2, prize_amounts=amounts).run(
+            FixedStrategy(ticket["red"], ticket["blue"])
+        )
+        checker = PrizeChecker()
+        records = [r.to_dict() for r in store[::-1].to_records()]
+        expected = [checker.check(ticket, record) for record in records]
+        assert [checker.PRIZE_NAMES[c] for c in result.codes[:, 0].tolist()] == expected
+        assert result.cost == 2 * len(store)
+        assert result.payout == sum(amounts.get(prize, 0) for prize in expected)
+        assert result.to_dict()["prizes"]["一等奖"] >= 1
+        assert result.hit_rate == sum(prize != "未中奖" for prize in expected) / len(store)
+
+    def test_run_many_workers(self, store):
+        """进程池回测与单进程结果相同且保持顺序"""
+        backtester = Backtester(store)
+        strategies = [make_strategy(name, 30) for name in ("hot", "cold", "overdue", "random")]
+        serial = backtester.run_many(strategies)
+        pooled = backtester.run_many(strategies, workers=2)
+        assert [r.name for r in pooled] == ["hot30", "cold30", "overdue", "random"]
+        for a, b in zip(serial, pooled):
+            assert np.array_equal(a.codes, b.codes)
+
+    def test_short_history(self):
+        """期数不足时回测 0 期"""
+        result = Backtester(synthetic_store(10), min_history=30).run(make_strategy("hot"))
+        assert result.draws == 0 and result.roi == 0.0
+
+    def test_strategy_requires_pick(self):
+        """未实现 pick() 的策略不能实例化"""
+
+        class Incomplete(Strategy):
+            name = "incomplete"
+
+        with pytest.raises(TypeError):
+            Incomplete()
@@ -0,0 +1,131 @@
+import os
+import socket
+import sys
+import threading
+
+import pytest
+
+import daemon
+from daemon import DaemonServer
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="需要 Unix 域套接字")
+
+
+def echo_runner(argv):
+    """测试用命令：输出参数，遇到 fail 返回 3，遇到 boom 抛出异常"""
+    if argv and argv[0] == "boom":
+        raise ValueError("boom")
+    print(" ".join(argv))
+    print("stderr", file=sys.stderr)
+    return 3 if argv and argv[0] == "fail" else 0
+
+
+@pytest.fixture
+def server(tmp_path):
+    socket_path = str(tmp_path / "rbb.sock")
+    server = DaemonServer(socket_path, echo_runner)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join(timeout=5)
+
+
+class TestDaemon:
+    """测试常驻进程转发"""
+
+    def test_forward_output_and_code(self, server, capsys):
+        """转发命令返回输出与退出码"""
+        assert daemon.forward(["query", "--by", "times"], server.socket_path) == 0
+        captured = capsys.readouterr()
+        assert captured.out == "query --by times\n"
+        assert captured.err == "stderr\n"
+
+        assert daemon.forward(["fail"], server.socket_path) == 3
+
+    def test_exception_and_system_exit(self, tmp_path, capsys):
+        """命令异常返回 1，SystemExit 返回其退出码，进程不退出"""
+        def runner(argv):
+            if argv == ["exit"]:
+                raise SystemExit(2)
+            return echo_runner(argv)
+
+        server = DaemonServer(str(tmp_path / "d.sock"), runner)
+        try:
+            assert server.execute(["boom"])["code"] == 1
+            assert "ValueError" in server.execute(["boom"])["stderr"]
+            assert server.execute(["exit"])["code"] == 2
+            assert server.execute(["ok"])["stdout"] == "ok\n"
+        finally:
+            server.server_close()
+
+    def test_not_running(self, tmp_path):
+        """常驻进程未运行或套接字残留时不转发"""
+        socket_path = str(tmp_path / "missing.sock")
+        assert daemon.forward(["query"], socket_path) is None
+
+        stale = DaemonServer(str(tmp_path / "stale.sock"), echo_runner)
+        stale.socket.close()  # 模拟进程退出但套接字文件残留
+        assert os.path.exists(stale.socket_path)
+        assert daemon.forward(["query"], stale.socket_path) is None
+
+        # 残留的套接字文件可被新进程接管
+        server = DaemonServer(stale.socket_path, echo_runner)
+        server.server_close()
+
+    def test_local_commands_and_opt_out(self, server, monkeypatch):
+        """serve 命令及设置环境变量时不转发"""
+        assert daemon.forward(["serve"], server.socket_path) is None
+        assert daemon.forward(["query", "--by", "times", "--input", "-"], server.socket_path) is None
+        assert daemon.forward(["check", "--tickets-file", "t.csv"], server.socket_path) is None
+        assert daemon.forward(["backtest", "--workers", "4"], server.socket_path) is None
+        monkeypatch.setenv(daemon.NO_DAEMON_ENV, "1")
+        assert daemon.forward(["query"], server.socket_path) is None
+
+    def test_local_option_forms(self, server):
+        """本地选项的 "=" 形式与缩写同样不转发，其余选项照常转发"""
+        for argv in (
+            ["query", "--by", "times", "--input=-"],
+            ["query", "--by", "times", "--inp", "-"],
+            ["check", "--tickets-file=x.csv"],
+            ["check", "--tick", "x.csv"],
+            ["backtest", "--workers=4"],
+            ["backtest", "--work", "4"],
+        ):
+            assert daemon.is_local(argv), argv
+            assert daemon.forward(argv, server.socket_path) is None
+        for argv in (
+            ["query", "--by", "times", "--value", "2024001"],
+            ["query", "--ticket", "01", "03", "16", "18", "29", "33", "--near"],
+            ["query", "--tick", "01", "03", "16", "18", "29", "33", "--similar", "5"],
+            ["check", "--red", "01", "03", "16", "18", "29", "33", "--blue", "06"],
+            ["stats", "--count", "5"],
+            ["query", "-"],
+            ["query", "--"],
+        ):
+            assert not daemon.is_local(argv), argv
+
+    def test_query_ticket_forwarded(self, server, capsys):
+        """query --ticket 转发给常驻进程"""
+        argv = ["query", "--ticket", "01", "03", "16", "18", "29", "33", "--near"]
+        assert daemon.forward(argv, server.socket_path) == 0
+        assert "--ticket" in capsys.readouterr().out
+
+    def test_command_options_match_parser(self):
+        """子命令选项表与 CLI 解析器一致"""
+        from cli import CLI
+
+        _, commands = CLI().build_parser()
+        assert set(commands) == set(daemon.COMMAND_OPTIONS)
+        for name, command in commands.items():
+            options = {option for option in command._option_string_actions if option.startswith("--")}
+            assert options == set(daemon.COMMAND_OPTIONS[name]), name
+            assert daemon.LOCAL_OPTIONS.get(name, set()) <= options
+
+    def test_already_running_and_stop(self, server):
+        """重复启动报错，stop 请求使服务退出"""
+        assert daemon.is_running(server.socket_path)
+        with pytest.raises(RuntimeError):
+            DaemonServer(server.socket_path, echo_runner)
+        assert daemon.stop(server.socket_path)
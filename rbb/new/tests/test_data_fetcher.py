@@ -1,5 +1,65 @@
+import hashlib
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
 import pytest
-from common.data_fetcher import DataFetcher
+from common.data_fetcher import DataFetcher, ResponseCache
+
+FIXTURES = Path(__file__).parent / "fixtures"
+EMPTY_PAGE = "<table></table><table></table><table><tr></tr><tr></tr></table>"
+
+
+class RecordedPageHandler(BaseHTTPRequestHandler):
+    """按 start/end 参数返回录制页面 fixtures/history_{start}_{end}.html（支持 ETag 条件请求）"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        name = f"history_{query['start'][0]}_{query.get('end', ['99999'])[0]}.html"
+        page = FIXTURES / name
+        body = page.read_bytes() if page.exists() else EMPTY_PAGE.encode("utf-8")
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+        self.server.requests.append((time.monotonic(), self.client_address[1], self.path))
+        self.server.conditional.append(self.headers.get("If-None-Match"))
+
+        if self.headers.get("If-None-Match") == etag or self.server.force_not_modified:
+            self.server.force_not_modified = max(self.server.force_not_modified - 1, 0)
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def history_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RecordedPageHandler)
+    server.requests = []
+    server.conditional = []
+    server.force_not_modified = 0  # 接下来无条件返回 304 的次数
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_fetcher(server, **kwargs):
+    return DataFetcher(f"http://127.0.0.1:{server.server_address[1]}/history.php", **kwargs)
 
 
 class TestDataFetcher:
@@ -19,4 +79,102 @@ class TestDataFetcher:
         fetcher = DataFetcher("https://datachart.500.com/ssq/history/newinc/history.php")
         records = fetcher.fetch(start=99999, end=99999)
         # 500.com 对于无效范围返回空列表而不是抛出异常
-        assert isinstance(records, list)
\ No newline at end of file
+        assert isinstance(records, list)
+
+
+class TestShardedFetch:
+    """测试分片并发抓取（本地录制页面服务器）"""
+
+    def test_year_shards(self):
+        """测试按年份拆分期号范围"""
+        assert DataFetcher.year_shards(24100, 25020) == [(24100, 24999), (25001, 25020)]
+        assert DataFetcher.year_shards(1, 4999)[0] == (3001, 3999)
+
+    def test_fetch_sharded(self, history_server):
+        """测试分片结果合并、去重、降序"""
+        fetcher = make_fetcher(history_server, parser="stream")
+        records = fetcher.fetch_sharded(23001, 25999)
+        assert len(records) == 151 + 150
+        assert records[0]["times"] == "25150"
+        assert records[-1]["times"] == "24001"
+        assert len(history_server.requests) == 3
+
+    def test_matches_single_fetch(self, history_server):
+        """测试分片抓取与逐年单次抓取结果一致"""
+        fetcher = make_fetcher(history_server)
+        expected = fetcher.fetch(25001, 25999) + fetcher.fetch(24001, 24999)
+        assert fetcher.fetch_sharded(24001, 25999) == expected
+
+    def test_keep_alive_and_interval(self, history_server):
+        """测试连接复用和请求间隔"""
+        fetcher = make_fetcher(history_server, request_interval=0.05, max_workers=2)
+        fetcher.fetch_sharded(21001, 25999)
+        requests = sorted(history_server.requests)
+        assert len(requests) == 5
+        assert len({port for _, port, _ in requests}) <= 2
+        gaps = [b[0] - a[0] for a, b in zip(requests, requests[1:])]
+        assert min(gaps) >= 0.04
+
+    def test_merge_shards_dedupes(self):
+        """测试重叠分片去重"""
+        a = [{"times": "25002"}, {"times": "25001"}]
+        b = [{"times": "25001"}, {"times": "24150"}]
+        assert [r["times"] for r in DataFetcher.merge_shards([b, a])] == ["25002", "25001", "24150"]
+
+
+class TestResponseCache:
+    """测试响应缓存与条件请求"""
+
+    def test_not_modified(self, history_server, tmp_path):
+        """测试 304 时沿用缓存的解析结果"""
+        cache = ResponseCache(tmp_path)
+        fetcher = make_fetcher(history_server, cache=cache)
+        first = fetcher.fetch(25001, 25999)
+        second = fetcher.fetch(25001, 25999)
+        assert second == first
+        assert history_server.conditional[1] is not None
+        assert cache.stats == {"hits": 0, "not_modified": 1, "misses": 1}
+        assert fetcher.fetch_if_modified(25001, 25999)[0] is None
+
+    def test_store_after_commit(self, history_server, tmp_path):
+        """测试 fetch_if_modified 在确认后才写入缓存"""
+        cache = ResponseCache(tmp_path)
+        fetcher = make_fetcher(history_server, cache=cache)
+        records, commit = fetcher.fetch_if_modified(25001, 25999)
+        assert records and list(tmp_path.glob("*.json")) == []
+
+        # 未确认（如数据库提交失败）时再次抓取仍完整下载
+        again, commit = fetcher.fetch_if_modified(25001, 25999)
+        assert again == records and history_server.conditional[-1] is None
+        commit()
+        assert fetcher.fetch_if_modified(25001, 25999)[0] is None
+        # 忽略缓存时不发条件请求
+        assert fetcher.fetch_if_modified(25001, 25999, conditional=False)[0] == records
+        assert history_server.conditional[-1] is None
+
+    def test_not_modified_without_entry(self, history_server, tmp_path):
+        """测试本地无缓存时收到 304 按未命中处理，不带条件头重新请求"""
+        fetcher = make_fetcher(history_server, cache=ResponseCache(tmp_path))
+        history_server.force_not_modified = 1
+        records = fetcher.fetch(25001, 25999)
+        assert len(records) == 150
+        assert len(history_server.requests) == 2
+        assert history_server.conditional == [None, None]
+
+    def test_ttl_skips_request(self, history_server, tmp_path):
+        """测试 TTL 内不发请求"""
+        fetcher = make_fetcher(history_server, parser="stream", cache=ResponseCache(tmp_path, ttl=60))
+        first = fetcher.fetch(24001, 24999)
+        assert fetcher.fetch(24001, 24999) == first
+        assert len(history_server.requests) == 1
+        assert fetcher.cache_stats()["hits"] == 1
+
+    def test_raw_body_compressed(self, history_server, tmp_path):
+        """测试原始响应以压缩形式保存"""
+        cache = ResponseCache(tmp_path)
+        fetcher = make_fetcher(history_server, parser="stream", cache=cache)
+        fetcher.fetch(24001, 24999)
+        url = f"{fetcher.base_url}?start=24001&end=24999"
+        raw = (FIXTURES / "history_24001_24999.html").read_bytes()
+        assert cache.load_body(url) == raw
+        assert len(list(tmp_path.glob("*.html.gz"))) == 1
\ No newline at end of file
@@ -0,0 +1,101 @@
+from itertools import combinations
+
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import synthetic_store
+from data.features import DrawFeatures, parse_condition
+from service.query_service import QueryService
+from service.statistics import StatisticsService
+
+
+@pytest.fixture
+def store():
+    return synthetic_store(300, seed=17)
+
+
+def _expected(reds):
+    """逐注计算形态特征"""
+    reds = sorted(reds)
+    return {
+        "sum": sum(reds),
+        "span": reds[-1] - reds[0],
+        "odd": sum(n % 2 for n in reds),
+        "zone1": sum(n <= 11 for n in reds),
+        "zone2": sum(12 <= n <= 22 for n in reds),
+        "zone3": sum(n >= 23 for n in reds),
+        "consecutive": sum(b - a == 1 for a, b in zip(reds, reds[1:])),
+        "ac": len({b - a for a, b in combinations(reds, 2)}) - 5,
+    }
+
+
+class TestDrawFeatures:
+    """测试开奖号码形态特征"""
+
+    def test_matches_per_draw(self, store):
+        """各特征列与逐注计算一致"""
+        features = DrawFeatures(store)
+        for i, reds in enumerate(store.reds.tolist()):
+            assert {name: int(column[i]) for name, column in features.columns.items()} == _expected(reds)
+
+    def test_known_values(self):
+        """已知号码的特征"""
+        store = synthetic_store(1)
+        store.reds[0] = [1, 2, 3, 4, 5, 6]
+        features = DrawFeatures(store)
+        assert features["consecutive"][0] == 5 and features["ac"][0] == 0 and features["span"][0] == 5
+        store.reds[0] = [1, 2, 5, 11, 13, 18]  # 15 个差值互不相同
+        assert DrawFeatures(store)["ac"][0] == 10
+
+    def test_filter(self, store):
+        """范围、单值、取值集合条件同时满足"""
+        features = DrawFeatures(store)
+        positions = features.filter({"sum": (90, 120), "odd": 3, "ac": [7, 8]})
+        rows = [_expected(reds) for reds in store.reds.tolist()]
+        expected = [i for i, row in enumerate(rows) if 90 <= row["sum"] <= 120 and row["odd"] == 3 and row["ac"] in (7, 8)]
+        assert positions.tolist() == expected
+        assert len(features.filter({})) == len(store)
+
+    def test_buckets(self, store):
+        """按奇偶比、三区比分组"""
+        features = DrawFeatures(store)
+        odd_even = features.distribution("odd_even")
+        assert sum(odd_even.values()) == len(store)
+        assert odd_even["3:3"] == int(np.count_nonzero(features["odd"] == 3))
+        zones = features.distribution("zones")
+        labels = {"{zone1}:{zone2}:{zone3}".format(**_expected(reds)) for reds in store.reds.tolist()}
+        assert set(zones) == labels
+
+    def test_parse_condition(self):
+        """条件表达式"""
+        assert parse_condition("sum=90-120") == ("sum", (90, 120))
+        assert parse_condition("ODD=3") == ("odd", 3)
+        assert parse_condition("ac=7,8") == ("ac", [7, 8])
+        for text in ("total=3", "sum", "sum=abc"):
+            with pytest.raises(ValueError):
+                parse_condition(text)
+
+
+class TestFeatureServices:
+    """测试查询与统计服务中的形态特征"""
+
+    def test_query_features(self, store):
+        """按特征查询返回按期号降序的命中期次"""
+        matched = QueryService(store).query_features({"consecutive": (2, 5)})
+        assert all(_expected(reds)["consecutive"] >= 2 for reds in matched.reds.tolist())
+        assert matched.times.tolist() == sorted(matched.times.tolist(), reverse=True)
+        assert len(matched) == sum(_expected(reds)["consecutive"] >= 2 for reds in store.reds.tolist())
+
+    def test_frequency_by_feature(self, store):
+        """按特征分组的频率与对组内期次统计一致"""
+        service = StatisticsService(store)
+        groups = service.frequency_by_bucket("odd_even")
+        subset = store[service.features["odd"] == 3]
+        assert groups["3:3"]["draws"] == len(subset)
+        assert groups["3:3"]["red"] == StatisticsService(subset).red_ball_frequency()
+
+    def test_window(self, store):
+        """期号范围内的特征分布"""
+        window = StatisticsService(store).window(1, 100)
+        assert window.feature_distribution("span") == DrawFeatures(store[200:]).distribution("span")
+        assert window.feature_summary()["sum"]["max"] == int(DrawFeatures(store[200:])["sum"].max())
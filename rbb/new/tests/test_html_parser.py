@@ -0,0 +1,36 @@
+from pathlib import Path
+
+import pytest
+from common.data_fetcher import DataFetcher, iter_history_rows
+
+FIXTURES = sorted((Path(__file__).parent / "fixtures").glob("history_*.html"))
+
+
+class TestStreamParser:
+    """流式解析与 html5lib 解析的差异测试"""
+
+    @pytest.mark.parametrize("fixture", FIXTURES, ids=lambda p: p.name)
+    def test_matches_html5lib(self, fixture):
+        """测试两种解析方式结果一致"""
+        html = fixture.read_text(encoding="utf-8")
+        expected = DataFetcher("", parser="html5lib").parse(html)
+        assert expected
+        assert DataFetcher("", parser="stream").parse(html) == expected
+
+    @pytest.mark.parametrize("fixture", FIXTURES, ids=lambda p: p.name)
+    def test_byte_chunks(self, fixture):
+        """测试任意切分的字节块（含被切断的多字节字符）"""
+        raw = fixture.read_bytes()
+        expected = DataFetcher("").parse(raw.decode("utf-8"))
+        chunks = (raw[i:i + 37] for i in range(0, len(raw), 37))
+        assert list(iter_history_rows(chunks)) == expected
+
+    def test_missing_table(self):
+        """测试网页结构异常"""
+        with pytest.raises(Exception, match="网页结构异常"):
+            list(iter_history_rows(["<table></table><p>维护中</p>"]))
+
+    def test_unknown_parser(self):
+        """测试不支持的解析方式"""
+        with pytest.raises(ValueError):
+            DataFetcher("", parser="lxml")
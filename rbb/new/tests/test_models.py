@@ -0,0 +1,31 @@
+import pytest
+from data.models import LotteryRecord, mask_numbers, red_mask
+
+
+class TestLotteryRecord:
+    """测试紧凑开奖记录"""
+
+    def test_views(self):
+        """测试显示视图"""
+        record = LotteryRecord(times="03001", red_balls=["10", "11", "12", "13", "26", "28"], blue_ball="1", date="2003-02-23")
+        assert record.times == "03001"
+        assert record.red_balls == ["10", "11", "12", "13", "26", "28"]
+        assert record.blue_ball == "01"
+        assert record.to_row() == ["03001", "10", "11", "12", "13", "26", "28", "01", "2003-02-23"]
+
+    def test_mask(self):
+        """测试 33 位掩码"""
+        assert red_mask(["01", "33"]) == (1 << 32) | 1
+        assert mask_numbers(red_mask([33, 7, 1])) == (1, 7, 33)
+
+    def test_slots(self):
+        """测试不创建实例字典"""
+        record = LotteryRecord(times="22065", red_balls=["09", "14", "18", "23", "28", "31"], blue_ball="02", date="2022-06-09")
+        assert not hasattr(record, "__dict__")
+        with pytest.raises(AttributeError):
+            record.extra = 1
+
+    def test_dict_roundtrip(self):
+        """测试字典互转"""
+        record = LotteryRecord(times="22065", red_balls=["09", "14", "18", "23", "28", "31"], blue_ball="02", date="2022-06-09")
+        assert LotteryRecord.from_dict(record.to_dict()) == record
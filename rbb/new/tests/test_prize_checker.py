@@ -1,5 +1,11 @@
+from itertools import combinations
+
+import numpy as np
 import pytest
+
+from benchmarks.synthetic import synthetic_store
 from common.prize_checker import PrizeChecker
+from service.prize_checker import PrizeChecker as ServicePrizeChecker
 
 
 class TestPrizeChecker:
@@ -58,4 +64,135 @@ class TestPrizeChecker:
         ]
         user_numbers = {"red": ["01", "03", "16", "18", "29", "33"], "blue": "06"}
         results = checker.batch_check(user_numbers, records)
-        assert results.get("一等奖") == 2
\ No newline at end of file
+        assert results.get("一等奖") == 2
+
+
+class TestPrizeMatrix:
+    """测试多注号码 × 多期开奖的矩阵核对"""
+
+    @staticmethod
+    def _tickets(store, count, seed):
+        rng = np.random.default_rng(seed)
+        tickets = [
+            {
+                "red": [f"{n:02d}" for n in rng.choice(np.arange(1, 34), 6, replace=False)],
+                "blue": f"{rng.integers(1, 17):02d}",
+            }
+            for _ in range(count)
+        ]
+        # 加入与开奖完全相同及只有蓝球不同的号码，覆盖高奖级
+        record = store.record(3)
+        tickets.append({"red": record.red_balls, "blue": record.blue_ball})
+        tickets.append({"red": record.red_balls, "blue": f"{record.blue % 16 + 1:02d}"})
+        return tickets
+
+    def test_matches_check(self):
+        """矩阵结果与逐对 check 一致"""
+        store = synthetic_store(200, seed=3)
+        records = [r.to_dict() for r in store.to_records()]
+        checker = PrizeChecker()
+        tickets = self._tickets(store, 40, seed=4)
+        result = checker.check_matrix(tickets, records)
+
+        assert result.codes.shape == (len(tickets), len(records))
+        for t, ticket in enumerate(tickets):
+            expected = [checker.check(ticket, record) for record in records]
+            assert [checker.PRIZE_NAMES[c] for c in result.codes[t].tolist()] == expected
+            assert result.summary(t) == checker.batch_check(ticket, records)
+        assert checker.PRIZE_NAMES[result.best[-2]] == "一等奖"
+        assert checker.PRIZE_NAMES[result.best[-1]] == "二等奖"
+
+    def test_chunked(self, monkeypatch):
+        """分批计算与一次计算结果相同"""
+        store = synthetic_store(100, seed=5)
+        records = [r.to_dict() for r in store.to_records()]
+        tickets = self._tickets(store, 30, seed=6)
+        whole = PrizeChecker().check_matrix(tickets, records)
+        monkeypatch.setattr(PrizeChecker, "MATRIX_CHUNK", 7)
+        chunked = PrizeChecker().check_matrix(tickets, records)
+        assert np.array_equal(whole.codes, chunked.codes)
+        assert np.array_equal(whole.counts, chunked.counts)
+        assert whole.counts.sum(axis=1).tolist() == [len(records)] * len(tickets)
+
+    def test_service_store(self):
+        """服务层可直接传入 DrawStore，与字典列表结果一致"""
+        store = synthetic_store(150, seed=7)
+        records = [r.to_dict() for r in store.to_records()]
+        tickets = self._tickets(store, 20, seed=8)
+        expected = PrizeChecker().check_matrix(tickets, records)
+        for source in (store, store.to_records()):
+            result = ServicePrizeChecker().check_matrix(tickets, source)
+            assert np.array_equal(result.codes, expected.codes)
+
+    def test_empty(self):
+        """无号码或无开奖记录"""
+        checker = PrizeChecker()
+        result = checker.check_matrix([], [{"red_balls": ["01"] * 6, "blue_ball": "01"}])
+        assert result.codes.shape == (0, 1)
+        result = checker.check_matrix([{"red": ["01", "02", "03", "04", "05", "06"], "blue": "01"}], [])
+        assert result.codes.shape == (1, 0)
+        assert result.summary(0) == {}
+
+
+class TestBetCheck:
+    """测试复式/胆拖投注核对（与展开为单式逐注核对对比）"""
+
+    @staticmethod
+    def _expand(checker, bet, records):
+        """展开为单式后逐注核对"""
+        results = {}
+        for combo in combinations(bet["red"], 6 - len(bet.get("banker", []))):
+            for blue in bet["blue"]:
+                ticket = {"red": list(bet.get("banker", [])) + list(combo), "blue": blue}
+                for prize, count in checker.batch_check(ticket, records).items():
+                    results[prize] = results.get(prize, 0) + count
+        return results
+
+    @staticmethod
+    def _random_bets(seed, count=60):
+        rng = np.random.default_rng(seed)
+        for _ in range(count):
+            banker_count = int(rng.integers(0, 6))
+            red_count = int(rng.integers(max(6 - banker_count, 1), 12 - banker_count))
+            balls = [f"{n:02d}" for n in rng.choice(np.arange(1, 34), banker_count + red_count, replace=False)]
+            blues = [f"{n:02d}" for n in rng.choice(np.arange(1, 17), int(rng.integers(1, 4)), replace=False)]
+            yield {"banker": balls[:banker_count], "red": balls[banker_count:], "blue": blues}
+
+    def test_compound(self):
+        """复式投注：10 红 + 3 蓝"""
+        checker = PrizeChecker()
+        record = {"red_balls": ["01", "03", "16", "18", "29", "33"], "blue_ball": "06"}
+        bet = {"red": ["01", "03", "16", "18", "29", "33", "02", "04", "05", "07"], "blue": ["06", "07", "08"]}
+        result = checker.check_bet(bet, record)
+        assert checker.bet_size(bet) == 630 == sum(result.values())
+        assert result == self._expand(checker, bet, [record])
+        assert result["一等奖"] == 1 and result["二等奖"] == 2
+
+    def test_banker(self):
+        """胆拖投注：胆码命中与未命中"""
+        checker = PrizeChecker()
+        record = {"red_balls": ["01", "03", "16", "18", "29", "33"], "blue_ball": "06"}
+        for banker in (["01", "03"], ["02", "03"]):
+            bet = {"banker": banker, "red": ["16", "18", "29", "33", "05", "07"], "blue": "06"}
+            assert checker.bet_size(bet) == 15
+            assert checker.check_bet(bet, record) == self._expand(checker, dict(bet, blue=["06"]), [record])
+
+    def test_random_against_expansion(self):
+        """随机投注与开奖，与展开结果一致"""
+        store = synthetic_store(30, seed=9)
+        records = [r.to_dict() for r in store.to_records()]
+        checker = PrizeChecker()
+        for bet in self._random_bets(seed=10):
+            matrix = checker.bet_matrix(bet, records)
+            assert (matrix.sum(axis=1) == checker.bet_size(bet)).all()
+            assert checker.batch_check_bet(bet, records) == self._expand(checker, bet, records)
+
+    def test_service_store(self):
+        """服务层可直接传入 DrawStore 或 LotteryRecord"""
+        store = synthetic_store(50, seed=13)
+        records = [r.to_dict() for r in store.to_records()]
+        checker = ServicePrizeChecker()
+        for bet in self._random_bets(seed=14, count=10):
+            expected = PrizeChecker().batch_check_bet(bet, records)
+            assert checker.batch_check_bet(bet, store) == expected
+            assert checker.check_bet(bet, store.record(0)) == PrizeChecker().check_bet(bet, records[0])
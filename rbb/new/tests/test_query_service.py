@@ -0,0 +1,252 @@
+import json
+from datetime import date
+
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import synthetic_store
+from data.combo_index import KEY_BITS, RANK_SIZE, combination_rank, ticket_key
+from data.date_index import parse_weekday
+from service.query_service import QueryService
+
+
+@pytest.fixture
+def store():
+    # 期号不连续：每隔一期缺失，便于覆盖边界落在空档上的情况
+    store = synthetic_store(500, seed=1)
+    store.times = store.times * 2
+    return store
+
+
+class TestSortedIssueIndex:
+    """测试基于升序期号二分查找的查询"""
+
+    def test_range_matches_scan(self, store):
+        """范围查询与逐条扫描结果一致"""
+        service = QueryService(store)
+        for start, end in [(1, 1000), (101, 200), (100, 100), (99, 99), (300, 100), (-5, 3), (999, 5000)]:
+            expected = [r for r in store.to_records() if start <= r.issue <= end]
+            assert service.query_range(str(start), str(end)) == expected
+
+    def test_slices_share_memory(self, store):
+        """范围、最近 N 期、前后查询返回底层数组的视图"""
+        service = QueryService(store)
+        for view in (service.range_store(100, 200), service.latest(10), service.before(500, 5), service.after(500)):
+            assert len(view)
+            assert np.shares_memory(view.times, store.times)
+            assert np.shares_memory(view.reds, store.reds)
+
+    def test_latest_before_after(self, store):
+        """最近 N 期与前后若干期"""
+        service = QueryService(store)
+        assert service.latest(3).times.tolist() == [1000, 998, 996]
+        assert len(service.latest(0)) == 0
+
+        assert service.before(500, 3).times.tolist() == [498, 496, 494]
+        assert service.before(499, 2).times.tolist() == [498, 496]
+        assert len(service.before(2)) == 0
+        assert len(service.before(10_000)) == 500
+
+        assert service.after(500, 3).times.tolist() == [506, 504, 502]
+        assert service.after(501, 1).times.tolist() == [502]
+        assert service.after(990).times.tolist() == [1000, 998, 996, 994, 992]
+        assert len(service.after(1000)) == 0
+
+    def test_query_by_times(self, store):
+        """按期号精确查询"""
+        service = QueryService(store)
+        assert service.query_by_times("500").issue == 500
+        assert service.query_by_times("501") is None
+        assert service.query_by_times("abc") is None
+
+    def test_unsorted_input(self, store):
+        """输入未按期号降序排列时先排序"""
+        shuffled = store[np.random.default_rng(0).permutation(len(store))]
+        service = QueryService(shuffled)
+        assert service.store.times.tolist() == store.times.tolist()
+        assert service.query_range("100", "110") == store[445:451].to_records()
+
+
+class TestBallIndex:
+    """测试号码倒排位图索引"""
+
+    def brute_force(self, store, reds, blue=None, match_any=False):
+        result = []
+        for record in store.to_records():
+            numbers = set(record.red_numbers)
+            hit = bool(numbers & set(reds)) if match_any else set(reds) <= numbers
+            if hit and (blue is None or record.blue == blue):
+                result.append(record)
+        return result
+
+    @pytest.mark.parametrize(
+        "reds, blue, match_any",
+        [([7, 21], None, False), ([7, 21], None, True), ([12], 5, False), ([], 5, False), ([1, 2, 3], 16, True)],
+    )
+    def test_matches_brute_force(self, store, reds, blue, match_any):
+        """位图组合查询与逐条集合判断一致"""
+        service = QueryService(store)
+        balls = [f"{n:02d}" for n in reds]
+        blue_ball = None if blue is None else f"{blue:02d}"
+        matched = service.search_contains(balls, blue_ball, match_any)
+        assert matched.to_records() == self.brute_force(store, reds, blue, match_any)
+
+    def test_exact_combination(self, store):
+        """按红球组合查询使用索引，顺序无关"""
+        service = QueryService(store)
+        record = store.record(42)
+        found = service.search_by_red_balls(list(reversed(record.red_balls)))
+        assert record in found
+        assert service.search_by_red_balls(record.red_balls[:5]) == []
+
+    def test_bitmap_size(self, store):
+        """每个号码每期占 1 bit"""
+        index = QueryService(store).ball_index
+        assert index.red.shape == (33, (len(store) + 7) // 8)
+        assert index.blue.shape == (16, (len(store) + 7) // 8)
+
+
+class TestComboIndex:
+    """测试红球组合秩索引"""
+
+    def test_rank_range(self):
+        """组合秩覆盖 [0, C(33, 6))，号码键不超过 25 位"""
+        assert combination_rank(["01", "02", "03", "04", "05", "06"]) == 0
+        assert combination_rank(["28", "29", "30", "31", "32", "33"]) == RANK_SIZE - 1
+        assert combination_rank([6, 5, 4, 3, 2, 1]) == 0
+        assert ticket_key(range(28, 34), 16) == RANK_SIZE * 16 - 1
+        assert ticket_key(range(28, 34), 16) < 2 ** KEY_BITS
+
+    def test_exact(self, store):
+        """整注号码精确查找"""
+        service = QueryService(store)
+        record = store.record(7)
+        assert record in service.query_ticket(record.red_balls).to_records()
+        assert record in service.query_ticket(record.red_balls, record.blue_ball).to_records()
+        other_blue = f"{record.blue % 16 + 1:02d}"
+        assert record not in service.query_ticket(record.red_balls, other_blue).to_records()
+
+    def test_near_matches_brute_force(self, store):
+        """至少 5 个红球相同的查找与逐条比较一致"""
+        service = QueryService(store)
+        for index in (0, 13, 250):
+            ticket = list(store.record(index).red_numbers)
+            ticket[-1] = next(n for n in range(1, 34) if n not in ticket)  # 替换一个红球
+            expected = [r for r in store.to_records() if len(set(r.red_numbers) & set(ticket)) >= 5]
+            assert service.query_near([str(n) for n in ticket]).to_records() == expected
+            assert store.record(index) in expected
+
+
+class TestSimilar:
+    """测试相似号码 Top-k 查询"""
+
+    def brute_force(self, store, reds, blue, k):
+        ranked = sorted(
+            enumerate(store.to_records()),
+            key=lambda item: (
+                -len(set(item[1].red_numbers) & set(reds)),
+                -(blue is not None and item[1].blue == blue),
+                item[0],
+            ),
+        )
+        return [record for _, record in ranked[:k]]
+
+    @pytest.mark.parametrize("blue", [None, 7])
+    @pytest.mark.parametrize("k", [0, 1, 20, 500, 600])
+    def test_matches_brute_force(self, store, blue, k):
+        """排序与逐条比较一致"""
+        reds = [3, 9, 14, 21, 27, 33]
+        service = QueryService(store)
+        result = service.similar([str(n) for n in reds], None if blue is None else str(blue), k)
+        assert result.to_records() == self.brute_force(store, reds, blue, k)
+
+    def test_bit_count_fallback(self, monkeypatch):
+        """不支持 np.bitwise_count 时按字节查表统计"""
+        from common.bits import bit_count
+
+        values = np.array([0, 1, 0b1011, (1 << 33) - 1], dtype=np.uint64)
+        monkeypatch.delattr(np, "bitwise_count", raising=False)
+        assert bit_count(values).tolist() == [0, 1, 3, 33]
+
+
+class TestDateIndex:
+    """测试开奖日期索引"""
+
+    def test_range_matches_scan(self, store):
+        """日期范围查询与逐条比较一致"""
+        service = QueryService(store)
+        dates = store.dates.astype(str)
+        start, end = dates[300], dates[200]
+        matched = service.query_dates(start, end)
+        assert matched.to_records() == store[(dates >= start) & (dates <= end)].to_records()
+        assert np.shares_memory(matched.times, store.times)  # 连续区间返回视图
+        assert len(service.query_dates(end, start)) == 0
+        assert len(service.query_dates()) == len(store)
+
+    def test_weekday_month_year(self, store):
+        """星期、整月、整年查询"""
+        service = QueryService(store)
+        weekdays = [date.fromisoformat(r.date).weekday() for r in store.to_records()]
+        sundays = service.query_dates(weekdays=[6])
+        assert len(sundays) == weekdays.count(6)
+        assert all(date.fromisoformat(r.date).weekday() == 6 for r in sundays)
+
+        month = str(store.dates[100].astype("datetime64[M]"))
+        expected = [r for r in store.to_records() if r.date.startswith(month)]
+        assert service.query_month(month).to_records() == expected
+
+        year = str(store.dates[100].astype("datetime64[Y]"))
+        expected = [r for r in store.to_records() if r.date.startswith(year) and date.fromisoformat(r.date).weekday() in (1, 3)]
+        assert service.query_year(year, weekdays=[1, 3]).to_records() == expected
+
+    def test_query_by_date(self, store):
+        """按日期精确查询"""
+        service = QueryService(store)
+        record = store.record(10)
+        assert service.query_by_date(record.date) == record
+        assert service.query_by_date("1999-01-01") is None
+        assert service.query_by_date("2022/06/09") is None
+
+    def test_parse_weekday(self):
+        """星期名称解析"""
+        assert [parse_weekday(v) for v in ("tue", "Thursday", "7", 1)] == [1, 3, 6, 0]
+        with pytest.raises(ValueError):
+            parse_weekday("8")
+
+
+class TestQueryMany:
+    """测试批量查询"""
+
+    def test_matches_single_queries(self, store):
+        """批量查询与逐个查询一致"""
+        service = QueryService(store)
+        values = ["500", "501", "abc", "2", "1000", "0", "99999999999", ""]
+        positions = service.query_many(values)
+        for value, position in zip(values, positions.tolist()):
+            record = service.query_by_times(value)
+            assert (position == -1) == (record is None)
+            if record is not None:
+                assert store.record(position) == record
+
+        dates = [store.record(5).date, "1999-01-01", "bad", store.record(0).date]
+        assert service.query_many(dates, by="date").tolist() == [5, -1, -1, 0]
+
+    def test_stream_output(self, store, tmp_path, capsys):
+        """CLI 批量查询逐批输出 NDJSON / CSV"""
+        from argparse import Namespace
+        from cli import CLI
+
+        service = QueryService(store)
+        path = tmp_path / "issues.txt"
+        path.write_text("500\n\n501\n1000\n", encoding="utf-8")
+
+        CLI._stream_query(service, Namespace(input=str(path), by="times", format="ndjson"), batch_size=2)
+        lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert [line["found"] for line in lines] == [True, False, True]
+        assert lines[0]["times"] == "00500" and lines[1]["query"] == "501"
+
+        CLI._stream_query(service, Namespace(input=str(path), by="times", format="csv"))
+        rows = capsys.readouterr().out.splitlines()
+        assert rows[0].startswith("query,times")
+        assert rows[1] == "500," + ",".join(store.record(250).to_row())
+        assert rows[2] == "501"
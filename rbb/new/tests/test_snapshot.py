@@ -0,0 +1,58 @@
+import os
+
+import numpy as np
+import pytest
+from data.models import LotteryRecord
+from data.snapshot import SnapshotError, read_snapshot, write_snapshot
+from data.storage import CSVStorage
+from data.store import DrawStore
+
+
+@pytest.fixture
+def records():
+    return [
+        LotteryRecord(times="22065", red_balls=["09", "14", "18", "23", "28", "31"], blue_ball="02", date="2022-06-09"),
+        LotteryRecord(times="03001", red_balls=["10", "11", "12", "13", "26", "28"], blue_ball="11", date="2003-02-23"),
+    ]
+
+
+class TestSnapshot:
+    """测试二进制快照"""
+
+    def test_roundtrip(self, records, tmp_path):
+        """测试写入后内存映射读取"""
+        path = tmp_path / "ssq.snap"
+        write_snapshot(DrawStore.from_records(records), path)
+        store = read_snapshot(path)
+        assert store.to_records() == records
+        assert isinstance(store.reds.base, np.ndarray)  # 映射文件上的视图
+
+    def test_version_mismatch(self, records, tmp_path):
+        """测试版本不匹配时报错"""
+        path = tmp_path / "ssq.snap"
+        write_snapshot(DrawStore.from_records(records), path)
+        with open(path, "r+b") as f:
+            f.seek(8)
+            f.write((99).to_bytes(4, "little"))
+        with pytest.raises(SnapshotError):
+            read_snapshot(path)
+
+    def test_regenerated_when_csv_newer(self, records, tmp_path):
+        """测试 CSV 更新后自动重建快照"""
+        storage = CSVStorage(str(tmp_path / "ssq.csv"))
+        storage.save(records[1:])
+        assert len(storage.load_store()) == 1
+        assert storage.snapshot_path.exists()
+
+        storage.save(records)
+        stat = storage.snapshot_path.stat()
+        os.utime(storage.filepath, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+        assert storage.load_store().to_records() == records
+
+    def test_corrupt_snapshot_rebuilt(self, records, tmp_path):
+        """测试快照损坏时回退到 CSV"""
+        storage = CSVStorage(str(tmp_path / "ssq.csv"))
+        storage.save(records)
+        storage.snapshot_path.write_bytes(b"broken")
+        assert storage.load_store().to_records() == records
+        assert read_snapshot(storage.snapshot_path).to_records() == records
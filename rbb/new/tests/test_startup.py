@@ -0,0 +1,68 @@
+import json
+import os
+import subprocess
+import sys
+
+from config import Config
+from data.models import LotteryRecord
+from data.storage import CSVStorage
+
+SCRIPT = """
+import json, sys
+from cli import main
+code = main(sys.argv[1:])
+print(json.dumps(sorted(m for m in sys.modules if m.split(".")[0] in {forbidden})))
+sys.exit(code or 0)
+"""
+
+
+def run_cli(data_dir, *argv):
+    env = dict(os.environ, RBB_DATA_DIR=str(data_dir), RBB_NO_DAEMON="1")
+    script = SCRIPT.format(forbidden=set(Config.STARTUP_FORBIDDEN_IMPORTS))
+    return subprocess.run(
+        [sys.executable, "-c", script, *argv],
+        env=env,
+        cwd=Config.PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+
+
+class TestStartup:
+    """测试离线命令的启动路径"""
+
+    def test_offline_commands_skip_network_stack(self, tmp_path):
+        """离线查询、核对、统计不加载 requests / bs4 / html5lib"""
+        record = LotteryRecord("22065", ["09", "14", "18", "23", "28", "31"], "02", "2022-06-09")
+        CSVStorage(str(tmp_path / "ssq_data.csv")).save([record])
+
+        commands = {
+            "query": ("query", "--by", "times", "--value", "22065"),
+            "check": ("check", "--red", "09", "14", "18", "23", "28", "31", "--blue", "02"),
+            "stats": ("stats", "--type", "freq"),
+        }
+        outputs = {}
+        for name, argv in commands.items():
+            result = run_cli(tmp_path, *argv)
+            assert result.returncode == 0, result.stderr
+            *output, loaded = result.stdout.splitlines()
+            assert json.loads(loaded) == []
+            outputs[name] = "\n".join(output)
+
+        assert "红球: 09 - 14 - 18 - 23 - 28 - 31" in outputs["query"]
+        assert "一等奖" in outputs["check"]
+
+    def test_tickets_file_unknown_times(self, tmp_path):
+        """号码文件核对时期号不存在，错误写到标准错误并返回非 0"""
+        record = LotteryRecord("22065", ["09", "14", "18", "23", "28", "31"], "02", "2022-06-09")
+        CSVStorage(str(tmp_path / "ssq_data.csv")).save([record])
+        tickets = tmp_path / "tickets.csv"
+        tickets.write_text("09,14,18,23,28,31,02\n", encoding="utf-8")
+
+        result = run_cli(tmp_path, "check", "--tickets-file", str(tickets), "--times", "22001")
+        assert result.returncode == 1
+        assert "未找到期号 22001" in result.stderr
+        result = run_cli(tmp_path, "check", "--tickets-file", str(tickets))
+        assert result.returncode == 0, result.stderr
+        assert '"best": "一等奖"' in result.stdout
@@ -55,4 +55,16 @@ class TestStatisticsService:
         assert "red" in cold
         assert "blue" in cold
         assert len(cold["red"]) == 3
-        assert len(cold["blue"]) == 2
\ No newline at end of file
+        assert len(cold["blue"]) == 2
+
+    def test_counts_once(self):
+        """热号、冷号、频率统计共用一次计数"""
+        records = [
+            {"red_balls": ["01", "02", "03", "04", "05", "06"], "blue_ball": "01"},
+            {"red_balls": ["01", "02", "03", "04", "05", "07"], "blue_ball": "01"},
+        ]
+        service = StatisticsService(records)
+        hot = service.get_hot_numbers(2, 1)
+        records.append({"red_balls": ["07", "08", "09", "10", "11", "12"], "blue_ball": "02"})
+        assert service.get_hot_numbers(2, 1) == hot
+        assert service.red_ball_frequency(33)[-1] == ("07", 1)
@@ -0,0 +1,177 @@
+from collections import Counter
+from itertools import combinations
+
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import synthetic_store
+from data.cooccurrence import Cooccurrence
+from service.statistics import StatisticsService
+
+
+@pytest.fixture
+def store():
+    return synthetic_store(400, seed=2)
+
+
+class TestFrequencyByBucket:
+    """测试按日历分组的频率统计"""
+
+    @pytest.mark.parametrize("bucket, width", [("year", 4), ("month", 7)])
+    def test_matches_grouped_scan(self, store, bucket, width):
+        """按年/月分组与逐条统计一致"""
+        groups = StatisticsService(store).frequency_by_bucket(bucket)
+        records = store.to_records()
+        labels = sorted({r.date[:width] for r in records})
+        assert list(groups) == labels
+        for label in labels[:3]:
+            subset = [r for r in records if r.date[:width] == label]
+            expected = StatisticsService(subset)
+            assert groups[label]["draws"] == len(subset)
+            assert groups[label]["red"] == expected.red_ball_frequency()
+            assert groups[label]["blue"] == expected.blue_ball_frequency()
+
+    def test_weekday(self, store):
+        """按星期分组，没有开奖的星期不出现"""
+        groups = StatisticsService(store).frequency_by_bucket("weekday", top_n=3)
+        assert sum(g["draws"] for g in groups.values()) == len(store)
+        assert all(len(g["red"]) == 3 for g in groups.values())
+        assert set(groups) <= {"周一", "周二", "周三", "周四", "周五", "周六", "周日"}
+
+    def test_invalid_bucket(self, store):
+        """不支持的分组方式"""
+        with pytest.raises(ValueError):
+            StatisticsService(store).frequency_by_bucket("decade")
+
+
+class TestWindowStatistics:
+    """测试期号范围统计（前缀和索引）"""
+
+    @pytest.mark.parametrize("start, end", [(1, 400), (37, 212), (100, 100), (390, None), (None, 5)])
+    def test_matches_recount(self, store, start, end):
+        """范围频率与对范围内期次重新统计一致"""
+        window = StatisticsService(store).window(start, end)
+        times = store.times.astype(int)
+        subset = store[(times >= (start or 0)) & (times <= (end or 10**9))]
+        expected = StatisticsService(subset)
+        assert window.draws == len(subset)
+        assert (window.start_times, window.end_times) == (int(subset.times.min()), int(subset.times.max()))
+        assert window.red_ball_frequency() == expected.red_ball_frequency()
+        assert window.blue_ball_frequency() == expected.blue_ball_frequency()
+        assert window.get_cold_numbers(3, 2) == expected.get_cold_numbers(3, 2)
+
+    def test_recent(self, store):
+        """最近 N 期与前 N 条记录一致，忽略 start / end"""
+        window = StatisticsService(store).window(1, 5, recent=50)
+        assert window.draws == 50
+        assert window.red_ball_frequency() == StatisticsService(store[:50]).red_ball_frequency()
+        assert window.store.times.tolist() == store.times[:50].tolist()
+
+    def test_empty(self, store):
+        """范围内没有开奖"""
+        window = StatisticsService(store).window(1000, 2000)
+        assert window.draws == 0 and window.start_times is None
+        assert window.red_ball_frequency() == [] and len(window.store) == 0
+
+    def test_short_window_keeps_absent_numbers(self, store):
+        """短范围内未出现的号码不在频率列表中（keep_zero 时以 0 次列出），并作为冷号"""
+        window = StatisticsService(store).window(395, 400)
+        absent = [f"{n:02d}" for n in range(1, 34) if not (store[:6].reds == n).any()]
+        assert absent
+        frequency = window.red_ball_frequency()
+        assert len(frequency) == 33 - len(absent) and all(count > 0 for _, count in frequency)
+        frequency = window.red_ball_frequency(keep_zero=True)
+        assert len(frequency) == 33 and len(window.blue_ball_frequency(keep_zero=True)) == 16
+        assert [num for num, count in frequency if count == 0] == absent
+        cold = window.get_cold_numbers(len(absent), 3)
+        assert sorted(cold["red"]) == absent
+        blue_counts = dict(window.blue_ball_frequency(keep_zero=True))
+        assert all(blue_counts[num] == 0 for num in cold["blue"])
+
+    def test_grouped_frequency_skips_absent_numbers(self, store):
+        """分组频率只列出组内出现过的号码"""
+        for freq in StatisticsService(store).frequency_by_bucket("month").values():
+            assert freq["red"] and all(count > 0 for _, count in freq["red"] + freq["blue"])
+            assert len(freq["blue"]) <= freq["draws"]
+
+    def test_window_initialises_base(self, store):
+        """范围统计经基类初始化，具备全部数据统计服务的属性"""
+        service = StatisticsService(store)
+        window = service.window(101, 200)
+        assert set(vars(StatisticsService(store[200:300]))) <= set(vars(window))
+        assert window.store.times.tolist() == list(range(200, 100, -1))
+        assert service.window().state is service.state
+
+    def test_unsorted(self, store):
+        """记录乱序时按期号取范围"""
+        shuffled = store[np.random.default_rng(0).permutation(len(store))]
+        window = StatisticsService(shuffled).window(10, 60)
+        assert window.store.times.tolist() == list(range(60, 9, -1))
+        expected = StatisticsService(store[340:391])
+        assert window.red_ball_frequency() == expected.red_ball_frequency()
+        assert window.frequency_by_bucket("weekday") == expected.frequency_by_bucket("weekday")
+
+
+class TestOmission:
+    """测试遗漏统计"""
+
+    def test_omission(self, store):
+        """当前遗漏、最大遗漏、平均遗漏与遗漏分布"""
+        omission = StatisticsService(store).omission()
+        assert len(omission["red"]) == 33 and len(omission["blue"]) == 16
+        rows = np.flatnonzero((store[::-1].reds == 5).any(axis=1))
+        gaps = np.diff(rows) - 1
+        stats = omission["red"]["05"]
+        assert stats["current"] == len(store) - 1 - rows[-1]
+        assert stats["max"] == max(gaps.max(), stats["current"])
+        assert stats["mean"] == round(gaps.mean(), 2)
+        assert stats["histogram"] == {int(g): int(c) for g, c in enumerate(np.bincount(gaps)) if c}
+
+    def test_analyze_missing(self, store):
+        """最近 N 期未出现的号码及实际遗漏期数"""
+        missing = StatisticsService(store).analyze_missing(10)
+        recent = store[:10]
+        expected = {f"{n:02d}" for n in range(1, 34) if not (recent.reds == n).any()}
+        assert set(missing["red"]) == expected
+        assert all(gap >= 10 for gap in missing["red"].values())
+        assert list(missing["red"].values()) == sorted(missing["red"].values(), reverse=True)
+
+    def test_window(self, store):
+        """范围内遗漏截至范围内最后一期，全部范围复用统计状态"""
+        service = StatisticsService(store)
+        assert service.window().state is service.state
+        window = service.window(1, 200)
+        assert window.omission() == StatisticsService(store[200:]).omission()
+
+
+class TestCooccurrence:
+    """测试红球同现统计"""
+
+    @staticmethod
+    def _brute_force(store, size):
+        counter = Counter(combo for reds in store.reds.tolist() for combo in combinations(sorted(reds), size))
+        return sorted(counter.items(), key=lambda item: (-item[1], item[0]))
+
+    def test_pairs_match_brute_force(self, store):
+        """两两同现矩阵与逐期枚举一致，对角线为出现次数"""
+        cooccurrence = Cooccurrence(store.reds)
+        expected = self._brute_force(store, 2)
+        assert cooccurrence.top_pairs(30) == expected[:30]
+        (a, b), count = expected[0]
+        assert cooccurrence.pairs[a - 1, b - 1] == cooccurrence.pairs[b - 1, a - 1] == count
+        assert np.array_equal(np.diag(cooccurrence.pairs), store.red_counts())
+
+    def test_triples_match_brute_force(self, store):
+        """三个号码同现与逐期枚举一致"""
+        cooccurrence = Cooccurrence(store.reds)
+        assert cooccurrence.top_triples(30) == self._brute_force(store, 3)[:30]
+        assert cooccurrence.triples.sum() == len(store) * 6 ** 3
+
+    def test_service_window(self, store):
+        """范围内同现按范围缓存，全部范围复用整体结果"""
+        service = StatisticsService(store)
+        assert service.window().cooccurrence is service.cooccurrence
+        window = service.window(1, 200)
+        assert window.cooccurrence is service.window(1, 200).cooccurrence
+        assert window.pair_frequency(5) == StatisticsService(store[200:]).pair_frequency(5)
+        assert window.triple_frequency(3)[0][0] == tuple(f"{n:02d}" for n in self._brute_force(store[200:], 3)[0][0])
@@ -0,0 +1,194 @@
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import synthetic_store
+from data.loader import DataLoader, clear_dataset_cache
+from data.stats_state import StatsState
+from data.storage import CSVStorage
+from data.store import DrawStore
+from service.statistics import StatisticsService
+
+FIELDS = (
+    "red_counts", "blue_counts", "red_last", "blue_last", "red_omission", "blue_omission", "red_gaps", "blue_gaps",
+)
+
+
+@pytest.fixture
+def store():
+    return synthetic_store(300, seed=31)
+
+
+def _assert_same(a: StatsState, b: StatsState):
+    assert (a.draws, a.latest_times, a.digest) == (b.draws, b.latest_times, b.digest)
+    for field in FIELDS:
+        assert np.array_equal(getattr(a, field), getattr(b, field)), field
+
+
+def _edit_row(store, index):
+    """复制 store 并修改第 index 期的红球"""
+    reds = store.reds.copy()
+    reds[index] = [1, 2, 3, 4, 5, 6] if reds[index].tolist() != [1, 2, 3, 4, 5, 6] else [7, 8, 9, 10, 11, 12]
+    return DrawStore(store.times.copy(), reds, store.blues.copy(), store.dates.copy())
+
+
+class StubFetcher:
+    def __init__(self, records):
+        self.records = records
+
+    def fetch(self, start=1, end=None, revalidate=False):
+        return [r for r in self.records if int(r.times) >= start]
+
+
+class TestStatsState:
+    """测试号码统计状态"""
+
+    def test_matches_scan(self, store):
+        """出现次数、最后开出期号、遗漏期数与逐期扫描一致"""
+        state = StatsState.from_store(store)
+        ascending = store[::-1]
+        for number in (1, 7, 33):
+            rows = [i for i in range(len(ascending)) if number in ascending.reds[i]]
+            assert state.red_counts[number - 1] == len(rows)
+            assert state.red_last[number - 1] == ascending.times[rows[-1]]
+            assert state.red_omission[number - 1] == len(ascending) - 1 - rows[-1]
+        rows = [i for i in range(len(ascending)) if ascending.blues[i] == 5]
+        assert state.blue_omission[4] == len(ascending) - 1 - rows[-1]
+        assert state.red_counts.sum() == 6 * len(store) and state.latest_times == int(store.times[0])
+
+    def test_incremental(self, store):
+        """分多次计入新期次与一次构建结果相同"""
+        state = StatsState()
+        for start in (250, 200, 199, 10, 0):
+            assert state.sync(store[start:])
+        assert not state.sync(store)
+        _assert_same(state, StatsState.from_store(store))
+
+    def test_gaps_match_scan(self, store):
+        """遗漏分布、最大遗漏、平均遗漏与逐期扫描一致"""
+        state = StatsState.from_store(store)
+        ascending = store[::-1]
+        red, blue = state.gap_summary("red"), state.gap_summary("blue")
+        for number, rows, summary in (
+            (1, np.flatnonzero((ascending.reds == 1).any(axis=1)), red),
+            (29, np.flatnonzero((ascending.reds == 29).any(axis=1)), red),
+            (7, np.flatnonzero(ascending.blues == 7), blue),
+        ):
+            gaps = np.diff(rows) - 1
+            current = len(ascending) - 1 - rows[-1]
+            histogram = summary["histogram"][number - 1]
+            assert histogram.tolist() == np.bincount(gaps, minlength=len(histogram)).tolist()
+            assert summary["max"][number - 1] == max(gaps.max(), current)
+            assert summary["mean"][number - 1] == pytest.approx(gaps.mean())
+            assert summary["count"][number - 1] == len(rows) - 1
+
+    def test_never_seen(self):
+        """从未开出的号码遗漏为全部期数"""
+        state = StatsState.from_store(synthetic_store(3, seed=1))
+        missing = state.red_counts == 0
+        assert missing.any()
+        assert (state.red_omission[missing] == 3).all() and (state.red_last[missing] == 0).all()
+        summary = state.gap_summary("red")
+        assert np.isnan(summary["mean"][missing]).all() and (summary["max"][missing] == 3).all()
+
+    def test_rebuild_when_history_changes(self, store):
+        """已计入的历史被修改时重新构建"""
+        state = StatsState.from_store(store[50:])
+        assert not state.matches(store[60:])
+        assert state.sync(store[60:])
+        _assert_same(state, StatsState.from_store(store[60:]))
+
+    def test_rebuild_when_row_edited(self, store):
+        """历史期次被原地修改（期数与最新期号不变）时重新构建"""
+        state = StatsState.from_store(store)
+        edited = _edit_row(store, 100)
+        assert not state.matches(edited)
+        assert state.sync(edited)
+        _assert_same(state, StatsState.from_store(edited))
+
+    def test_same_version_skips(self, store):
+        """数据集版本与保存时相同则不再检查"""
+        state = StatsState()
+        assert state.sync(store, "v1")
+        assert not state.sync(store, "v1")
+        assert state.sync(store, "v2") and state.version == "v2"
+
+    def test_trusted_append_hashes_new_rows(self, store, monkeypatch):
+        """追加前的版本与保存时相同时只对新期次计算摘要；否则校验已计入部分"""
+        hashed = []
+        digest = StatsState._digest
+        monkeypatch.setattr(StatsState, "_digest", staticmethod(lambda part: hashed.append(len(part)) or digest(part)))
+
+        state = StatsState()
+        state.sync(store[50:], "v1")
+        hashed.clear()
+        assert state.sync(store, "v2", previous="v1")
+        assert hashed == [50]
+        _assert_same(state, StatsState.from_store(store))
+        assert state.digest == digest(store)
+
+        state = StatsState()
+        state.sync(store[50:], "v1")
+        hashed.clear()
+        assert state.sync(store, "v2", previous="v0")
+        assert hashed == [len(store) - 50, 50]
+
+    def test_save_load(self, store, tmp_path):
+        """保存与读取，损坏文件返回 None"""
+        path = tmp_path / "ssq.stats.json"
+        state = StatsState.from_store(store)
+        state.save(path)
+        _assert_same(StatsState.load(path), state)
+
+        path.write_text("{broken", encoding="utf-8")
+        assert StatsState.load(path) is None
+        assert StatsState.load(tmp_path / "missing.json") is None
+
+
+class TestLoaderStatsState:
+    """测试 DataLoader 维护统计状态"""
+
+    @pytest.fixture(autouse=True)
+    def _clear_cache(self):
+        clear_dataset_cache()
+        yield
+        clear_dataset_cache()
+
+    def test_persisted_and_incremental(self, store, tmp_path):
+        """统计状态保存在数据文件旁，增量更新后只计入新期次"""
+        records = store.to_records()
+        storage = CSVStorage(str(tmp_path / "ssq.csv"))
+        storage.save(records[20:])
+        loader = DataLoader(StubFetcher(records), storage)
+
+        state = loader.stats_state()
+        assert loader.stats_state() is state
+        _assert_same(StatsState.load(storage.stats_path), StatsState.from_store(store[20:]))
+
+        hashed = []
+        digest = StatsState._digest
+        with pytest.MonkeyPatch.context() as patch:
+            patch.setattr(StatsState, "_digest", staticmethod(lambda part: hashed.append(len(part)) or digest(part)))
+            loader.update_incremental()
+        assert hashed == [20]  # 只对新增期次计算摘要
+        _assert_same(StatsState.load(storage.stats_path), StatsState.from_store(store))
+        _assert_same(loader.stats_state(), StatsState.from_store(store))
+
+    def test_rebuild_after_history_edit(self, store, tmp_path):
+        """数据文件中的历史期次被修改后，统计状态重新构建"""
+        storage = CSVStorage(str(tmp_path / "ssq.csv"))
+        storage.save(store.to_records())
+        loader = DataLoader(StubFetcher([]), storage)
+        _assert_same(loader.stats_state(), StatsState.from_store(store))
+
+        edited = _edit_row(store, 150)
+        storage.save(edited.to_records())
+        _assert_same(loader.stats_state(), StatsState.from_store(edited))
+        _assert_same(StatsState.load(storage.stats_path), StatsState.from_store(edited))
+
+    def test_statistics_service_uses_state(self, store):
+        """传入统计状态与由数据构建的结果一致"""
+        with_state = StatisticsService(store, StatsState.from_store(store))
+        without = StatisticsService(store)
+        assert with_state.red_ball_frequency() == without.red_ball_frequency()
+        assert with_state.get_cold_numbers(6, 3) == without.get_cold_numbers(6, 3)
+        assert with_state.get_hot_numbers(6, 3) == without.get_hot_numbers(6, 3)
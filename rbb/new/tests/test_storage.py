@@ -0,0 +1,200 @@
+import hashlib
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from common.data_fetcher import ResponseCache
+from data.fetcher import DataFetcher
+from data.loader import DataLoader, clear_dataset_cache
+from data.models import LotteryRecord
+from data.storage import CSVStorage
+
+
+def make_record(times: int) -> LotteryRecord:
+    return LotteryRecord(
+        times=str(times).zfill(5),
+        red_balls=["01", "03", "16", "18", "29", "33"],
+        blue_ball=f"{times % 16 + 1:02d}",
+        date="2022-06-09",
+    )
+
+
+class StubFetcher:
+    """按起始期号返回预置记录的抓取器"""
+
+    def __init__(self, records):
+        self.records = records
+
+    def fetch(self, start=1, end=None, revalidate=False):
+        return [r for r in self.records if int(r.times) >= start]
+
+
+class TestCSVStorage:
+    """测试 CSV 存储与增量分段"""
+
+    def test_append_mode_writes_header_once(self, tmp_path):
+        """测试追加模式只在新文件写入表头"""
+        storage = CSVStorage(str(tmp_path / "ssq.csv"))
+        storage.save([make_record(22002)], mode="a")
+        storage.save([make_record(22001)], mode="a")
+        assert [r.times for r in storage.load()] == ["22002", "22001"]
+
+    def test_append_segment_merged_view(self, tmp_path):
+        """测试分段与主文件合并、去重、降序"""
+        storage = CSVStorage(str(tmp_path / "ssq.csv"))
+        storage.save([make_record(22002), make_record(22001)])
+        main_bytes = storage.filepath.read_bytes()
+
+        storage.append([make_record(22003), make_record(22002)])
+        assert storage.filepath.read_bytes() == main_bytes
+        assert [r.times for r in storage.load()] == ["22003", "22002", "22001"]
+        assert storage.get_latest_times() == 22003
+
+    def test_compaction(self, tmp_path):
+        """测试分段达到阈值后合并回主文件"""
+        storage = CSVStorage(str(tmp_path / "ssq.csv"), compact_threshold=3)
+        storage.save([make_record(22001)])
+        for times in (22002, 22003):
+            storage.append([make_record(times)])
+        assert len(storage._segments()) == 2
+
+        storage.append([make_record(22004)])
+        assert storage._segments() == []
+        reloaded = CSVStorage(str(tmp_path / "ssq.csv"), use_snapshot=False)
+        assert [r.times for r in reloaded.load()] == ["22004", "22003", "22002", "22001"]
+
+    def test_compaction_failure_keeps_data(self, tmp_path, monkeypatch):
+        """测试合并写入中断时主文件与分段保持原样"""
+        storage = CSVStorage(str(tmp_path / "ssq.csv"), compact_threshold=10)
+        storage.save([make_record(22001)])
+        storage.append([make_record(22002)])
+        main_bytes = storage.filepath.read_bytes()
+
+        def broken_write(path, records, mode):
+            path.write_text("times,rb1")
+            raise OSError("磁盘已满")
+
+        monkeypatch.setattr(storage, "_write_csv", broken_write)
+        with pytest.raises(OSError):
+            storage.compact()
+        assert storage.filepath.read_bytes() == main_bytes
+        assert len(storage._segments()) == 1
+        monkeypatch.undo()
+        assert [r.times for r in storage.load()] == ["22002", "22001"]
+
+
+class DrawPageHandler(BaseHTTPRequestHandler):
+    """按 start 参数返回 server.draws 中期号不小于 start 的开奖页面（支持 ETag 条件请求）"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        start = int(parse_qs(urlparse(self.path).query)["start"][0])
+        rows = "".join(
+            f"<tr><td>{r.times}</td>" + "".join(f"<td>{ball}</td>" for ball in r.red_balls)
+            + f"<td>{r.blue_ball}</td>" + "<td></td>" * 7 + f"<td>{r.date}</td></tr>"
+            for r in self.server.draws if int(r.times) >= start
+        )
+        body = f"<table></table><table></table><table><tr></tr><tr></tr>{rows}</table>".encode("utf-8")
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+        self.server.requests.append(self.path)
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def draw_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), DrawPageHandler)
+    server.draws = []
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class TestDataLoader:
+    """测试增量更新"""
+
+    def test_force_refresh_bypasses_cache_ttl(self, tmp_path, draw_server):
+        """测试缓存有效期内强制刷新仍向服务器确认，不丢失增量追加的期次"""
+        fetcher = DataFetcher(
+            f"http://127.0.0.1:{draw_server.server_address[1]}/history.php",
+            parser="stream",
+            cache=ResponseCache(tmp_path / "http", ttl=600),
+        )
+        storage = CSVStorage(str(tmp_path / "ssq.csv"))
+        loader = DataLoader(fetcher, storage)
+
+        draw_server.draws = [make_record(22002), make_record(22001)]
+        loader.load(force_refresh=True)
+        draw_server.draws.insert(0, make_record(22003))
+        assert len(loader.update_incremental()) == 3
+
+        store = loader.load(force_refresh=True, as_store=True)
+        assert store.times.tolist() == [22003, 22002, 22001]
+        assert [r.times for r in CSVStorage(str(tmp_path / "ssq.csv"), use_snapshot=False).load()] == [
+            "22003", "22002", "22001"
+        ]
+        assert len(draw_server.requests) == 3
+
+    def test_update_incremental_appends(self, tmp_path):
+        """测试增量更新只追加新记录"""
+        storage = CSVStorage(str(tmp_path / "ssq.csv"))
+        storage.save([make_record(22001)])
+        fetcher = StubFetcher([make_record(22003), make_record(22002), make_record(22001)])
+
+        store = DataLoader(fetcher, storage).update_incremental()
+        assert store.times.tolist() == [22003, 22002, 22001]
+        assert len(storage._segments()) == 1
+
+
+class TestDatasetCache:
+    """测试进程级数据集缓存"""
+
+    @pytest.fixture(autouse=True)
+    def _clear_cache(self):
+        clear_dataset_cache()
+        yield
+        clear_dataset_cache()
+
+    def test_shared_until_changed(self, tmp_path):
+        """测试文件未变化时共享数据集与派生对象"""
+        storage = CSVStorage(str(tmp_path / "ssq.csv"))
+        storage.save([make_record(22001)])
+        first = DataLoader(StubFetcher([]), storage).dataset()
+        built = first.derived("count", len)
+
+        other = DataLoader(StubFetcher([]), CSVStorage(str(tmp_path / "ssq.csv")))
+        assert other.dataset() is first
+        assert first.derived("count", lambda store: -1) == built
+
+        storage.append([make_record(22002)])
+        reloaded = other.dataset()
+        assert reloaded is not first
+        assert len(reloaded.store) == 2
+
+    def test_touch_without_change(self, tmp_path):
+        """测试只改变 mtime 时不重新加载"""
+        storage = CSVStorage(str(tmp_path / "ssq.csv"))
+        storage.save([make_record(22001)])
+        loader = DataLoader(StubFetcher([]), storage)
+        first = loader.dataset()
+        stat = storage.filepath.stat()
+        os.utime(storage.filepath, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert loader.dataset() is first
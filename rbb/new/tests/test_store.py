@@ -0,0 +1,80 @@
+import pytest
+from common.prize_checker import PrizeChecker as BasePrizeChecker
+from data.models import LotteryRecord
+from data.storage import CSVStorage
+from data.store import DrawStore
+from service.prize_checker import PrizeChecker
+from service.query_service import QueryService
+from service.statistics import StatisticsService
+
+
+@pytest.fixture
+def records():
+    return [
+        LotteryRecord(times="22065", red_balls=["09", "14", "18", "23", "28", "31"], blue_ball="02", date="2022-06-09"),
+        LotteryRecord(times="22064", red_balls=["01", "03", "16", "18", "29", "33"], blue_ball="06", date="2022-06-07"),
+        LotteryRecord(times="03001", red_balls=["10", "11", "12", "13", "26", "28"], blue_ball="11", date="2003-02-23"),
+    ]
+
+
+class TestDrawStore:
+    """测试列式开奖数据存储"""
+
+    def test_from_records_roundtrip(self, records):
+        """测试与 LotteryRecord 互转"""
+        store = DrawStore.from_records(records)
+        assert len(store) == 3
+        assert store.reds.shape == (3, 6)
+        assert store.times.dtype.name == "int32"
+        assert store.to_records() == records
+
+    def test_slice_returns_store(self, records):
+        """测试切片返回 DrawStore"""
+        store = DrawStore.from_records(records)
+        recent = store[:2]
+        assert isinstance(recent, DrawStore)
+        assert recent[0] == records[0]
+
+    def test_csv_load_store(self, records, tmp_path):
+        """测试 CSVStorage 按列加载"""
+        storage = CSVStorage(str(tmp_path / "ssq.csv"))
+        storage.save(records)
+        store = storage.load(as_store=True)
+        assert store.to_records() == storage.load()
+
+    def test_empty(self, tmp_path):
+        """测试文件不存在时返回空存储"""
+        storage = CSVStorage(str(tmp_path / "missing.csv"))
+        assert len(storage.load(as_store=True)) == 0
+
+
+class TestVectorizedServices:
+    """测试业务层直接使用 DrawStore"""
+
+    def test_query_service(self, records):
+        """测试按期号、日期、范围查询"""
+        service = QueryService(DrawStore.from_records(records))
+        assert service.query_by_times("03001") == records[2]
+        assert service.query_by_date("2022-06-07") == records[1]
+        assert service.query_range("22060", "22070") == records[:2]
+        assert service.search_by_red_balls(["33", "01", "03", "16", "18", "29"]) == [records[1]]
+
+    def test_frequency_matches_dicts(self, records):
+        """测试频率统计与字典实现一致"""
+        from_store = StatisticsService(DrawStore.from_records(records))
+        from_dicts = StatisticsService([r.to_dict() for r in records])
+        assert dict(from_store.red_ball_frequency()) == dict(from_dicts.red_ball_frequency())
+        assert from_store.red_ball_frequency(1) == [("18", 2)]
+
+    def test_batch_check_matches_base(self, records):
+        """测试批量核对与逐条核对一致"""
+        user_numbers = {"red": ["01", "03", "16", "18", "29", "05"], "blue": "06"}
+        expected = BasePrizeChecker().batch_check(user_numbers, [r.to_dict() for r in records])
+        assert PrizeChecker().batch_check(user_numbers, DrawStore.from_records(records)) == expected
+
+    def test_batch_check_record_list(self, records):
+        """测试记录列表按掩码批量核对"""
+        user_numbers = {"red": ["01", "03", "16", "18", "29", "33"], "blue": "06"}
+        expected = BasePrizeChecker().batch_check(user_numbers, [r.to_dict() for r in records])
+        assert PrizeChecker().batch_check(user_numbers, records) == expected
+        assert PrizeChecker().check(user_numbers, records[1]) == "一等奖"
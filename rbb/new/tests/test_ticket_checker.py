@@ -0,0 +1,111 @@
+import io
+import json
+
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import random_tickets, synthetic_store
+from common.prize_checker import PrizeChecker
+from service.ticket_checker import TicketChecker, TicketSummary, parse_tickets, read_tickets
+
+
+@pytest.fixture(scope="module")
+def store():
+    return synthetic_store(120, seed=11)
+
+
+def _tickets(store, count=300):
+    tickets = random_tickets(count, seed=12)
+    record = store.record(5)
+    tickets.append({"red": record.red_balls, "blue": record.blue_ball})  # 一等奖
+    return tickets
+
+
+class TestReadTickets:
+    """测试号码文件读取"""
+
+    def test_csv_with_header(self):
+        """CSV 表头跳过，字段数不对的行记为无法解析"""
+        text = "r1,r2,r3,r4,r5,r6,b\n01,03,16,18,29,33,06\n\n 1, 2, 3, 4, 5, 6, 7\n01,02,03\n"
+        rows = list(read_tickets(io.StringIO(text)))
+        assert rows == [
+            (["01", "03", "16", "18", "29", "33"], "06"),
+            (["1", "2", "3", "4", "5", "6"], "7"),
+            (None, None),
+        ]
+
+    def test_csv_without_header(self):
+        """CSV 首行为号码时不跳过"""
+        rows = list(read_tickets(io.StringIO("01,03,16,18,29,33,06\n")))
+        assert rows == [(["01", "03", "16", "18", "29", "33"], "06")]
+
+    def test_csv_header_names(self):
+        """只有已知列名的首行视为表头，其余首行按号码处理并记为无效"""
+        for header in ("rb1,rb2,rb3,rb4,rb5,rb6,bb", "Red1,Red2,Red3,Red4,Red5,Red6,Blue", "红球1,红球2,红球3,红球4,红球5,红球6,蓝球"):
+            assert list(read_tickets(io.StringIO(f"{header}\n01,03,16,18,29,33,06\n"))) == [
+                (["01", "03", "16", "18", "29", "33"], "06")
+            ]
+        rows = list(read_tickets(io.StringIO("01,O3,16,18,29,33,06\n01,03,16,18,29,33,06\n")))
+        assert rows[0] == (["01", "O3", "16", "18", "29", "33"], "06")
+        assert parse_tickets(rows)[2].tolist() == [False, True]
+
+    def test_jsonl(self):
+        """JSONL 格式，格式错误的行记为无法解析"""
+        text = json.dumps({"red": [1, 3, 16, 18, 29, 33], "blue": "06"}) + "\n{bad\n" + json.dumps({"red": []}) + "\n"
+        rows = list(read_tickets(io.StringIO(text)))
+        assert rows == [(["1", "3", "16", "18", "29", "33"], "06"), (None, None), (None, None)]
+
+    def test_empty(self):
+        assert list(read_tickets(io.StringIO("\n\n"))) == []
+
+    def test_parse_tickets(self):
+        """解析并批量验证，无效号码记为 -1"""
+        rows = [(["01", "03", "16", "18", "29", "33"], "06"), (["01", "01", "16", "18", "29", "33"], "06"),
+                (["1", "3", "16", "18", "29", "123"], "06"), (None, None)]
+        reds, blues, valid = parse_tickets(rows)
+        assert valid.tolist() == [True, False, False, False]
+        assert reds[0].tolist() == [1, 3, 16, 18, 29, 33] and blues[0] == 6
+        assert (reds[1:] == -1).all() and (blues[1:] == -1).all()
+
+
+class TestTicketChecker:
+    """测试号码文件批量核对"""
+
+    def _rows(self, tickets):
+        return [(ticket["red"], ticket["blue"]) for ticket in tickets] + [(None, None)]
+
+    def test_matches_prize_matrix(self, store):
+        """分批结果与矩阵核对一致，序号连续，无效号码单独标记"""
+        tickets = _tickets(store)
+        expected = PrizeChecker().check_matrix(tickets, [r.to_dict() for r in store.to_records()])
+
+        batches = list(TicketChecker(store, batch_size=64).check(self._rows(tickets)))
+        assert len(batches) == (len(tickets) + 1 + 63) // 64
+        results = [result for i, batch in enumerate(batches) for result in batch.results(start=i * 64 + 1)]
+        assert [r["ticket"] for r in results] == list(range(1, len(tickets) + 2))
+        for t, result in enumerate(results[:-1]):
+            assert result["valid"]
+            assert result["prizes"] == {k: v for k, v in expected.summary(t).items() if k != "未中奖"}
+            assert result["best"] == PrizeChecker.PRIZE_NAMES[expected.best[t]]
+        assert results[-2]["best"] == "一等奖"
+        assert results[-1] == {"ticket": len(tickets) + 1, "red": None, "blue": None, "valid": False}
+
+    def test_summary(self, store):
+        """汇总各奖级次数与中奖注数"""
+        tickets = _tickets(store)
+        summary = TicketSummary(len(store))
+        for batch in TicketChecker(store, batch_size=100).check(self._rows(tickets)):
+            summary.add(batch)
+        expected = PrizeChecker().check_matrix(tickets, [r.to_dict() for r in store.to_records()])
+        totals = summary.to_dict()
+        assert totals["tickets"] == len(tickets) + 1
+        assert totals["invalid"] == 1
+        assert totals["winning_tickets"] == int((expected.best > 0).sum())
+        assert sum(totals["prizes"].values()) == int(expected.counts[:, 1:].sum())
+
+    def test_workers(self, store):
+        """进程池核对与单进程结果相同且保持顺序"""
+        rows = self._rows(_tickets(store))
+        single = np.concatenate([b.counts for b in TicketChecker(store, batch_size=50).check(rows)])
+        pooled = np.concatenate([b.counts for b in TicketChecker(store, batch_size=50, workers=2).check(rows)])
+        assert np.array_equal(single, pooled)
@@ -1,7 +1,11 @@
+import numpy as np
 import pytest
 from utils.validators import (
     validate_red_balls,
     validate_blue_ball,
+    validate_bet,
+    validate_numbers,
+    validate_tickets,
     validate_times,
     validate_date
 )
@@ -60,4 +64,37 @@ class TestValidators:
     
     def test_validate_date_invalid_format(self):
         """测试日期格式错误"""
-        assert validate_date("2022/06/09") == False
\ No newline at end of file
+        assert validate_date("2022/06/09") == False
+
+    def test_validate_numbers(self):
+        """测试包含查询的号码列表"""
+        assert validate_numbers(["07", "21"], 33) == True
+        assert validate_numbers(["07", "7"], 33) == False
+        assert validate_numbers(["17"], 16) == False
+        assert validate_numbers(["ab"], 33) == False
+
+    def test_validate_tickets(self):
+        """测试批量验证与逐注验证规则一致"""
+        tickets = [
+            (["01", "03", "16", "18", "29", "33"], "06"),
+            (["01", "01", "16", "18", "29", "33"], "06"),  # 红球重复
+            (["00", "03", "16", "18", "29", "33"], "06"),  # 红球越界
+            (["01", "03", "16", "18", "29", "34"], "06"),
+            (["01", "03", "16", "18", "29", "33"], "17"),  # 蓝球越界
+            (["01", "03", "16", "18", "29", "ab"], "06"),  # 非数字
+        ]
+        reds = np.array([[int(b) if b.isdigit() else -1 for b in red] for red, _ in tickets])
+        blues = np.array([int(blue) for _, blue in tickets])
+        expected = [validate_red_balls(red) and validate_blue_ball(blue) for red, blue in tickets]
+        assert validate_tickets(reds, blues).tolist() == expected == [True] + [False] * 5
+
+    def test_validate_bet(self):
+        """测试复式/胆拖投注"""
+        reds = ["01", "03", "16", "18", "29", "33", "07"]
+        assert validate_bet(reds, ["06", "07"]) == True
+        assert validate_bet(reds[2:], ["06"], ["01", "03"]) == True
+        assert validate_bet(reds[4:], ["06"], ["01", "03"]) == False  # 合计不足 6 个
+        assert validate_bet(reds, ["06"], ["01"]) == False  # 胆码与拖码重复
+        assert validate_bet(reds, ["06"], reds[:6]) == False  # 胆码超过 5 个
+        assert validate_bet(reds, ["06", "06"]) == False
+        assert validate_bet(reds, []) == False
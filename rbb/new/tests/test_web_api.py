@@ -0,0 +1,67 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("flask_sqlalchemy")
+pytest.importorskip("flask_limiter")
+pytest.importorskip("flask_cors")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "webs" / "backend"))
+
+from webs.backend.config import Config as WebConfig  # noqa: E402
+
+# 使用内存数据库，不读写 webs/database 下的数据
+WebConfig.SQLALCHEMY_DATABASE_URI = "sqlite://"
+WebConfig.RATE_LIMIT = "10000 per hour"
+
+from webs.backend import app as web  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def client():
+    with web.app.app_context():
+        web.db.create_all()
+        for times in range(22001, 22011):
+            data = {
+                "times": str(times),
+                "date": "2022-06-09",
+                "red_balls": ["01", "03", "16", "18", "29", "33"],
+                "blue_ball": f"{times % 16 + 1:02d}",
+            }
+            web.db.session.add(web.LotteryRecord.from_dict(data))
+        web.db.session.commit()
+        web._invalidate_dataset()
+    return web.app.test_client()
+
+
+class TestSearchApi:
+    """测试号码搜索接口"""
+
+    def test_blue(self, client):
+        """按单个蓝球搜索"""
+        response = client.get("/api/records/search?blue=03")
+        assert response.status_code == 200
+        assert [r["times"] for r in response.get_json()["records"]] == ["22002"]
+
+    def test_invalid_blue(self, client):
+        """蓝球不是 01-16 的单个号码时返回 400"""
+        for blue in ("05,06", "17", "0", "abc", ""):
+            response = client.get("/api/records/search", query_string={"blue": blue})
+            assert response.status_code == 400, blue
+
+
+class TestStatsApi:
+    """测试统计接口的期号范围参数"""
+
+    def test_window(self, client):
+        """from / to / recent 限定统计范围"""
+        assert client.get("/api/stats?from=22003&to=22006").get_json()["draws"] == 4
+        assert client.get("/api/stats?recent=3").get_json()["draws"] == 3
+
+    def test_invalid_window(self, client):
+        """非整数或 from 大于 to 时返回 400，不退回统计全部历史"""
+        for query in ("from=abc", "to=22x", "recent=abc", "recent=0", "from=22006&to=22003"):
+            for path in ("/api/stats", "/api/stats/omission"):
+                response = client.get(f"{path}?{query}")
+                assert response.status_code == 400, (path, query)
@@ -1,5 +1,6 @@
 # 工具模块
-from .validators import (validate_blue_ball, validate_date, validate_red_balls,
+from .validators import (validate_bet, validate_blue_ball, validate_date,
+                         validate_numbers, validate_red_balls, validate_tickets,
                          validate_times)
 
-__all__ = ["validate_red_balls", "validate_blue_ball", "validate_times", "validate_date"]
+__all__ = ["validate_red_balls", "validate_blue_ball", "validate_bet", "validate_numbers", "validate_tickets", "validate_times", "validate_date"]
@@ -1,5 +1,7 @@
 from typing import List
 
+import numpy as np
+
 
 def validate_red_balls(red_balls: List[str]) -> bool:
     """验证红球输入"""
@@ -20,6 +22,45 @@ def validate_blue_ball(blue_ball: str) -> bool:
     return 1 <= int(blue_ball) <= 16
 
 
+def validate_numbers(numbers: List[str], max_value: int) -> bool:
+    """验证号码列表（不重复，均在 1..max_value 内），用于按包含号码查询"""
+    if not all(n.isdigit() and 1 <= int(n) <= max_value for n in numbers):
+        return False
+    return len({int(n) for n in numbers}) == len(numbers)
+
+
+def validate_bet(red_balls: List[str], blue_balls: List[str], banker: List[str] = ()) -> bool:
+    """
+    验证复式/胆拖投注
+
+    - 胆码 0-5 个，拖码（复式为全部红球）与胆码不重复，胆码 + 拖码至少 6 个
+    - 蓝球至少 1 个，不重复
+    """
+    banker = list(banker)
+    if len(banker) > 5 or not validate_numbers(banker + list(red_balls), 33):
+        return False
+    if len(banker) + len(red_balls) < 6:
+        return False
+    return len(blue_balls) >= 1 and validate_numbers(list(blue_balls), 16)
+
+
+def validate_tickets(reds: np.ndarray, blues: np.ndarray) -> np.ndarray:
+    """
+    批量验证号码（规则同 validate_red_balls / validate_blue_ball）
+
+    Args:
+        reds: 红球，整数数组，形状 (N, 6)，无法解析的号码记为 -1
+        blues: 蓝球，整数数组，形状 (N,)
+
+    Returns:
+        np.ndarray: 每注号码是否有效，bool，形状 (N,)
+    """
+    reds = np.asarray(reds).reshape(len(blues), 6)
+    in_range = ((reds >= 1) & (reds <= 33)).all(axis=1) & (blues >= 1) & (blues <= 16)
+    ordered = np.sort(reds, axis=1)
+    return in_range & (ordered[:, 1:] != ordered[:, :-1]).all(axis=1)
+
+
 def validate_times(times: str) -> bool:
     """验证期号格式"""
     return times.isdigit() and len(times) == 5
@@ -1,20 +1,24 @@
 import logging
 import sys
+import threading
 from pathlib import Path
 
 # 添加项目根目录到 Python 路径
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
-from common.data_fetcher import DataFetcher
+from common.data_fetcher import DataFetcher, ResponseCache
 from common.prize_checker import PrizeChecker
-from common.statistics import StatisticsService
+from data.store import DrawStore
 from flask import Flask, jsonify, request
 from flask_cors import CORS
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from flask_sqlalchemy import SQLAlchemy
 from models import LotteryRecord, db
+from service.query_service import QueryService
+from service.statistics import StatisticsService
+from sqlalchemy import func
 
 # 导入本地配置
 from webs.backend.config import Config
@@ -42,9 +46,60 @@ limiter = Limiter(app=app, key_func=get_remote_address, default_limits=[Config.R
 db.init_app(app)
 
 # 初始化服务
-data_fetcher = DataFetcher(Config.DATA_URL)
+data_fetcher = DataFetcher(
+    Config.DATA_URL, cache=ResponseCache(Config.HTTP_CACHE_DIR, ttl=Config.HTTP_CACHE_TTL)
+)
 prize_checker = PrizeChecker()
 
+# 内存数据集缓存：数据库版本不变时复用 DrawStore 及派生结果，避免重复查询 ORM
+_dataset_cache = {"version": None, "derived": {}}
+_dataset_lock = threading.Lock()
+# 写入代数：每次提交后递增，原地修正历史记录（记录数、最新期号不变）同样使缓存失效
+_dataset_generation = 0
+
+
+def _dataset_version():
+    """数据库数据版本：(写入代数, 记录数, 最新期号)，记录数与最新期号用于发现其他进程追加的数据"""
+    with _dataset_lock:
+        generation = _dataset_generation
+    count, latest = db.session.query(func.count(LotteryRecord.id), func.max(LotteryRecord.times)).one()
+    return generation, count, latest
+
+
+def _invalidate_dataset():
+    """数据写入提交后使内存数据集失效"""
+    global _dataset_generation
+    with _dataset_lock:
+        _dataset_generation += 1
+        _dataset_cache.update(version=None, derived={})
+
+
+def _cached(name, builder):
+    """按数据库版本缓存派生结果"""
+    version = _dataset_version()
+    with _dataset_lock:
+        if _dataset_cache["version"] != version:
+            _dataset_cache.update(version=version, derived={})
+        if name in _dataset_cache["derived"]:
+            return _dataset_cache["derived"][name]
+
+    # 在锁外构建，builder 内可再调用 _cached
+    value = builder()
+    with _dataset_lock:
+        if _dataset_cache["version"] == version:
+            _dataset_cache["derived"][name] = value
+    return value
+
+
+def _get_store():
+    """全部开奖记录的列式存储（按期号降序）"""
+    return _cached(
+        "store",
+        lambda: DrawStore.from_dicts(
+            [r.to_dict() for r in LotteryRecord.query.order_by(LotteryRecord.times.desc()).all()]
+        ),
+    )
+
 
 @app.route("/api/health", methods=["GET"])
 def health():
@@ -52,6 +107,12 @@ def health():
     return jsonify({"status": "ok", "message": "API is running"})
 
 
+@app.route("/api/cache/stats", methods=["GET"])
+def cache_stats():
+    """响应缓存命中统计"""
+    return jsonify(data_fetcher.cache_stats())
+
+
 @app.route("/api/records", methods=["GET"])
 def get_records():
     """获取开奖记录"""
@@ -80,11 +141,58 @@ def get_record(times):
     return jsonify(record.to_dict())
 
 
+def _get_query_service():
+    """基于内存数据集的查询服务（含号码倒排索引）"""
+    return _cached("query", lambda: QueryService(_get_store()))
+
+
+def _parse_numbers(text, max_value):
+    """解析逗号分隔的号码，如 "07,21"；格式错误时返回 None"""
+    numbers = [n.strip() for n in text.split(",") if n.strip()]
+    if not numbers or not all(n.isdigit() and 1 <= int(n) <= max_value for n in numbers):
+        return None
+    return numbers
+
+
+def _parse_number(text, max_value):
+    """解析单个号码，如 "05"；格式错误或不在 1-max_value 内时返回 None"""
+    text = text.strip()
+    return text if text.isdigit() and 1 <= int(text) <= max_value else None
+
+
 @app.route("/api/records/search", methods=["GET"])
 def search_records():
-    """搜索记录"""
+    """搜索记录
+
+    可选参数 contains（逗号分隔的红球）、any（为 1 时包含任一即可）、blue（蓝球）
+    通过号码倒排索引查询，可与 times / date 组合。
+    """
     times = request.args.get("times")
     date = request.args.get("date")
+    contains = request.args.get("contains")
+    blue = request.args.get("blue")
+
+    if contains is not None or blue is not None:
+        reds = _parse_numbers(contains, 33) if contains is not None else []
+        if reds is None:
+            return jsonify({"error": "contains 应为逗号分隔的红球号码（01-33）"}), 400
+        if blue is not None:
+            blue = _parse_number(blue, 16)
+            if blue is None:
+                return jsonify({"error": "blue 应为单个蓝球号码（01-16）"}), 400
+
+        matched = _get_query_service().search_contains(
+            reds, blue, request.args.get("any") in ("1", "true")
+        )
+        if times:
+            matched = matched[matched.times == int(times)] if times.isdigit() else matched[:0]
+        if date:
+            matched = matched[matched.dates.astype(str) == date]
+        records = [
+            {"times": r.times, "date": r.date, "red_balls": r.red_balls, "blue_ball": r.blue_ball}
+            for r in matched[:100]
+        ]
+        return jsonify({"records": records, "total": len(matched)})
 
     query = LotteryRecord.query
 
@@ -155,16 +263,45 @@ def check_prize():
         return jsonify({"error": "服务器内部错误"}), 500
 
 
-@app.route("/api/stats", methods=["GET"])
-def get_statistics():
-    """获取统计数据"""
-    records = LotteryRecord.query.order_by(LotteryRecord.times.desc()).limit(500).all()
-    records_data = [r.to_dict() for r in records]
+def _stats_window(default_recent=None):
+    """按请求参数 from / to（期号范围，含两端）或 recent（最近 N 期）取统计范围
+
+    Returns:
+        (WindowStatistics, None) 或 (None, 错误响应)
+    """
+    values = {}
+    for name in ("from", "to", "recent"):
+        text = request.args.get(name)
+        if text is not None and not text.strip().isdigit():
+            return None, (jsonify({"error": f"{name} 应为整数"}), 400)
+        values[name] = int(text) if text is not None else None
+    start, end, recent = values["from"], values["to"], values["recent"]
+    if recent is not None and recent < 1:
+        return None, (jsonify({"error": "recent 应为正整数"}), 400)
+    if start is not None and end is not None and start > end:
+        return None, (jsonify({"error": "from 期号不能大于 to 期号"}), 400)
+    if start is None and end is None and recent is None:
+        recent = default_recent
+
+    stats_service = _cached("stats", lambda: StatisticsService(_get_store()))
+    return stats_service.window(start, end, recent), None
 
-    stats_service = StatisticsService(records_data)
 
+@app.route("/api/stats", methods=["GET"])
+def get_statistics():
+    """获取统计数据
+
+    可选参数 from / to（期号范围，含两端）或 recent（最近 N 期），缺省统计最近 STATS_RECENT_COUNT 期。
+    号码出现次数由前缀和索引两行相减得到，任意范围耗时相同。
+    """
+    stats_service, error = _stats_window(Config.STATS_RECENT_COUNT)
+    if error:
+        return error
     return jsonify(
         {
+            "draws": stats_service.draws,
+            "from": stats_service.start_times,
+            "to": stats_service.end_times,
             "red_frequency": stats_service.red_ball_frequency(33),
             "blue_frequency": stats_service.blue_ball_frequency(16),
             "hot_numbers": stats_service.get_hot_numbers(6, 3),
@@ -173,13 +310,37 @@ def get_statistics():
     )
 
 
+@app.route("/api/stats/omission", methods=["GET"])
+def get_omission():
+    """获取遗漏统计（当前遗漏、最大遗漏、平均遗漏及遗漏分布）
+
+    可选参数同 /api/stats，缺省统计全部历史；遗漏截至范围内最后一期。
+    """
+    stats_service, error = _stats_window()
+    if error:
+        return error
+    return jsonify(
+        {
+            "draws": stats_service.draws,
+            "from": stats_service.start_times,
+            "to": stats_service.end_times,
+            **stats_service.omission(),
+        }
+    )
+
+
 @app.route("/api/update", methods=["POST"])
 @limiter.limit("5 per hour")
 def update_data():
     """更新数据"""
     try:
         logger.info("开始更新数据")
-        records_data = data_fetcher.fetch()
+        # 数据库为空时不依赖响应缓存，直接完整下载
+        has_data = db.session.query(LotteryRecord.id).first() is not None
+        records_data, commit_cache = data_fetcher.fetch_if_modified(conditional=has_data)
+        if records_data is None:
+            logger.info("远端数据未变化，跳过更新")
+            return jsonify({"message": "数据未变化", "added": 0, "updated": 0, "total": 0})
 
         added = 0
         updated = 0
@@ -202,6 +363,9 @@ def update_data():
                 added += 1
 
         db.session.commit()
+        _invalidate_dataset()
+        # 数据库提交成功后才写入响应缓存，提交失败时下次仍会重新下载
+        commit_cache()
         logger.info(f"数据更新完成: 新增 {added} 条, 更新 {updated} 条")
 
         return jsonify(
@@ -229,6 +393,7 @@ def init_database():
                 db.session.add(record)
 
         db.session.commit()
+        _invalidate_dataset()
         logger.info(f"数据库初始化成功: {len(records_data)} 条记录")
 
         return jsonify({"message": "数据库初始化成功", "total": len(records_data)})
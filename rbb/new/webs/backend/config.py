@@ -11,6 +11,8 @@ class Config:
 
     # 数据源
     DATA_URL = "https://datachart.500.com/ssq/history/newinc/history.php"
+    HTTP_CACHE_DIR = os.path.join(os.path.dirname(BASE_DIR), "database", "http_cache")
+    HTTP_CACHE_TTL = int(os.environ.get("HTTP_CACHE_TTL", "600"))
 
     # Flask 配置
     SECRET_KEY = os.environ.get("SECRET_KEY") or secrets.token_hex(32)
@@ -24,5 +26,8 @@ class Config:
         "http://localhost:4200,http://localhost:4300,http://localhost:4400,http://127.0.0.1:4200,http://127.0.0.1:4300,http://127.0.0.1:4400",
     ).split(",")
 
+    # 统计接口缺省统计最近 N 期
+    STATS_RECENT_COUNT = int(os.environ.get("STATS_RECENT_COUNT", "500"))
+
     # 速率限制
     RATE_LIMIT = os.environ.get("RATE_LIMIT", "100 per hour")